@@ -0,0 +1,403 @@
+import asyncio
+import json
+import threading
+import time
+from config import get_config_snapshot
+from autotune import MinerTuner, create_tuner, diff_miners, telemetry_hub, FLATLINE_RESTART_WAIT, LIMIT_FIELDS
+from telemetry import PollCadence, GOLDEN_RATIO_FRACTION
+from bitaxe_api import IDEMPOTENT_METHODS, RETRY_STATUS_CODES
+from metrics import HTTP_ERRORS
+
+
+class AsyncRequestError(Exception):
+    """Raised when a request to a miner fails after all retries."""
+
+
+class AsyncBitaxeClient:
+    """Minimal asyncio HTTP/1.1 client for the Bitaxe API.
+
+    Keeps one keep-alive connection per miner and mirrors the timeouts and
+    retry/backoff behaviour of `bitaxe_api.BitaxeClient`, without needing any
+    third-party async HTTP library.
+    """
+
+    def __init__(self, connect_timeout=3, read_timeout=10, retries=2, backoff=0.5, backoff_max=5):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._connections = {}
+        self._locks = {}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            connect_timeout=config.get("http_connect_timeout", 3),
+            read_timeout=config.get("http_read_timeout", 10),
+            retries=config.get("http_retries", 2),
+            backoff=config.get("http_backoff", 0.5),
+        )
+
+    async def _connection(self, ip):
+        connection = self._connections.get(ip)
+        if connection is not None and not connection[1].is_closing():
+            return connection, True
+
+        host, _, port = ip.partition(":")
+        connection = await asyncio.wait_for(asyncio.open_connection(host, int(port or 80)), self.connect_timeout)
+        self._connections[ip] = connection
+        return connection, False
+
+    def _drop_connection(self, ip):
+        connection = self._connections.pop(ip, None)
+        if connection is not None:
+            connection[1].close()
+
+    async def _read_response(self, reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by miner")
+        status_code = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            headers["connection"] = "close"
+
+        return status_code, headers, body
+
+    async def _send_once(self, method, ip, path, payload):
+        (reader, writer), reused = await self._connection(ip)
+        request = (f"{method} {path} HTTP/1.1\r\n"
+                   f"Host: {ip}\r\n"
+                   "Connection: keep-alive\r\n"
+                   "Accept: application/json\r\n"
+                   "Content-Type: application/json\r\n"
+                   f"Content-Length: {len(payload)}\r\n\r\n").encode("latin-1") + payload
+        try:
+            writer.write(request)
+            await writer.drain()
+            status_code, headers, body = await asyncio.wait_for(self._read_response(reader), self.read_timeout)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self._drop_connection(ip)
+            if reused:
+                # The miner closed an idle keep-alive connection; resend once on a fresh one
+                return await self._send_once(method, ip, path, payload)
+            raise e
+        except BaseException:
+            self._drop_connection(ip)
+            raise
+
+        if headers.get("connection", "").lower() == "close":
+            self._drop_connection(ip)
+        return status_code, body
+
+    async def request(self, method, ip, path, json_body=None):
+        """Send a request and return the response body; raises AsyncRequestError on failure."""
+        method = method.upper()
+        payload = json.dumps(json_body).encode() if json_body is not None else b""
+        lock = self._locks.setdefault(ip, asyncio.Lock())
+
+        attempt = 0
+        while True:
+            try:
+                async with lock:
+                    status_code, body = await self._send_once(method, ip, path, payload)
+                if status_code < 400:
+                    return body
+                error = AsyncRequestError(f"{status_code} Error for url: http://{ip}{path}")
+                retryable = method in IDEMPOTENT_METHODS and status_code in RETRY_STATUS_CODES
+            except asyncio.TimeoutError:
+                error = AsyncRequestError(f"Timed out talking to http://{ip}{path}")
+                retryable = method in IDEMPOTENT_METHODS
+            except (OSError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+                error = AsyncRequestError(f"Connection error for http://{ip}{path}: {e}")
+                retryable = True
+
+            if attempt >= self.retries or not retryable:
+                raise error
+            await asyncio.sleep(min(self.backoff * (2 ** attempt), self.backoff_max))
+            attempt += 1
+
+    async def get_system_info(self, ip):
+        try:
+            return json.loads(await self.request("GET", ip, "/api/system/info"))
+        except ValueError as e:
+            raise AsyncRequestError(f"Invalid JSON from http://{ip}/api/system/info: {e}")
+
+    async def update_system(self, ip, settings):
+        return await self.request("PATCH", ip, "/api/system", settings)
+
+    async def restart(self, ip):
+        return await self.request("POST", ip, "/api/system/restart")
+
+    def close(self):
+        for ip in list(self._connections):
+            self._drop_connection(ip)
+
+
+class AsyncTuningEngine:
+    """Runs every miner's monitor/adjust loop as a coroutine on one event loop.
+
+    Drop-in alternative to one `monitor_and_adjust` thread per miner: decisions
+    come from the same `MinerTuner`, readings are published to the shared
+    `telemetry_hub` for the GUI, and all HTTP traffic goes through
+    `AsyncBitaxeClient`. Select it with "tuning_engine": "asyncio" in config.json.
+    Like the thread engine's `TunerFleet`, single miners can be started,
+    stopped, paused and resumed while the engine runs.
+    """
+
+    def __init__(self, log_callback, client=None):
+        self.log_callback = log_callback
+        self.client = client
+        self.config = None
+        self._loop = None
+        self._stop_event = None
+        self._stop_requested = threading.Event()
+        self._thread = None
+        self._tasks = {}  # ip -> (task, stop event) of every miner loop
+        self._miners = {}  # ip -> config.json entry each loop runs with
+        self._updates = {}  # ip -> new config.json entry for the loop to pick up
+        self._paused = set()
+        self._held = set()  # IPs stopped with stop_miner; apply_config leaves them out until started again
+
+    def start(self, miners):
+        """Run the engine for `miners` on a background thread and return immediately."""
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(miners),), daemon=True,
+                                        name="async-tuning-engine")
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Stop every miner loop; safe to call from any thread."""
+        self._stop_requested.set()
+        self._call(self._stop_all)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def miners(self):
+        """{ip: config.json entry} of every miner being tuned."""
+        return dict(self._miners)
+
+    def start_miner(self, miner):
+        """Start tuning `miner`, replacing its loop if it already runs; safe to call from any thread."""
+        self._held.discard(miner["ip"])
+        return self._call(self._start_task, miner)
+
+    def stop_miner(self, ip):
+        """Stop tuning `ip` until it is started again, even if config changes would otherwise restart it."""
+        if ip not in self._miners:
+            return False
+        self._held.add(ip)
+        return self._call(self._stop_task, ip)
+
+    def pause_miner(self, ip):
+        """Keep polling `ip` but make no decisions until `resume_miner`."""
+        if ip not in self._tasks or ip in self._paused:
+            return False
+        self._paused.add(ip)
+        self.log_callback(f"{ip} -> Autotuning paused.", "warning")
+        return True
+
+    def resume_miner(self, ip):
+        if ip not in self._paused:
+            return False
+        self._paused.discard(ip)
+        self.log_callback(f"{ip} -> Autotuning resumed.", "info")
+        return True
+
+    def apply_config(self, miners):
+        """Start, stop and re-limit miner loops to match `miners`, like `TunerFleet.apply_config`."""
+        self._held &= {miner["ip"] for miner in miners}  # forget removed or disabled miners
+        start, stop, update = diff_miners(dict(self._miners), [m for m in miners if m["ip"] not in self._held])
+        for ip in stop:
+            self._call(self._stop_task, ip)
+        for miner in start:
+            self.start_miner(dict(miner))
+        for miner in update:
+            self._miners[miner["ip"]] = self._updates[miner["ip"]] = dict(miner)
+        return [m["ip"] for m in start], stop, [m["ip"] for m in update]
+
+    def _call(self, callback, *args):
+        if self._loop is None or self._loop.is_closed():
+            return False
+        self._loop.call_soon_threadsafe(callback, *args)
+        return True
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    async def run(self, miners):
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if self._stop_requested.is_set():
+            return
+
+        self.config = get_config_snapshot()
+        if self.client is None:
+            self.client = AsyncBitaxeClient.from_config(self.config)
+
+        config_task = asyncio.create_task(self._refresh_config())
+        try:
+            for idx, miner in enumerate(miners):
+                self._start_task(miner, idx)
+            await self._stop_event.wait()
+            await asyncio.gather(*(task for task, _ in list(self._tasks.values())), return_exceptions=True)
+        finally:
+            config_task.cancel()
+            self.client.close()
+
+    def _start_task(self, miner, idx=0):
+        self._stop_task(miner["ip"])
+        stop = asyncio.Event()
+        task = asyncio.create_task(self._tune_miner(miner, idx, stop))
+        self._tasks[miner["ip"]] = (task, stop)
+        self._miners[miner["ip"]] = miner
+        task.add_done_callback(lambda done, ip=miner["ip"]: self._forget(ip, done))
+
+    def _stop_task(self, ip):
+        _, stop = self._tasks.get(ip, (None, None))
+        if stop is not None:
+            stop.set()
+            self._miners.pop(ip, None)
+
+    def _stop_all(self):
+        self._stop_event.set()
+        for _, stop in self._tasks.values():
+            stop.set()
+
+    def _forget(self, ip, task):
+        if self._tasks.get(ip, (None,))[0] is task:
+            del self._tasks[ip]
+            self._miners.pop(ip, None)
+            self._updates.pop(ip, None)
+            self._paused.discard(ip)
+
+    async def _refresh_config(self):
+        # One refresh for the whole fleet, at the same 5 s cadence each thread used to use
+        while not await self._sleep(5):
+            self.config = get_config_snapshot()
+
+    async def _sleep(self, seconds, stop=None):
+        """Sleep up to `seconds`; returns True as soon as `stop` (default: the engine) is set."""
+        stop = stop or self._stop_event
+        try:
+            await asyncio.wait_for(stop.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        return stop.is_set()
+
+    async def _set_system_settings(self, ip, core_voltage, frequency):
+        settings = {"coreVoltage": core_voltage, "frequency": frequency}
+        try:
+            await self.client.update_system(ip, settings)
+            return f"{ip} -> Applied settings: Voltage = {core_voltage}mV, Frequency = {frequency}MHz"
+        except AsyncRequestError as e:
+            HTTP_ERRORS.inc(ip=ip, operation="update_system")
+            return f"{ip} -> Error setting system settings: {e}"
+
+    async def _restart(self, ip):
+        try:
+            await self.client.restart(ip)
+            return f"{ip} -> Restart initiated."
+        except AsyncRequestError as e:
+            HTTP_ERRORS.inc(ip=ip, operation="restart")
+            return f"{ip} -> Error restarting system: {e}"
+
+    async def _get_system_info(self, ip):
+        start = time.perf_counter()
+        try:
+            result = await self.client.get_system_info(ip)
+        except AsyncRequestError as e:
+            result = f"Error fetching system info from {ip}: {e}"
+        telemetry_hub.publish(ip, result, time.perf_counter() - start)
+        return result
+
+    async def _tune_miner(self, miner, idx=0, stop=None):
+        ip, log_callback = miner["ip"], self.log_callback
+        stop = stop or self._stop_event
+        settings = (miner.get("min_freq"), miner.get("max_freq"), miner.get("min_volt"), miner.get("max_volt"),
+                    miner.get("max_temp"), miner.get("max_watts"))
+        if MinerTuner.missing_settings(*settings):
+            log_callback(f"{ip} -> Missing AutoTuner settings. Skipping tuning.", "error")
+            return
+
+        tuner = create_tuner(ip, log_callback, *settings, miner.get("start_freq"), miner.get("start_volt"),
+                             miner.get("max_vr_temp"))
+        log_callback(await self._set_system_settings(ip, tuner.current_voltage, tuner.current_frequency), "info")
+
+        # Same cadence as TelemetryHub's scheduler: staggered first poll, then adaptive
+        cadence = PollCadence(ip)
+        interval = self.config.get("monitor_interval", 5)
+        await self._sleep((idx * GOLDEN_RATIO_FRACTION) % 1.0 * interval, stop)
+        while not stop.is_set():
+            try:
+                interval = self.config.get("monitor_interval", 5)
+
+                update = self._updates.pop(ip, None)
+                if update is not None:
+                    log_callback(f"{ip} -> AutoTuner limits updated.", "info")
+                    if tuner.update_limits(*(update.get(field) for field in LIMIT_FIELDS)):
+                        log_callback(await self._set_system_settings(ip, tuner.current_voltage,
+                                                                     tuner.current_frequency), "info")
+
+                info = await self._get_system_info(ip)
+                if stop.is_set():
+                    break
+                delay = cadence.next_delay(info, self.config)
+                if ip in self._paused:
+                    await self._sleep(delay, stop)  # Keep polling for the display, leave the settings alone
+                    continue
+
+                if isinstance(info, str):
+                    log_callback(info, "error")
+                    await self._sleep(delay, stop)
+                    continue
+
+                if not isinstance(info, dict):
+                    log_callback(f"{ip} -> Unexpected system info format: {info}", "error")
+                    await self._sleep(delay, stop)
+                    continue
+
+                action = tuner.evaluate(info, self.config, now=time.time())
+
+                if action == MinerTuner.RESTART:
+                    await self._restart(ip)
+                    await self._sleep(FLATLINE_RESTART_WAIT, stop)
+                    continue
+
+                if action == MinerTuner.APPLY:
+                    log_callback(await self._set_system_settings(ip, tuner.current_voltage,
+                                                                 tuner.current_frequency), "info")
+                    cadence.expedite(interval * 3)
+                    delay = min(delay, self.config.get("poll_min_interval", 1))
+
+                # No extra wait after a step-down: the cadence polls fast while the new settings settle and
+                # refresh_interval in policy.decide limits how often they change
+                await self._sleep(delay, stop)
+
+            except Exception as e:
+                log_callback(f"{ip} -> UNCAUGHT ERROR: {str(e)}", "error")
+                await self._sleep(interval, stop)
+
+        log_callback(f"{ip} -> Autotuning stopped.", "warning")
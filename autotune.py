@@ -1,8 +1,17 @@
+import csv
 import requests
 import time
 import threading
-from config import load_config, get_miners, get_miner_defaults, detect_miners
-import pandas as pd
+from config import load_config, get_config_snapshot, get_miners, get_miner_defaults, detect_miners
+from telemetry import TelemetryHub
+from bitaxe_api import BitaxeClient
+from dispatch import BulkDispatcher, summarize
+from scheduler import start_scheduler, active_profile
+from tiers import TierTable
+import policy
+from stats import MinerStats, RollingWindow
+from history import start_recording
+from metrics import STEP_UPS, STEP_DOWNS, FLATLINE_RESTARTS, HTTP_ERRORS, observe_snapshot
 
 # Load global configuration
 config = load_config()
@@ -11,38 +20,51 @@ FREQUENCY_STEP = config["frequency_step"]
 MONITOR_INTERVAL = config["monitor_interval"]
 TEMP_TOLERANCE = config["temp_tolerance"]
 
-# Global Running Flag
-running = True
+# Shared keep-alive API client used for every call to the miners
+api_client = BitaxeClient.from_config(config)
+
+def _parse_number(value):
+    value = value.strip()
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
 
 def load_scaling_table():
+    """Read the tier CSV into a list of dicts sorted by frequency (keys are snake_case headers)."""
     try:
-        df = pd.read_csv("cpu_voltage_scaling_safeguards.csv")
-        df = df.rename(columns=lambda x: x.strip().lower().replace(" ", "_"))
-        df = df.sort_values(by="frequency_(mhz)").reset_index(drop=True)
-        return df.to_dict(orient="records")
+        with open("cpu_voltage_scaling_safeguards.csv", newline="") as file:
+            reader = csv.reader(file)
+            columns = [name.strip().lower().replace(" ", "_") for name in next(reader)]
+            records = [dict(zip(columns, map(_parse_number, row))) for row in reader if row]
+        return sorted(records, key=lambda tier: tier["frequency_(mhz)"])
     except Exception as e:
         print(f"Failed to load CPU scaling table: {e}")
         return []
 
-def get_target_hashrate_for_freq(freq, tier_list):
-    """Return expected target hashrate (in GH/s) for a given frequency from tier list (CSV stores TH/s)."""
-    if not tier_list:
-        return 0  # Prevents IndexError when enforcement is disabled
+_tier_table = None
+_tier_table_lock = threading.Lock()
+
+def get_tier_table():
+    """Return the shared TierTable, loading the scaling CSV on first use."""
+    global _tier_table
+    with _tier_table_lock:
+        if not _tier_table:  # Retry on the next call if the CSV failed to load
+            _tier_table = TierTable(load_scaling_table())
+        return _tier_table
+
+def _as_tier_table(tiers):
+    return tiers if isinstance(tiers, TierTable) else TierTable(tiers or [])
 
-    sorted_tiers = sorted(tier_list, key=lambda x: x["frequency_(mhz)"])
-    for tier in reversed(sorted_tiers):
-        if freq >= tier["frequency_(mhz)"]:
-            # Convert TH/s to GH/s by multiplying by 1000
-            return tier.get("target_hashrate", 0)
-    return sorted_tiers[0].get("target_hashrate", 0) * 1000
+def get_target_hashrate_for_freq(freq, tier_table):
+    """Return expected target hashrate (in GH/s) for a given frequency from the tier table."""
+    return _as_tier_table(tier_table).target_hashrate_for(freq)
 
 
 def get_system_info(bitaxe_ip):
     """Fetch system info from Bitaxe API."""
     try:
-        response = requests.get(f"http://{bitaxe_ip}/api/system/info", timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return api_client.get_system_info(bitaxe_ip)
     except requests.exceptions.RequestException as e:
         return f"Error fetching system info from {bitaxe_ip}: {e}"
 
@@ -50,200 +72,566 @@ def set_system_settings(bitaxe_ip, core_voltage, frequency):
     """Set system parameters via Bitaxe API dynamically."""
     settings = {"coreVoltage": core_voltage, "frequency": frequency}
     try:
-        response = requests.patch(f"http://{bitaxe_ip}/api/system", json=settings, timeout=10)
-        response.raise_for_status()
+        api_client.update_system(bitaxe_ip, settings)
         return f"{bitaxe_ip} -> Applied settings: Voltage = {core_voltage}mV, Frequency = {frequency}MHz"
     except requests.exceptions.RequestException as e:
+        HTTP_ERRORS.inc(ip=bitaxe_ip, operation="update_system")
         return f"{bitaxe_ip} -> Error setting system settings: {e}"
 
 def restart_bitaxe(bitaxe_ip):
     """Restart the Bitaxe using the API."""
     try:
-        response = requests.post(f"http://{bitaxe_ip}/api/system/restart", timeout=10)
-        response.raise_for_status()
+        api_client.restart(bitaxe_ip)
         return f"{bitaxe_ip} -> Restart initiated."
     except requests.exceptions.RequestException as e:
+        HTTP_ERRORS.inc(ip=bitaxe_ip, operation="restart")
         return f"{bitaxe_ip} -> Error restarting system: {e}"
 
-def get_tier_voltage_for_freq(freq, tier_list):
-    """Return voltage for the closest frequency in tier list."""
-    sorted_tiers = sorted(tier_list, key=lambda x: x["frequency_(mhz)"])
-    for tier in reversed(sorted_tiers):
-        if freq >= tier["frequency_(mhz)"]:
-            return tier["voltage"]
-    return sorted_tiers[0]["voltage"]
+def bulk_dispatcher(config=None):
+    """BulkDispatcher on the shared API client, with wave settings from config.json."""
+    return BulkDispatcher.from_config(api_client, config or get_config_snapshot())
+
+# Shared per-miner telemetry, read by both the tuner loops and the GUI
+telemetry_hub = TelemetryHub(get_system_info)
+telemetry_hub.add_listener(observe_snapshot)
+
+def get_tier_voltage_for_freq(freq, tier_table):
+    """Return voltage for the closest frequency in the tier table."""
+    return _as_tier_table(tier_table).voltage_for(freq)
+
+FLATLINE_RESTART_WAIT = 60  # seconds to let a miner reboot after a flatline restart
+
+# Per-miner AutoTuner limits in config.json; the first six are required to tune a miner
+LIMIT_FIELDS = ("min_freq", "max_freq", "min_volt", "max_volt", "max_temp", "max_watts", "max_vr_temp")
+REQUIRED_FIELDS = LIMIT_FIELDS[:6]
+
+class MinerTuner:
+    """Tuning state and decisions for a single miner.
+
+    Holds the current frequency/voltage, the last tune time, rolling statistics
+    of recent readings and the flatline window. `evaluate` turns one
+    /api/system/info reading into an action using the pure rules in
+    `policy.decide`, and logs why. The rules see the smoothed (EWMA) hashrate
+    so one noisy sample can't trigger a step; temperature and power limits are
+    still checked against the raw reading. The caller performs the
+    HTTP calls and sleeps, so the thread loop in `monitor_and_adjust` and the
+    asyncio engine make identical decisions.
+    """
+
+    HOLD = None
+    APPLY = "apply"
+    RESTART = "restart"
+
+    def __init__(self, bitaxe_ip, log_callback, min_freq, max_freq, min_volt, max_volt,
+                 max_temp, max_watts, start_freq=None, start_volt=None, max_vr_temp=None,
+                 tier_table=None, flatline_enabled=True, flatline_repeat_count=5, flatline_min_variation=0.001,
+                 stats_window=12, hashrate_smoothing=0.3):
+        self.bitaxe_ip = bitaxe_ip
+        self.log_callback = log_callback
+        self.min_freq, self.max_freq = min_freq, max_freq
+        self.min_volt, self.max_volt = min_volt, max_volt
+        self.max_temp, self.max_watts, self.max_vr_temp = max_temp, max_watts, max_vr_temp
+        self.limits = policy.Limits(min_freq, max_freq, min_volt, max_volt, max_temp, max_watts, max_vr_temp)
+        self.tier_table = _as_tier_table(tier_table)  # empty when safe pairing is not enforced
+
+        # Rolling statistics of temp, VR temp, hashrate and power
+        self.stats = MinerStats(stats_window, hashrate_smoothing)
+
+        # Flatline detection: the last `flatline_repeat_count` hashrates are (nearly) constant
+        self.flatline_enabled = flatline_enabled
+        self.flatline_repeat_count = flatline_repeat_count
+        self.flatline_min_variation = flatline_min_variation  # stddev as a fraction of the mean
+        self.flatline_window = RollingWindow(max(flatline_repeat_count, 1))
+
+        self.current_frequency = start_freq if start_freq not in [None, ""] else min_freq
+        self.current_voltage = start_volt if start_volt not in [None, ""] else min_volt
+        self.last_tune_time = 0
+        self.stepping_down = False
+
+        # Last outcome of `evaluate`, read by the status API
+        self.last_decision = None  # "hold", "apply" or "restart"
+        self.last_decision_time = None
+        self.last_reason = None  # last decision message logged by `evaluate`
+        self.flatline_restarts = 0
+        self.version = 0  # bumped by every `evaluate`
+
+    @property
+    def hashrate_history(self):
+        """Hashrates in the flatline window, oldest first."""
+        return self.flatline_window.values()
+
+    def is_flatlined(self):
+        window = self.flatline_window
+        if not window.full:
+            return False
+        return window.max == window.min or window.stddev <= self.flatline_min_variation * abs(window.mean)
+
+    @staticmethod
+    def missing_settings(min_freq, max_freq, min_volt, max_volt, max_temp, max_watts):
+        required_fields = [min_freq, max_freq, min_volt, max_volt, max_temp, max_watts]
+        return any(value is None or value == "" for value in required_fields)
+
+    def update_limits(self, min_freq, max_freq, min_volt, max_volt, max_temp, max_watts, max_vr_temp=None,
+                      now=None):
+        """Switch to new AutoTuner limits without losing the tuning state.
+
+        Current settings outside the new range are clamped into it. Returns
+        True if that changed them; the caller must then apply them to the miner.
+        """
+        self.min_freq, self.max_freq = min_freq, max_freq
+        self.min_volt, self.max_volt = min_volt, max_volt
+        self.max_temp, self.max_watts, self.max_vr_temp = max_temp, max_watts, max_vr_temp
+        self.limits = policy.Limits(min_freq, max_freq, min_volt, max_volt, max_temp, max_watts, max_vr_temp)
+
+        frequency = min(max(self.current_frequency, min_freq), max_freq)
+        voltage = min(max(self.current_voltage, min_volt), max_volt)
+        changed = (frequency, voltage) != (self.current_frequency, self.current_voltage)
+        if changed:
+            self.current_frequency, self.current_voltage = frequency, voltage
+            self.last_tune_time = time.time() if now is None else now
+        self.version += 1
+        return changed
+
+    def evaluate(self, info, config, now=None):
+        """Process one telemetry reading and return HOLD, APPLY or RESTART.
+
+        On APPLY the new settings are already stored in `current_voltage` and
+        `current_frequency`; the caller only has to send them to the miner.
+        `stepping_down` tells whether the change lowered the settings.
+        """
+        now = time.time() if now is None else now
+        self.last_reason = None
+        action = self._evaluate(info, config, now)
+        if action == self.RESTART:
+            self.flatline_restarts += 1
+            FLATLINE_RESTARTS.inc(ip=self.bitaxe_ip)
+        elif action == self.APPLY:
+            (STEP_DOWNS if self.stepping_down else STEP_UPS).inc(ip=self.bitaxe_ip)
+        self.last_decision = action or "hold"
+        self.last_decision_time = now
+        self.version += 1
+        return action
+
+    def _log(self, message, level):
+        self.last_reason = message
+        self.log_callback(message, level)
+
+    def _evaluate(self, info, config, now):
+        bitaxe_ip, log_callback = self.bitaxe_ip, self._log
+        current_voltage, current_frequency = self.current_voltage, self.current_frequency
+        self.stepping_down = False
+
+        telemetry = policy.telemetry_from_info(info)
+        temp, hash_rate, power_consumption = telemetry.temp, telemetry.hashrate, telemetry.power
+        self.stats.update(info, now)
+
+        # Flatline detection
+        if isinstance(hash_rate, (int, float)):
+            self.flatline_window.push(hash_rate, now)
+        if self.flatline_enabled and self.is_flatlined():
+            log_callback(f"{bitaxe_ip} -> Flatline detected ({hash_rate} GH/s). Restarting...", "error")
+            self.flatline_window.clear()
+            self.stats.clear()
+            return self.RESTART
+
+        smoothed_hashrate = self.stats["hashrate"].ewma
+        if smoothed_hashrate is not None:
+            telemetry = telemetry._replace(hashrate=smoothed_hashrate)
+        state = policy.State(current_frequency, current_voltage, self.last_tune_time)
+        decision = policy.decide(state, telemetry, self.limits, policy.params_from_config(config), self.tier_table, now)
+        new_frequency, new_voltage = decision.frequency, decision.voltage
+
+        self.log_callback(f"{bitaxe_ip} -> Temp: {temp}°C | Hashrate: {int(hash_rate)}/{decision.expected_hashrate} GH/s | Power: {round(power_consumption,2)}W | Voltage: {current_voltage}V | Frequency: {current_frequency} MHz", "success")
+
+        reason = decision.reason
+        if reason == policy.WAIT:
+            return self.HOLD
+        if reason == policy.OVER_LIMIT_DROP:
+            log_callback(f"{bitaxe_ip} -> Dropping to tier: {new_frequency} MHz / {new_voltage} mV", "warning")
+        elif reason == policy.OVER_LIMIT_AT_MIN:
+            log_callback(f"{bitaxe_ip} -> Already at minimum tier. Holding.", "warning")
+        elif reason in (policy.RAISE_VOLTAGE, policy.RAISE_FREQUENCY, policy.AT_MAX):
+            log_callback(f"{bitaxe_ip} -> Temp {temp}°C. Checking if program should optimize.", "info")
+            if reason == policy.RAISE_VOLTAGE:
+                log_callback(f"{bitaxe_ip} -> Increasing voltage to {new_voltage}mV.", "info")
+            elif reason == policy.RAISE_FREQUENCY:
+                log_callback(f"{bitaxe_ip} -> Increasing frequency to {new_frequency}MHz.", "info")
+            else:
+                log_callback(f"{bitaxe_ip} -> Already at maximum safe settings.", "info")
+        elif reason in (policy.TIER_UP, policy.TIER_AT_MAX):
+            log_callback(f"{bitaxe_ip} -> Hashrate below target hashrate {decision.target_hashrate} GH/s.", "warning")
+            if reason == policy.TIER_UP:
+                log_callback(f"{bitaxe_ip} -> Stepping up to tier: {new_frequency} MHz / {new_voltage} mV", "info")
+        elif reason == policy.HEALTHY:
+            log_callback(f"{bitaxe_ip} -> Hashrate above target and healthy. No adjustment needed.", "success")
+        else:
+            log_callback(f"{bitaxe_ip} -> Decreasing voltage and frequency due to inefficiency.", "warning")
+
+        self.stepping_down = decision.stepping_down
+        if decision.changed(state):
+            self.current_voltage, self.current_frequency = new_voltage, new_frequency
+            self.last_tune_time = now
+            self.stats.clear("hashrate")  # readings at the old settings no longer apply
+            return self.APPLY
+
+        return self.HOLD
+
+# Newest MinerTuner per miner IP, shared with the status API
+_tuners = {}
+_tuners_lock = threading.Lock()
+
+def get_tuners():
+    """Return a {ip: MinerTuner} copy of every tuner created so far."""
+    with _tuners_lock:
+        return dict(_tuners)
+
+def create_tuner(bitaxe_ip, log_callback, min_freq, max_freq, min_volt, max_volt,
+                 max_temp, max_watts, start_freq=None, start_volt=None, max_vr_temp=None):
+    """Build a MinerTuner using the tier table and flatline settings from config.json."""
+    config = get_config_snapshot()
+    enforce_tiers = config.get("enforce_safe_pairing", False)
+    tuner = MinerTuner(bitaxe_ip, log_callback, min_freq, max_freq, min_volt, max_volt,
+                       max_temp, max_watts, start_freq, start_volt, max_vr_temp,
+                       tier_table=get_tier_table() if enforce_tiers else None,
+                       flatline_enabled=config.get("flatline_detection_enabled", True),
+                       flatline_repeat_count=config.get("flatline_hashrate_repeat_count", 5),
+                       flatline_min_variation=config.get("flatline_min_variation", 0.001),
+                       stats_window=config.get("stats_window", 12),
+                       hashrate_smoothing=config.get("hashrate_smoothing", 0.3))
+    with _tuners_lock:
+        _tuners[bitaxe_ip] = tuner
+    return tuner
+
+class MinerWorker:
+    """Handle for one miner's tuning loop in the thread engine.
+
+    Each worker has its own stop and pause events. Every wait in
+    `monitor_and_adjust` is an Event.wait on the stop event, so `stop()` ends
+    the loop at once instead of after the current step-down or flatline wait.
+    While paused the loop keeps receiving readings but makes no decisions.
+    Worker threads are daemons and never keep the process alive.
+    """
+
+    def __init__(self, miner, log_callback):
+        self.miner = miner
+        self.ip = miner["ip"]
+        self.log_callback = log_callback
+        self.stop_event = threading.Event()
+        self.pause_event = threading.Event()  # set while paused
+        self.thread = None
+        self._pending_miner = None  # new config.json entry for the loop to pick up
+        self._pending_lock = threading.Lock()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True, name=f"tuner-{self.ip}")
+        self.thread.start()
+        return self
+
+    def run(self):
+        miner = self.miner
+        monitor_and_adjust(
+            self.ip, miner.get("type"), get_config_snapshot().get("monitor_interval", MONITOR_INTERVAL),
+            self.log_callback, miner.get("min_freq"), miner.get("max_freq"), miner.get("min_volt"),
+            miner.get("max_volt"), miner.get("max_temp"), miner.get("max_watts"), miner.get("start_freq"),
+            miner.get("start_volt"), miner.get("max_vr_temp"), worker=self)
+
+    def stop(self):
+        self.stop_event.set()
+        telemetry_hub.interrupt(self.ip)  # Wake the loop if it is waiting for a reading
+
+    def update(self, miner):
+        """Hand new limits (a config.json entry) to the running loop; applied with its next reading."""
+        with self._pending_lock:
+            self.miner = self._pending_miner = miner
+
+    def take_update(self):
+        with self._pending_lock:
+            miner, self._pending_miner = self._pending_miner, None
+        return miner
+
+    def pause(self):
+        if not self.pause_event.is_set():
+            self.pause_event.set()
+            self.log_callback(f"{self.ip} -> Autotuning paused.", "warning")
+
+    def resume(self):
+        if self.pause_event.is_set():
+            self.pause_event.clear()
+            self.log_callback(f"{self.ip} -> Autotuning resumed.", "info")
+
+    @property
+    def stopped(self):
+        return self.stop_event.is_set()
+
+    @property
+    def paused(self):
+        return self.pause_event.is_set()
+
+    def is_alive(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def join(self, timeout=None):
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def sleep(self, seconds):
+        """Wait up to `seconds`; returns True as soon as the worker is stopped."""
+        return self.stop_event.wait(seconds)
+
+class TunerFleet:
+    """The running MinerWorkers of the thread engine, by miner IP.
+
+    Miners stopped with `stop_miner` stay stopped: `apply_config` leaves them
+    out until `start_miner` starts them again.
+    """
+
+    def __init__(self):
+        self._workers = {}
+        self._held = set()  # IPs stopped by the user
+        self._lock = threading.Lock()
+
+    def _register(self, worker):
+        with self._lock:
+            previous = self._workers.get(worker.ip)
+            self._workers[worker.ip] = worker
+        if previous:
+            previous.stop()
+        return worker
+
+    def start_miner(self, miner, log_callback):
+        """Start tuning `miner` (a config.json entry), replacing any worker already tuning it."""
+        with self._lock:
+            self._held.discard(miner["ip"])
+        return self._register(MinerWorker(miner, log_callback)).start()
+
+    def adopt(self, miner, log_callback):
+        """Register a worker for a loop already running on the current thread."""
+        worker = MinerWorker(miner, log_callback)
+        worker.thread = threading.current_thread()
+        return self._register(worker)
+
+    def discard(self, worker):
+        """Forget `worker` once its loop has ended (unless it was already replaced)."""
+        with self._lock:
+            if self._workers.get(worker.ip) is worker:
+                del self._workers[worker.ip]
+
+    def get(self, ip):
+        with self._lock:
+            return self._workers.get(ip)
+
+    def workers(self):
+        with self._lock:
+            return dict(self._workers)
+
+    def stop_miner(self, ip):
+        """Stop tuning `ip` until it is started again, even if config changes would otherwise restart it."""
+        worker = self.get(ip)
+        if worker:
+            with self._lock:
+                self._held.add(ip)
+            worker.stop()
+        return worker is not None
+
+    def pause_miner(self, ip):
+        worker = self.get(ip)
+        if worker:
+            worker.pause()
+        return worker is not None
+
+    def resume_miner(self, ip):
+        worker = self.get(ip)
+        if worker:
+            worker.resume()
+        return worker is not None
+
+    def apply_config(self, miners, log_callback):
+        """Bring the running workers in line with `miners` (see `tunable_miners`).
+
+        Starts workers for new miners, stops those no longer wanted and passes
+        changed limits to the rest, which keep their tuning state. Returns the
+        (started, stopped, updated) IPs.
+        """
+        running = {ip: worker.miner for ip, worker in self.workers().items() if not worker.stopped}
+        with self._lock:
+            self._held &= {miner["ip"] for miner in miners}  # forget removed or disabled miners
+            held = set(self._held)
+        start, stop, update = diff_miners(running, [miner for miner in miners if miner["ip"] not in held])
+        for ip in stop:
+            worker = self.get(ip)
+            if worker:
+                worker.stop()
+        for miner in start:
+            self.start_miner(dict(miner), log_callback)
+        for miner in update:
+            worker = self.get(miner["ip"])
+            if worker:
+                worker.update(dict(miner))
+        return [m["ip"] for m in start], stop, [m["ip"] for m in update]
+
+    def stop_all(self, timeout=1.0):
+        """Stop every worker and the telemetry polling; waits up to `timeout` seconds in total.
+
+        Returns the workers still finishing an HTTP request when the time ran out.
+        """
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+            self._held.clear()
+        for worker in workers:
+            worker.stop_event.set()
+        telemetry_hub.stop_all()  # Also wakes every loop waiting for a reading
+        deadline = time.monotonic() + timeout
+        for worker in workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        return [worker for worker in workers if worker.is_alive()]
+
+# Every miner tuned by the thread engine
+fleet = TunerFleet()
+
+def with_profile(miner, config, profile):
+    """`miner` with the limits of `profile` (from config["profiles"]) laid over it, if the profile covers it."""
+    overrides = config.get("profiles", {}).get(profile) if profile else None
+    if not overrides or ("miners" in overrides and miner["ip"] not in overrides["miners"]):
+        return miner
+    return dict(miner, **{field: overrides[field] for field in LIMIT_FIELDS if field in overrides})
+
+def tunable_miners(config, log_callback=None):
+    """Enabled miners with complete AutoTuner settings; the incomplete ones are logged and skipped.
+
+    Limits come from the scheduled limit profile in effect, if any.
+    """
+    profile = active_profile()
+    miners = []
+    for miner in config.get("miners", ()):
+        if not miner.get("enabled", False):
+            continue
+        if MinerTuner.missing_settings(*(miner.get(field) for field in REQUIRED_FIELDS)):
+            if log_callback:
+                log_callback(f"{miner['ip']} -> Missing AutoTuner settings. Skipping tuning.", "error")
+            continue
+        miners.append(with_profile(miner, config, profile))
+    return miners
+
+def diff_miners(running, miners):
+    """Compare the running {ip: miner entry} with the wanted `miners`.
+
+    Returns (miners to start, IPs to stop, miners whose limits changed).
+    Start settings only matter when a miner starts, so they are not compared.
+    """
+    wanted = {miner["ip"]: miner for miner in miners}
+    start = [miner for ip, miner in wanted.items() if ip not in running]
+    stop = [ip for ip in running if ip not in wanted]
+    update = [miner for ip, miner in wanted.items() if ip in running and
+              any(miner.get(field) != running[ip].get(field) for field in LIMIT_FIELDS)]
+    return start, stop, update
 
 def monitor_and_adjust(bitaxe_ip, bitaxe_type, interval, log_callback,
                        min_freq, max_freq, min_volt, max_volt,
-                       max_temp, max_watts, start_freq=None, start_volt=None, max_vr_temp=None):
-    """Monitor and auto-adjust miner settings dynamically based on user-defined AutoTuner settings."""
-    global running, tier_list
-
-    running = True
-    last_tune_time = 0
-
-    # Load scaling table and config
-    scaling_table = load_scaling_table()
-    config = load_config()
-    enforce_tiers = config.get("enforce_safe_pairing", False)
-    tier_list = scaling_table if enforce_tiers else []
-
-    # Flatline detection
-    hashrate_history = []
-    flatline_repeat_count = config.get("flatline_hashrate_repeat_count", 5)
-    flatline_enabled = config.get("flatline_detection_enabled", True)
-
-    required_fields = [min_freq, max_freq, min_volt, max_volt, max_temp, max_watts]
-    if any(value is None or value == "" for value in required_fields):
-        log_callback(f"{bitaxe_ip} -> Missing AutoTuner settings. Skipping tuning.", "error")
-        running = False
-        return
+                       max_temp, max_watts, start_freq=None, start_volt=None, max_vr_temp=None, worker=None):
+    """Monitor and auto-adjust miner settings dynamically based on user-defined AutoTuner settings.
 
-    current_frequency = start_freq if start_freq not in [None, ""] else min_freq
-    current_voltage = start_volt if start_volt not in [None, ""] else min_volt
+    Runs until `worker` (a MinerWorker; one is registered in `fleet` if not
+    given) is stopped.
+    """
+    if worker is None:
+        worker = fleet.adopt({"ip": bitaxe_ip, "type": bitaxe_type}, log_callback)
 
-    frequency_range = max_freq - min_freq
-    voltage_range = max_volt - min_volt
-
-    applied_settings = set_system_settings(bitaxe_ip, current_voltage, current_frequency)
+    try:
+        if MinerTuner.missing_settings(min_freq, max_freq, min_volt, max_volt, max_temp, max_watts):
+            log_callback(f"{bitaxe_ip} -> Missing AutoTuner settings. Skipping tuning.", "error")
+            return
+        _tuning_loop(worker, bitaxe_ip, log_callback, min_freq, max_freq, min_volt, max_volt,
+                     max_temp, max_watts, start_freq, start_volt, max_vr_temp)
+    finally:
+        fleet.discard(worker)
+
+def _tuning_loop(worker, bitaxe_ip, log_callback, min_freq, max_freq, min_volt, max_volt,
+                 max_temp, max_watts, start_freq, start_volt, max_vr_temp):
+    tuner = create_tuner(bitaxe_ip, log_callback, min_freq, max_freq, min_volt, max_volt,
+                         max_temp, max_watts, start_freq, start_volt, max_vr_temp)
+
+    applied_settings = set_system_settings(bitaxe_ip, tuner.current_voltage, tuner.current_frequency)
     log_callback(applied_settings, "info")
 
-    last_config_refresh = 0
-    config = load_config()
+    telemetry_hub.ensure_poller(bitaxe_ip)
+    last_seq = 0
+    interval = get_config_snapshot().get("monitor_interval", 5)
 
-    while running:
+    while not worker.stopped:
         try:
-            if time.time() - last_config_refresh > 5:
-                config = load_config()
-                last_config_refresh = time.time()
-
-            voltage_step = config.get("voltage_step", 10)
-            frequency_step = config.get("frequency_step", 5)
-            temp_tolerance = config.get("temp_tolerance", 2)
+            # Cached and only re-parsed when config.json changes on disk
+            config = get_config_snapshot()
             interval = config.get("monitor_interval", 5)
-            refresh_interval = config.get("refresh_interval", 60)
 
-            info = get_system_info(bitaxe_ip)
-            if not running:
+            miner = worker.take_update()
+            if miner is not None:
+                log_callback(f"{bitaxe_ip} -> AutoTuner limits updated.", "info")
+                if tuner.update_limits(*(miner.get(field) for field in LIMIT_FIELDS)):
+                    applied_settings = set_system_settings(bitaxe_ip, tuner.current_voltage, tuner.current_frequency)
+                    log_callback(applied_settings, "info")
+
+            # Wait for the shared poller's next reading instead of fetching it ourselves
+            snapshot = telemetry_hub.wait_for_update(bitaxe_ip, last_seq, timeout=interval * 2 + 10,
+                                                     cancel=worker.stop_event)
+            if worker.stopped:
                 break
 
+            if snapshot is None:
+                log_callback(f"{bitaxe_ip} -> No telemetry received in the last {interval * 2 + 10}s.", "error")
+                continue
+
+            last_seq = snapshot.seq
+            if worker.paused:
+                continue  # Keep up with readings, but leave the settings alone
+
+            info = snapshot.info if snapshot.ok else snapshot.error
+
             if isinstance(info, str):
                 log_callback(info, "error")
-                time.sleep(interval)
                 continue
 
             if not isinstance(info, dict):
                 log_callback(f"{bitaxe_ip} -> Unexpected system info format: {info}", "error")
-                time.sleep(interval)
                 continue
 
-            small_core_count = info.get("smallCoreCount", 0)
-            asic_count = info.get("asicCount", 0)
-            expected_hashrate = int(current_frequency * ((small_core_count * asic_count) / 1000))
-            target_hashrate = get_target_hashrate_for_freq(current_frequency, tier_list)
-
-            if target_hashrate is None:
-                log_callback(f"{bitaxe_ip} -> WARNING: No target hashrate found for {current_frequency} MHz", "warning")
-                target_hashrate = expected_hashrate
-
-            temp = info.get("temp", 0)
-            vr_temp = info.get("vrTemp", 0)
-            hash_rate = info.get("hashRate", 0)
-            power_consumption = info.get("power", 0)
-
-            # Flatline detection
-            hashrate_history.append(hash_rate)
-            if len(hashrate_history) > flatline_repeat_count:
-                hashrate_history.pop(0)
+            action = tuner.evaluate(info, config)
 
-            if flatline_enabled and len(set(hashrate_history)) == 1 and len(hashrate_history) == flatline_repeat_count:
-                log_callback(f"{bitaxe_ip} -> Flatline detected ({hash_rate} GH/s). Restarting...", "error")
+            if action == MinerTuner.RESTART:
                 restart_bitaxe(bitaxe_ip)
-                hashrate_history.clear()
-                time.sleep(60)
+                worker.sleep(FLATLINE_RESTART_WAIT)
                 continue
 
-            log_callback(f"{bitaxe_ip} -> Temp: {temp}°C | Hashrate: {int(hash_rate)}/{expected_hashrate} GH/s | Power: {round(power_consumption,2)}W | Voltage: {current_voltage}V | Frequency: {current_frequency} MHz", "success")
-
-            now = time.time()
-            new_voltage, new_frequency = current_voltage, current_frequency
-            volt_range_percent = (current_voltage - min_volt) / voltage_range
-            freq_range_percent = (current_frequency - min_freq) / frequency_range
-            stepping_down = False
-
-            # Main tuning logic
-            if now - last_tune_time >= refresh_interval:
-                if temp is None or power_consumption > max_watts or temp > max_temp or vr_temp > max_vr_temp:
-                    stepping_down = True
-                    tier_freqs = [t["frequency_(mhz)"] for t in tier_list]
-                    current_idx = tier_freqs.index(current_frequency) if current_frequency in tier_freqs else -1
-                    if current_idx > 0:
-                        new_frequency = tier_freqs[current_idx - 1]
-                        new_voltage = get_tier_voltage_for_freq(new_frequency, tier_list)
-                        log_callback(f"{bitaxe_ip} -> Dropping to tier: {new_frequency} MHz / {new_voltage} mV", "warning")
-                    else:
-                        log_callback(f"{bitaxe_ip} -> Already at minimum tier. Holding.", "warning")
-
-                elif temp < (max_temp - temp_tolerance) and power_consumption < max_watts and hash_rate < expected_hashrate:
-                    log_callback(f"{bitaxe_ip} -> Temp {temp}°C. Checking if program should optimize.", "info")
-                    if ((freq_range_percent >= 0.25 and volt_range_percent <= 0.25) or
-                        (freq_range_percent >= 0.5 and volt_range_percent <= 0.5) or
-                        (freq_range_percent >= 0.75 and volt_range_percent <= 0.75)):
-                        new_voltage += voltage_step
-                        log_callback(f"{bitaxe_ip} -> Increasing voltage to {new_voltage}mV.", "info")
-                    elif ((freq_range_percent < 0.25 and volt_range_percent <= 0.25) or
-                          (freq_range_percent < 0.5 and volt_range_percent <= 0.5) or
-                          (freq_range_percent < 0.75 and volt_range_percent <= 0.75)):
-                        new_frequency += frequency_step
-                        log_callback(f"{bitaxe_ip} -> Increasing frequency to {new_frequency}MHz.", "info")
-                    else:
-                        log_callback(f"{bitaxe_ip} -> Already at maximum safe settings.", "info")
-
-                elif hash_rate > expected_hashrate and hash_rate < target_hashrate:
-                    log_callback(f"{bitaxe_ip} -> Hashrate below target hashrate {target_hashrate} GH/s.", "warning")
-                    tier_freqs = [t["frequency_(mhz)"] for t in tier_list]
-                    current_idx = tier_freqs.index(current_frequency) if current_frequency in tier_freqs else -1
-                    if current_idx >= 0 and current_idx + 1 < len(tier_freqs):
-                        new_frequency = tier_freqs[current_idx + 1]
-                        new_voltage = get_tier_voltage_for_freq(new_frequency, tier_list)
-                        log_callback(f"{bitaxe_ip} -> Stepping up to tier: {new_frequency} MHz / {new_voltage} mV", "info")
-
-                elif hash_rate > expected_hashrate and hash_rate > target_hashrate:
-                    log_callback(f"{bitaxe_ip} -> Hashrate above target and healthy. No adjustment needed.", "success")
-
-                else:
-                    if new_voltage - voltage_step >= min_volt:
-                        new_voltage -= voltage_step
-                    else:
-                        new_voltage = min_volt
-                    if new_frequency - frequency_step >= min_freq:
-                        new_frequency -= frequency_step
-                    else:
-                        new_frequency = min_freq
-                    stepping_down = True
-                    log_callback(f"{bitaxe_ip} -> Decreasing voltage and frequency due to inefficiency.", "warning")
-
-                if new_voltage != current_voltage or new_frequency != current_frequency:
-                    applied_settings = set_system_settings(bitaxe_ip, new_voltage, new_frequency)
-                    log_callback(applied_settings, "info")
-                    current_voltage, current_frequency = new_voltage, new_frequency
-                    last_tune_time = now
-
-            if stepping_down:
-                time.sleep(interval * 3)
-            else:
-                time.sleep(interval)
+            if action == MinerTuner.APPLY:
+                applied_settings = set_system_settings(bitaxe_ip, tuner.current_voltage, tuner.current_frequency)
+                log_callback(applied_settings, "info")
+                # Watch the new settings settle at the fast poll rate; refresh_interval in policy.decide limits
+                # how often they change, so there is no extra wait after a step-down
+                telemetry_hub.expedite(bitaxe_ip)
 
         except Exception as e:
             log_callback(f"{bitaxe_ip} -> UNCAUGHT ERROR: {str(e)}", "error")
-            time.sleep(interval)
+            worker.sleep(interval)
 
     log_callback(f"{bitaxe_ip} -> Autotuning stopped.", "warning")
 
-def stop_autotuning():
-    """Stops autotuning miners globally."""
-    global running
-    running = False
+def stop_autotuning(timeout=0):
+    """Stops autotuning miners globally, waiting up to `timeout` seconds for the tuner threads."""
+    return fleet.stop_all(timeout)
+
+def start_tuning(miners, log_callback):
+    """Start tuning `miners` with the engine selected in config.json.
+
+    Returns the started AsyncTuningEngine, or the list of MinerWorkers.
+    """
+    config = get_config_snapshot()
+    start_recording(telemetry_hub, config)
+
+    if config.get("tuning_engine", "threads") == "asyncio":
+        from async_engine import AsyncTuningEngine  # Imported lazily: async_engine imports this module
+        return AsyncTuningEngine(log_callback).start(miners)
+
+    return [fleet.start_miner(miner, log_callback) for miner in miners]
 
 def start_autotuning_all(log_callback):
     """Starts autotuning for all configured miners."""
@@ -257,19 +645,19 @@ def start_autotuning_all(log_callback):
         log_callback("No miners configured. Please add miners in the GUI.", "error")
         return
 
-    threads = []
-    for miner in miners:
-        thread = threading.Thread(target=monitor_and_adjust, args=(
-            miner["ip"], miner["type"], MONITOR_INTERVAL, log_callback,
-            miner.get("min_freq"), miner.get("max_freq"),
-            miner.get("min_volt"), miner.get("max_volt"),
-            miner.get("max_temp"), miner.get("max_watts"),
-            miner.get("start_freq"), miner.get("start_volt"),
-            miner.get("max_vr_temp")
-        ))
+    return start_tuning(miners, log_callback)  # Worker handles to manage later (or the AsyncTuningEngine)
 
-        thread.start()
-        threads.append(thread)
+def start_schedules(log_callback, on_profile_change=None):
+    """Start the scheduler (or reload its jobs) from config.json: the daily reset and the "schedules".
 
-    return threads  # Return thread references to manage later
+    Scheduled restarts go through the bulk dispatcher. `on_profile_change` is
+    called when a limit profile starts or ends, to re-limit the running tuners.
+    """
+    def restart(ips, stop_event):
+        config = get_config_snapshot()
+        if ips is None:
+            ips = [miner["ip"] for miner in config.get("miners", ())]
+        results = bulk_dispatcher(config).restart(ips, log_callback, stop_event)
+        log_callback(summarize("Scheduled restart", results), "warning")
 
+    return start_scheduler(get_config_snapshot(), log_callback, restart, on_profile_change)
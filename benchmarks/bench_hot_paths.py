@@ -0,0 +1,301 @@
+"""Benchmark the polling, scanning, tuning and config hot paths against `simulator.py`.
+
+    python benchmarks/bench_hot_paths.py --json results.json
+    python benchmarks/bench_hot_paths.py --only scan latency --requests 2000
+
+Benchmarks (all results go into one JSON document for comparing releases):
+
+  scan         detect_miners over a /24 of loopback addresses, some of them simulated miners
+  latency      get_system_info round-trip percentiles, sync BitaxeClient and AsyncBitaxeClient
+  decisions    MinerTuner.evaluate calls per second, and policy.decide_batch over a 1000-miner fleet
+  config       load_config / get_config_snapshot / save_config cost as the miners list grows
+  display      update_miner_display: time until every table row shows a new reading (needs a display)
+
+The simulator runs in a separate process so it doesn't compete for this
+process's GIL. Scanning uses one loopback address per miner and needs Linux,
+where all of 127.0.0.0/8 is routed to lo. Everything runs in a scratch
+directory, so the real config.json is never touched.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIM_BASE_PORT = 22000
+SCAN_HOSTS = "127.21.0.1-127.21.0.{last}"
+SCAN_RANGE = "127.21.0.0/24"
+SCAN_PORT = 18080
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+
+    def pick(fraction):
+        return round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 3)
+
+    return {"p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99), "max_ms": round(samples[-1] * 1000, 3),
+            "mean_ms": round(statistics.mean(samples) * 1000, 3)}
+
+
+def start_simulator(*args):
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "simulator.py"), "--quiet", *args],
+                               stdout=subprocess.PIPE, text=True)
+    if process.stdout.readline().strip() != "ready":
+        process.kill()
+        raise RuntimeError("simulator did not start")
+    return process
+
+
+def write_config(miners=(), **settings):
+    config = {"voltage_step": 10, "frequency_step": 5, "monitor_interval": 5, "temp_tolerance": 2,
+              "refresh_interval": 0, "enforce_safe_pairing": False, "history_enabled": False,
+              "status_api_enabled": False, "log_file": "", "miners": list(miners)}
+    config.update(settings)
+    with open("config.json", "w") as file:
+        json.dump(config, file)
+
+
+def make_miner(ip, idx=0):
+    return {"nickname": f"sim-{idx}", "type": "Gamma", "ip": ip, "enabled": True,
+            "min_freq": 400, "max_freq": 650, "start_freq": 525, "min_volt": 1000, "max_volt": 1300,
+            "start_volt": 1150, "max_temp": 65, "max_watts": 22, "max_vr_temp": 70}
+
+
+def bench_scan(args):
+    if platform.system() != "Linux":
+        return {"skipped": "needs Linux loopback addressing (127.0.0.0/8 on lo)"}
+    import config
+    write_config()
+    server = start_simulator("--hosts", SCAN_HOSTS.format(last=args.scan_miners), "--port", str(SCAN_PORT))
+    try:
+        addresses = len(config.parse_ip_ranges(SCAN_RANGE))
+        runs = []
+        for _ in range(args.repeat):
+            write_config()  # forget what the previous run found
+            start = time.perf_counter()
+            found = config.detect_miners(ranges=[SCAN_RANGE], port=SCAN_PORT)
+            runs.append((time.perf_counter() - start, len(found)))
+    finally:
+        server.terminate()
+        server.wait()
+    seconds = statistics.median(run[0] for run in runs)
+    return {"addresses": addresses, "miners": args.scan_miners, "found": min(run[1] for run in runs),
+            "seconds": round(seconds, 3), "addresses_per_s": round(addresses / seconds, 1),
+            "note": "closed loopback ports refuse instantly; empty LAN addresses wait for the 1 s scan timeout"}
+
+
+def bench_latency(args):
+    from bitaxe_api import BitaxeClient
+    from async_engine import AsyncBitaxeClient
+    server = start_simulator("--miners", str(args.latency_miners), "--base-port", str(SIM_BASE_PORT))
+    ips = [f"127.0.0.1:{SIM_BASE_PORT + idx}" for idx in range(args.latency_miners)]
+    try:
+        client = BitaxeClient()
+        for ip in ips:  # open the keep-alive connections first
+            client.get_system_info(ip)
+        sync_samples = []
+        for idx in range(args.requests):
+            start = time.perf_counter()
+            client.get_system_info(ips[idx % len(ips)])
+            sync_samples.append(time.perf_counter() - start)
+        client.close()
+
+        async def run_async():
+            async_client = AsyncBitaxeClient()
+            samples = []
+
+            async def fetch(ip):
+                start = time.perf_counter()
+                await async_client.get_system_info(ip)
+                samples.append(time.perf_counter() - start)
+
+            await asyncio.gather(*(async_client.get_system_info(ip) for ip in ips))
+            samples.clear()
+            start = time.perf_counter()
+            for offset in range(0, args.requests, len(ips)):  # one request per miner at a time, all miners at once
+                await asyncio.gather(*(fetch(ip) for ip in ips[:args.requests - offset]))
+            elapsed = time.perf_counter() - start
+            async_client.close()
+            return samples, elapsed
+
+        async_samples, async_elapsed = asyncio.run(run_async())
+    finally:
+        server.terminate()
+        server.wait()
+    return {"miners": len(ips), "requests": args.requests,
+            "sync_sequential": percentiles(sync_samples),
+            "async_concurrent": dict(percentiles(async_samples),
+                                     requests_per_s=round(len(async_samples) / async_elapsed, 1))}
+
+
+def bench_decisions(args):
+    import random
+    import policy
+    from autotune import MinerTuner, get_tier_table
+    write_config()
+    rng = random.Random(1)
+    config = {"voltage_step": 10, "frequency_step": 5, "temp_tolerance": 2, "refresh_interval": 0}
+    readings = [{"temp": rng.uniform(50, 70), "vrTemp": rng.uniform(45, 75), "power": rng.uniform(12, 24),
+                 "hashRate": rng.uniform(800, 1300), "smallCoreCount": 2040, "asicCount": 1}
+                for _ in range(1000)]
+    results = {}
+    for label, tiers in (("free", None), ("tiers", get_tier_table())):
+        tuner = MinerTuner("bench", lambda message, level="info": None, 400, 650, 1000, 1300, 65, 22, 525, 1150, 70,
+                           tier_table=tiers, flatline_enabled=True)
+        start = time.perf_counter()
+        for idx in range(args.decisions):
+            tuner.evaluate(readings[idx % len(readings)], config, now=idx)
+        elapsed = time.perf_counter() - start
+        results[label] = {"decisions": args.decisions, "decisions_per_s": round(args.decisions / elapsed),
+                          "us_per_decision": round(elapsed / args.decisions * 1e6, 2)}
+
+    # policy.decide_batch: one pass over a whole fleet's readings
+    states = {"frequency": [rng.choice(get_tier_table().frequencies or [525]) for _ in readings],
+              "voltage": [rng.randint(1000, 1300) for _ in readings], "last_tune_time": [0] * len(readings)}
+    telemetry = {"temp": [r["temp"] for r in readings], "vr_temp": [r["vrTemp"] for r in readings],
+                 "hashrate": [r["hashRate"] for r in readings], "power": [r["power"] for r in readings],
+                 "small_core_count": [2040] * len(readings), "asic_count": [1] * len(readings)}
+    limits = {field: [value] * len(readings) for field, value in
+              zip(policy.Limits._fields, (400, 650, 1000, 1300, 65, 22, 70))}
+    params = policy.params_from_config(config)
+    for label, use_numpy in (("batch_numpy", True), ("batch_python", False)):
+        if use_numpy and policy._numpy() is None:
+            results[label] = {"skipped": "numpy not installed"}
+            continue
+        passes = max(1, args.decisions // len(readings))
+        start = time.perf_counter()
+        for _ in range(passes):
+            policy.decide_batch(states, telemetry, limits, params, get_tier_table(), 1, use_numpy=use_numpy)
+        elapsed = time.perf_counter() - start
+        results[label] = {"fleet": len(readings), "ms_per_fleet": round(elapsed / passes * 1000, 3),
+                          "decisions_per_s": round(passes * len(readings) / elapsed)}
+    return results
+
+
+def bench_config(args):
+    import config as config_module
+    results = []
+    for count in args.config_miners:
+        write_config([make_miner(f"10.{idx // 65536}.{idx // 256 % 256}.{idx % 256}", idx) for idx in range(count)])
+        os.utime("config.json")  # force a re-parse on the first read
+        start = time.perf_counter()
+        config_module.get_config_snapshot()
+        cold_parse = time.perf_counter() - start
+
+        def timed(function, repeat):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                function()
+            return (time.perf_counter() - start) / repeat * 1000
+
+        loaded = config_module.load_config()
+        results.append({
+            "miners": count,
+            "file_kb": round(os.path.getsize("config.json") / 1024, 1),
+            "cold_parse_ms": round(cold_parse * 1000, 3),
+            "snapshot_ms": round(timed(config_module.get_config_snapshot, 1000), 4),
+            "load_config_ms": round(timed(config_module.load_config, 50), 3),
+            "save_config_ms": round(timed(lambda: config_module.save_config(loaded), 10), 3),
+            "update_miner_ms": round(timed(lambda: config_module.update_miner(loaded["miners"][-1]["ip"],
+                                                                             {"max_temp": 66}), 10), 3),
+        })
+    return results
+
+
+def bench_display(args):
+    write_config([make_miner(f"10.0.{idx // 256}.{idx % 256}", idx) for idx in range(args.display_miners)])
+    try:
+        import gui
+        app = gui.BitaxeAutotuningApp()
+    except Exception as e:  # tkinter missing or no display (e.g. headless CI)
+        return {"skipped": str(e).splitlines()[0]}
+
+    from autotune import telemetry_hub
+    from simulator import SimulatedMiner
+    readings = {ip: SimulatedMiner(ip).info() for ip in app.tree_items_by_ip}
+    app.running = True
+    app.update_miner_display(5)
+    app.root.update()
+
+    timings = []
+    for round_idx in range(args.repeat):
+        start = time.perf_counter()
+        for ip, info in readings.items():
+            info["hashRate"] = 1000 + round_idx  # every row changes
+            telemetry_hub.publish(ip, dict(info))
+        # The worker wakes at most every monitor_interval; restart it so each round starts immediately
+        app.display_stop.set()
+        app.display_thread.join()
+        app.update_miner_display(5)
+        expected = f"{1000 + round_idx:.2f} GH/s"
+        last_item = app.tree_items_by_ip[list(readings)[-1]]
+        deadline = start + 60
+        while app.tree.set(last_item, "Current Hash Rate") != expected:
+            if time.perf_counter() > deadline:
+                raise RuntimeError("display did not refresh within 60 s")
+            app.root.update()
+        timings.append(time.perf_counter() - start)
+
+    app.display_stop.set()
+    app.root.destroy()
+    return {"miners": args.display_miners, "full_refresh_ms": round(statistics.median(timings) * 1000, 1)}
+
+
+BENCHMARKS = {"scan": bench_scan, "latency": bench_latency, "decisions": bench_decisions, "config": bench_config,
+              "display": bench_display}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scan-miners", type=int, default=50, help="simulated miners inside the scanned /24")
+    parser.add_argument("--latency-miners", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--decisions", type=int, default=100000)
+    parser.add_argument("--config-miners", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--display-miners", type=int, default=300)
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)  # relative to where the script was started, not the work dir
+
+    sys.path.insert(0, REPO_ROOT)
+    workdir = tempfile.mkdtemp(prefix="bitaxe-bench-")
+    shutil.copy(os.path.join(REPO_ROOT, "cpu_voltage_scaling_safeguards.csv"), workdir)
+    os.chdir(workdir)
+
+    report = {"revision": git_revision(), "python": platform.python_version(), "platform": platform.platform(),
+              "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "results": {}}
+    try:
+        for name in args.only:
+            print(f"Running {name}...", file=sys.stderr, flush=True)
+            report["results"][name] = BENCHMARKS[name](args)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Measure application start-up: `main.py` imports through to the first Tk window.
+
+Each run starts a fresh interpreter that imports the same modules as
+`main.py`, builds `BitaxeAutotuningApp`, draws it once and exits. Reports the
+median import time, time to first window, whole-process wall time and peak RSS.
+Without a display only the import phase is measured.
+
+    python benchmarks/bench_startup.py --runs 5 --json startup.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+import gui
+imported = time.perf_counter()
+result = {"import_s": imported - start, "window_s": None}
+try:
+    app = gui.BitaxeAutotuningApp()
+    app.root.update()
+    result["window_s"] = time.perf_counter() - start
+    app.root.destroy()
+except Exception as e:  # No display available (e.g. headless CI)
+    result["window_error"] = str(e).splitlines()[0]
+result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(result))
+"""
+
+
+def run_once(workdir):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", CHILD, REPO_ROOT], cwd=workdir, capture_output=True, text=True,
+                            check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    # Run from a scratch copy so start-up never rewrites the real config.json
+    workdir = tempfile.mkdtemp(prefix="bitaxe-startup-")
+    if os.path.exists(os.path.join(REPO_ROOT, "config.json")):
+        shutil.copy(os.path.join(REPO_ROOT, "config.json"), workdir)
+    try:
+        runs = [run_once(workdir) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    def median(key):
+        values = [run[key] for run in runs if run.get(key) is not None]
+        return round(statistics.median(values), 4) if values else None
+
+    summary = {
+        "runs": args.runs,
+        "import_s": median("import_s"),
+        "first_window_s": median("window_s"),
+        "process_s": median("process_s"),
+        "peak_rss_mb": median("peak_rss_mb"),
+    }
+    if summary["first_window_s"] is None:
+        summary["window_error"] = runs[0].get("window_error")
+
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
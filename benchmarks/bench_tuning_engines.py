@@ -0,0 +1,113 @@
+"""Compare the thread-per-miner engine with the asyncio engine.
+
+Starts `simulator.py` (one listening port per simulated miner, all on one
+asyncio loop in a separate process), then runs each tuning engine in a
+fresh subprocess for a fixed time and reports peak RSS, CPU use, thread count
+and readings processed per second.
+
+    python benchmarks/bench_tuning_engines.py --miners 50 200 1000 --duration 20
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_PORT = 21000
+
+
+def run_engine(engine, count, base_port, duration):
+    """Run one engine in this process and print a JSON result line."""
+    workdir = tempfile.mkdtemp(prefix="bitaxe-bench-")
+    miners = [{
+        "nickname": f"sim-{i}", "type": "Gamma", "ip": f"127.0.0.1:{base_port + i}", "enabled": True,
+        "min_freq": 500, "max_freq": 600, "start_freq": 500, "min_volt": 1100, "max_volt": 1200,
+        "start_volt": 1100, "max_temp": 65, "max_watts": 20, "max_vr_temp": 70,
+    } for i in range(count)]
+    with open(os.path.join(workdir, "config.json"), "w") as file:
+        json.dump({"voltage_step": 10, "frequency_step": 5, "monitor_interval": 1, "temp_tolerance": 2,
+                   "refresh_interval": 1, "enforce_safe_pairing": False, "flatline_detection_enabled": False,
+                   "tuning_engine": engine, "miners": miners}, file)
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_ROOT)
+
+    import autotune
+
+    readings = []
+
+    def log_callback(message, level="info"):
+        if level == "success" and "Temp:" in message:
+            readings.append(1)
+
+    cpu_start, wall_start = time.process_time(), time.monotonic()
+    if engine == "asyncio":
+        from async_engine import AsyncTuningEngine
+        handle = AsyncTuningEngine(log_callback).start(miners)
+    else:
+        handle = [autotune.fleet.start_miner(miner, log_callback) for miner in miners]
+
+    time.sleep(duration)
+    peak_threads = threading.active_count()
+    cpu, wall = time.process_time() - cpu_start, time.monotonic() - wall_start
+    processed = len(readings)
+
+    if engine == "asyncio":
+        handle.stop()
+    else:
+        autotune.stop_autotuning()
+
+    print(json.dumps({
+        "engine": engine, "miners": count, "duration_s": round(wall, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "cpu_percent": round(100 * cpu / wall, 1), "threads": peak_threads,
+        "readings_per_s": round(processed / wall, 1),
+    }), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--miners", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--engines", nargs="+", default=["threads", "asyncio"], choices=["threads", "asyncio"])
+    parser.add_argument("--duration", type=float, default=20, help="seconds to run each engine")
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--engine", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        run_engine(args.engine, args.miners[0], BASE_PORT, args.duration)
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = max(args.miners) * 3 + 256
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+    results = []
+    for count in args.miners:
+        server = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "simulator.py"), "--miners", str(count),
+                                   "--base-port", str(BASE_PORT), "--quiet"], stdout=subprocess.PIPE, text=True)
+        try:
+            server.stdout.readline()  # wait for "ready"
+            for engine in args.engines:
+                output = subprocess.run([sys.executable, __file__, "--engine", engine, "--miners", str(count),
+                                         "--duration", str(args.duration)],
+                                        capture_output=True, text=True, check=True).stdout
+                results.append(json.loads(output.strip().splitlines()[-1]))
+                print("{engine:>8} {miners:>5} miners: {peak_rss_mb:>7} MB RSS  {cpu_percent:>5}% CPU  "
+                      "{threads:>5} threads  {readings_per_s:>7} readings/s".format(**results[-1]), flush=True)
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
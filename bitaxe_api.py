@@ -0,0 +1,112 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+IDEMPOTENT_METHODS = {"GET", "PATCH", "PUT", "DELETE"}
+RETRY_STATUS_CODES = {500, 502, 503, 504}
+
+
+class BitaxeClient:
+    """HTTP client for the Bitaxe REST API.
+
+    Keeps one keep-alive `requests.Session` per miner so repeated polls reuse the
+    same TCP connection, applies separate connect/read timeouts, and retries
+    transient failures with exponential backoff. Safe to share between threads.
+    """
+
+    def __init__(self, connect_timeout=3, read_timeout=10, retries=2, backoff=0.5, backoff_max=5,
+                 pool_maxsize=4):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.pool_maxsize = pool_maxsize
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a client from the optional http_* keys in config.json."""
+        return cls(
+            connect_timeout=config.get("http_connect_timeout", 3),
+            read_timeout=config.get("http_read_timeout", 10),
+            retries=config.get("http_retries", 2),
+            backoff=config.get("http_backoff", 0.5),
+        )
+
+    def _session(self, ip):
+        with self._lock:
+            session = self._sessions.get(ip)
+            if session is None:
+                session = requests.Session()
+                # One small pool per miner; retries are handled in request() so backoff is ours
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                session.mount("http://", adapter)
+                self._sessions[ip] = session
+            return session
+
+    def forget_host(self, ip):
+        """Close and drop the session for `ip` (e.g. after a scan miss or miner removal)."""
+        with self._lock:
+            session = self._sessions.pop(ip, None)
+        if session:
+            session.close()
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def _should_retry(self, method, error=None, status_code=None):
+        if status_code is not None:
+            return method in IDEMPOTENT_METHODS and status_code in RETRY_STATUS_CODES
+        if method in IDEMPOTENT_METHODS:
+            return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        # Never resend a restart that may already have been received (read timeout)
+        return isinstance(error, requests.exceptions.ConnectionError)
+
+    def request(self, method, ip, path, timeout=None, retries=None, **kwargs):
+        """Send a request to http://{ip}{path}, retrying transient errors.
+
+        Returns the successful `requests.Response`; raises the last
+        `requests.exceptions.RequestException` once retries are exhausted.
+        """
+        method = method.upper()
+        timeout = timeout if timeout is not None else (self.connect_timeout, self.read_timeout)
+        retries = self.retries if retries is None else retries
+        url = f"http://{ip}{path}"
+
+        attempt = 0
+        while True:
+            try:
+                response = self._session(ip).request(method, url, timeout=timeout, **kwargs)
+                if attempt < retries and self._should_retry(method, status_code=response.status_code):
+                    response.close()
+                else:
+                    response.raise_for_status()
+                    return response
+            except requests.exceptions.HTTPError:
+                raise
+            except requests.exceptions.RequestException as e:
+                if attempt >= retries or not self._should_retry(method, error=e):
+                    raise
+
+            time.sleep(min(self.backoff * (2 ** attempt), self.backoff_max))
+            attempt += 1
+
+    def get_system_info(self, ip, **kwargs):
+        """GET /api/system/info and return the decoded JSON payload."""
+        return self.request("GET", ip, "/api/system/info", **kwargs).json()
+
+    def update_system(self, ip, settings, **kwargs):
+        """PATCH /api/system with the given settings dict."""
+        return self.request("PATCH", ip, "/api/system", json=settings, **kwargs)
+
+    def restart(self, ip, **kwargs):
+        """POST /api/system/restart."""
+        return self.request("POST", ip, "/api/system/restart", **kwargs)
@@ -1,74 +1,278 @@
+import copy
 import json
 import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 import requests
+from types import MappingProxyType
 import ipaddress
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bitaxe_api import BitaxeClient
 
 CONFIG_FILE = "config.json"
 
-def detect_miners(start_ip, end_ip):
-    """Scan a user-defined IP range and detect Bitaxe miners."""
+DEFAULT_SCAN_WORKERS = 64
+DEFAULT_SCAN_MAX_ADDRESSES = 65536  # a /16; larger scans are almost always a typo such as /8
+SCAN_TIMEOUT = 1
+
+def parse_ip_ranges(ranges, max_addresses=DEFAULT_SCAN_MAX_ADDRESSES):
+    """Expand IP range specs into a list of unique IPv4 address strings.
+
+    Each spec may be a CIDR block ("192.168.1.0/24"), a dash range
+    ("192.168.1.10-192.168.1.50") or a single address. `ranges` may be a list
+    of specs or a single comma-separated string. Raises ValueError on bad input,
+    or before expanding anything if the specs cover more than `max_addresses`.
+    """
+    if isinstance(ranges, str):
+        ranges = ranges.split(",")
+
+    addresses = []
+    seen = set()
+    total = 0
+    for spec in ranges:
+        spec = spec.strip()
+        if not spec:
+            continue
+
+        if "/" in spec:
+            network = ipaddress.IPv4Network(spec, strict=False)
+            size = network.num_addresses
+            hosts = network.hosts() if size > 2 else iter(network)
+            candidates = (str(ip) for ip in hosts)
+        elif "-" in spec:
+            first, last = (part.strip() for part in spec.split("-", 1))
+            first = int(ipaddress.IPv4Address(first))
+            last = int(ipaddress.IPv4Address(last))
+            if last < first:
+                raise ValueError(f"Invalid IP range {spec}: end address is before start address")
+            size = last - first + 1
+            candidates = (str(ipaddress.IPv4Address(ip)) for ip in range(first, last + 1))
+        else:
+            size = 1
+            candidates = [str(ipaddress.IPv4Address(spec))]
+
+        total += size
+        if max_addresses is not None and total > max_addresses:
+            raise ValueError(f"{spec} takes the scan to {total} addresses, more than the {max_addresses} allowed "
+                             f"(scan_max_addresses)")
+
+        for ip_str in candidates:
+            if ip_str not in seen:
+                seen.add(ip_str)
+                addresses.append(ip_str)
+
+    return addresses
+
+# Scan probes get a short timeout and no retries: most scanned addresses are empty
+scan_client = BitaxeClient(connect_timeout=SCAN_TIMEOUT, read_timeout=SCAN_TIMEOUT, retries=0, pool_maxsize=1)
+
+def probe_miner(ip, client=scan_client):
+    """Return the /api/system/info payload if a Bitaxe answers at `ip`, else None."""
+    try:
+        return client.get_system_info(ip)
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    finally:
+        client.forget_host(ip)  # Scanned hosts are not polled again through this client
+
+def detect_miners(start_ip=None, end_ip=None, ranges=None, max_workers=None, on_found=None, port=None):
+    """Scan IP ranges concurrently and detect Bitaxe miners.
+
+    Either pass `start_ip`/`end_ip` or `ranges` (CIDR blocks, dash ranges or
+    single addresses, see `parse_ip_ranges`); with neither, the "scan_ranges"
+    list from config.json is used. Up to `max_workers` addresses are
+    probed in parallel, and `on_found(miner)` is called as soon as each new miner
+    answers so callers can show results while the scan is still running.
+    Newly detected miners are saved to config.json in a single write at the end.
+    """
+    config = get_config_snapshot()
+
+    specs = list(ranges or []) if not isinstance(ranges, str) else [ranges]
+    if start_ip:
+        specs.append(f"{start_ip}-{end_ip}" if end_ip else start_ip)
+    if not specs:
+        specs = config.get("scan_ranges", [])
 
-    # Convert IPs to IPv4 objects
     try:
-        start_ip = ipaddress.IPv4Address(start_ip)
-        end_ip = ipaddress.IPv4Address(end_ip)
-    except ipaddress.AddressValueError:
-        print("Error: Invalid IP range provided.")
+        addresses = parse_ip_ranges(specs, config.get("scan_max_addresses", DEFAULT_SCAN_MAX_ADDRESSES))
+    except ValueError as e:
+        print(f"Error: Invalid IP range provided: {e}")
         return []
 
+    if not addresses:
+        print("Error: No IP range provided.")
+        return []
+
+    if max_workers is None:
+        max_workers = config.get("scan_workers", DEFAULT_SCAN_WORKERS)
+    if port:
+        addresses = [f"{ip}:{port}" for ip in addresses]
+
+    known_ips = {m["ip"] for m in config["miners"]}
+    addresses = [ip for ip in addresses if ip not in known_ips]  # Prevent duplicate miner entries
     detected_miners = []
-    config = load_config()
 
-    for ip in range(int(start_ip), int(end_ip) + 1):
-        ip_str = str(ipaddress.IPv4Address(ip))
-        try:
-            response = requests.get(f"http://{ip_str}/api/system/info", timeout=1)
-            if response.status_code == 200:
-                miner_info = response.json()
-                model = miner_info.get("model", "Unknown")
-
-                # Prevent duplicate miner entries
-                if not any(m["ip"] == ip_str for m in config["miners"]):
-                    detected_miners.append({
-                        "nickname": f"Miner-{ip_str}",
-                        "ip": ip_str,
-                        "type": model,
-                        "min_freq": miner_info.get("min_freq", ""),
-                        "max_freq": miner_info.get("max_freq", ""),
-                        "min_volt": miner_info.get("min_volt", ""),
-                        "max_volt": miner_info.get("max_volt", ""),
-                        "max_temp": miner_info.get("max_temp", ""),
-                        "max_watts": miner_info.get("max_watts", ""),
-                        "max_vr_temp": miner_info.get("max_vr_temp", ""),  # <- ADD THIS
-                        "target_hashrate": miner_info.get("target_hashrate", "")
-                    })
-                    print(f"Detected miner: {model} at {ip_str}, added as {detected_miners[-1]['nickname']}")
-
-        except requests.exceptions.RequestException:
-            continue
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(addresses) or 1))) as executor:
+        futures = {executor.submit(probe_miner, ip_str): ip_str for ip_str in addresses}
+        for future in as_completed(futures):
+            miner_info = future.result()
+            if miner_info is None:
+                continue
+
+            ip_str = futures[future]
+            model = miner_info.get("model", "Unknown")
+            miner = {
+                "nickname": f"Miner-{ip_str}",
+                "ip": ip_str,
+                "type": model,
+                "min_freq": miner_info.get("min_freq", ""),
+                "max_freq": miner_info.get("max_freq", ""),
+                "min_volt": miner_info.get("min_volt", ""),
+                "max_volt": miner_info.get("max_volt", ""),
+                "max_temp": miner_info.get("max_temp", ""),
+                "max_watts": miner_info.get("max_watts", ""),
+                "max_vr_temp": miner_info.get("max_vr_temp", ""),  # <- ADD THIS
+                "target_hashrate": miner_info.get("target_hashrate", "")
+            }
+            detected_miners.append(miner)
+            print(f"Detected miner: {model} at {ip_str}, added as {miner['nickname']}")
+
+            if on_found:
+                on_found(miner)
 
     if detected_miners:
-        config["miners"].extend(detected_miners)
-        save_config(config)
+        order = {ip_str: idx for idx, ip_str in enumerate(addresses)}
+        detected_miners.sort(key=lambda m: order[m["ip"]])
+        # Merge into the current file, not the copy read before the scan, in one write
+        with config_batch() as current:
+            known_ips = {m["ip"] for m in current["miners"]}
+            new_miners = [m for m in detected_miners if m["ip"] not in known_ips]
+            if new_miners:
+                current["miners"].extend(new_miners)
+                _mark_batch_dirty()
 
     return detected_miners
 
-def load_config():
-    """Load configuration settings from config.json."""
-    if not os.path.exists(CONFIG_FILE):
-        save_config(get_default_config())
+# Parsed config.json, shared by every reader until the file changes on disk.
+# _config_lock serialises every read-modify-write of the file within the process.
+_config_lock = threading.RLock()
+_config_cache = {"key": None, "config": None, "snapshot": None}
+_config_batch = {"config": None, "depth": 0, "dirty": False}
 
-    try:
-        with open(CONFIG_FILE, "r") as file:
-            return json.load(file)
-    except (json.JSONDecodeError, FileNotFoundError):
-        save_config(get_default_config())
-        return get_default_config()
+def _config_file_key():
+    """Identify the current contents of config.json by mtime, size and inode."""
+    stat = os.stat(CONFIG_FILE)
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _refresh_config_cache():
+    """Re-parse config.json if it changed since it was cached. Returns the cached dict."""
+    with _config_lock:
+        if not os.path.exists(CONFIG_FILE):
+            save_config(get_default_config())
+
+        key = _config_file_key()
+        if key == _config_cache["key"]:
+            return _config_cache["config"]
+
+        try:
+            with open(CONFIG_FILE, "r") as file:
+                config = json.load(file)
+        except (json.JSONDecodeError, FileNotFoundError) as e:
+            if _config_cache["config"] is not None:
+                return _config_cache["config"]  # Keep the last good copy; retried on the next call
+
+            # Never overwrite an unreadable config: keep a backup and run on defaults in memory
+            backup = f"{CONFIG_FILE}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+            shutil.copy2(CONFIG_FILE, backup)
+            print(f"Error: {CONFIG_FILE} could not be parsed ({e}). Saved a copy to {backup}; using defaults.")
+            config = get_default_config()
+
+        _config_cache.update(key=key, config=config, snapshot=None)
+        return config
+
+def get_config_snapshot():
+    """Return a read-only view of config.json for readers.
+
+    The file is parsed once and re-read only when its mtime/size changes, so
+    tuner threads and UI refreshes can call this as often as they like. Use
+    `load_config` instead when the result will be modified and saved.
+    """
+    with _config_lock:
+        _refresh_config_cache()
+        if _config_cache["snapshot"] is None:
+            _config_cache["snapshot"] = _freeze(_config_cache["config"])
+        return _config_cache["snapshot"]
+
+def load_config():
+    """Load configuration settings from config.json as a mutable copy."""
+    with _config_lock:
+        return copy.deepcopy(_refresh_config_cache())
 
 def save_config(config):
-    """Save configuration settings to config.json."""
-    with open(CONFIG_FILE, "w") as file:
-        json.dump(config, file, indent=4)
+    """Save configuration settings to config.json atomically.
+
+    The JSON is written to a temporary file in the same directory, flushed to
+    disk and renamed over config.json, so readers only ever see the old or the
+    new file, never a partially written one. The file keeps its permissions
+    (0644 when it is created).
+    """
+    with _config_lock:
+        directory = os.path.dirname(os.path.abspath(CONFIG_FILE))
+        try:
+            mode = os.stat(CONFIG_FILE).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o644
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".config-", suffix=".tmp")
+        try:
+            os.chmod(tmp_path, mode)  # mkstemp creates it 0600
+            with os.fdopen(fd, "w") as file:
+                json.dump(config, file, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, CONFIG_FILE)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        _config_cache.update(key=_config_file_key(), config=copy.deepcopy(config), snapshot=None)
+
+@contextmanager
+def config_batch():
+    """Group several config changes into a single locked, atomic write.
+
+    Yields the mutable config. `add_miner`, `update_miner` and `remove_miner`
+    called inside the block (even from nested batches) edit this same copy,
+    and config.json is written once when the outermost block exits without an
+    exception and something changed. Other threads wait on the config lock
+    for the duration, so keep the block short.
+    """
+    with _config_lock:
+        outermost = _config_batch["depth"] == 0
+        if outermost:
+            _config_batch.update(config=load_config(), dirty=False)
+        _config_batch["depth"] += 1
+        try:
+            yield _config_batch["config"]
+            if outermost and _config_batch["dirty"]:
+                save_config(_config_batch["config"])
+        finally:
+            _config_batch["depth"] -= 1
+            if outermost:
+                _config_batch.update(config=None, dirty=False)
+
+def _mark_batch_dirty():
+    _config_batch["dirty"] = True
 
 def get_default_config():
     return {
@@ -81,12 +285,14 @@ def get_default_config():
         "enforce_safe_pairing": True,
         "daily_reset_enabled": False,
         "daily_reset_time": "03:00",
+        "profiles": {},
+        "schedules": [],
         "miners": []
     }
 
 def get_miner_defaults(miner_ip):
-    """Returns the AutoTuner settings for a given miner's IP address."""
-    config = load_config()
+    """Returns the AutoTuner settings for a given miner's IP address (read-only)."""
+    config = get_config_snapshot()
     for miner in config["miners"]:
         if miner["ip"] == miner_ip:
             return miner  # Return the miner's settings
@@ -94,8 +300,10 @@ def get_miner_defaults(miner_ip):
 
 def add_miner(miner_type, ip, nickname=""):
     """Adds a new miner with default settings based on type, including nickname."""
-    config = load_config()
+    with config_batch() as config:
+        _add_miner(config, miner_type, ip, nickname)
 
+def _add_miner(config, miner_type, ip, nickname):
     # Prevent duplicate miner entries
     if any(miner["ip"] == ip for miner in config["miners"]):
         print(f"Error: Miner with IP {ip} already exists.")
@@ -118,42 +326,44 @@ def add_miner(miner_type, ip, nickname=""):
     }
 
     config["miners"].append(new_miner)
-    save_config(config)
+    _mark_batch_dirty()
     print(f"Added new miner: ({miner_type}) at {ip} with nickname '{nickname}'")
 
 def remove_miner(ip):
     """Removes a miner from the config by IP address."""
-    config = load_config()
-    new_miners = [miner for miner in config["miners"] if miner["ip"] != ip]
+    with config_batch() as config:
+        new_miners = [miner for miner in config["miners"] if miner["ip"] != ip]
 
-    if len(new_miners) == len(config["miners"]):
-        print(f"Error: Miner with IP {ip} not found.")
-        return
+        if len(new_miners) == len(config["miners"]):
+            print(f"Error: Miner with IP {ip} not found.")
+            return
 
-    config["miners"] = new_miners
-    save_config(config)
+        config["miners"] = new_miners
+        _mark_batch_dirty()
     print(f"Removed miner with IP: {ip}")
 
 def update_miner(ip, new_settings):
     """Updates an existing miner's settings in config.json."""
-    config = load_config()
-    updated = False
+    with config_batch() as config:
+        for miner in config["miners"]:
+            if miner["ip"] == ip:
+                miner.update(new_settings)
+                _mark_batch_dirty()
+                break
+        else:
+            print(f"Error: Miner {ip} not found.")
+            return
+    print(f"Updated miner {ip} settings successfully.")
 
-    for miner in config["miners"]:
-        if miner["ip"] == ip:
-            miner.update(new_settings)
-            updated = True
-            break
-
-    if updated:
-        save_config(config)
-        print(f"Updated miner {ip} settings successfully.")
-    else:
-        print(f"Error: Miner {ip} not found.")
+def update_settings(new_settings):
+    """Updates global settings (top-level keys other than "miners") in config.json."""
+    with config_batch() as config:
+        config.update(new_settings)
+        _mark_batch_dirty()
 
 def get_miners():
-    """Returns the list of configured miners."""
-    return load_config().get("miners", [])
+    """Returns the configured miners (read-only)."""
+    return get_config_snapshot().get("miners", ())
 
 def reset_config():
     """Resets configuration to default settings."""
@@ -162,7 +372,7 @@ def reset_config():
 
 if __name__ == "__main__":
     print("Scanning for Bitaxe miners...")
-    miners = detect_miners("192.168.0.1", "192.168.0.255")  # Example default scan range
+    miners = detect_miners(ranges=["192.168.0.0/24"])  # Example default scan range
     if miners:
         print(f"Found {len(miners)} miners: {miners}")
     else:
@@ -0,0 +1,124 @@
+"""Headless entry point: runs the autotuner as a service, without Tk or a display.
+
+Tunes every enabled miner in config.json with the configured engine, runs the
+scheduled restarts and limit profiles and the flatline restarts, records history, serves the local status
+API and logs to stdout (or a rotating file). Edits to config.json are picked
+up while running: added, removed and re-limited miners are started, stopped
+or updated without restarting the others. SIGTERM and Ctrl+C stop every miner
+loop and flush history.
+
+    python3 daemon.py
+    python3 daemon.py --log-file autotuner.log --scan
+"""
+import argparse
+import signal
+import sys
+import threading
+from config import get_config_snapshot, detect_miners
+from autotune import fleet, start_tuning, stop_autotuning, start_schedules, tunable_miners
+from history import stop_recording
+from status_api import start_status_api, stop_status_api
+from scheduler import stop_scheduler
+from logging_setup import configure_logging, log_to_logger
+
+
+class AutotunerDaemon:
+    """Owns the tuner workers (or asyncio engine) and the scheduler for one headless run."""
+
+    def __init__(self, log_callback=log_to_logger):
+        self.log_callback = log_callback
+        self.stop_event = threading.Event()
+        self.profile_changed = threading.Event()  # set by the scheduler when a limit profile starts or ends
+        self.engine = None
+        self.workers = []
+        self.config = None  # config.json snapshot the running miners were started or reloaded from
+
+    def active_miners(self):
+        """Enabled miners with complete AutoTuner settings; the rest are logged and skipped."""
+        self.config = get_config_snapshot()
+        return tunable_miners(self.config, self.log_callback)
+
+    def reload(self):
+        """Apply config.json changes (or a new limit profile) to the running miners; otherwise a no-op."""
+        if get_config_snapshot() is self.config and not self.profile_changed.is_set():
+            return None
+        self.profile_changed.clear()
+        start_schedules(self.log_callback)  # Picks up edited schedules and profiles
+        miners = self.active_miners()
+        if self.engine:
+            started, stopped, updated = self.engine.apply_config(miners)
+        else:
+            started, stopped, updated = fleet.apply_config(miners, self.log_callback)
+        if started or stopped or updated:
+            self.log_callback(f"Tuning updated: {len(started)} miner(s) started, {len(stopped)} stopped, "
+                              f"{len(updated)} re-limited.", "info")
+        return started, stopped, updated
+
+    def start(self, scan=False):
+        if scan:
+            self.log_callback("Scanning network for new miners...", "info")
+            found = detect_miners()
+            self.log_callback(f"Scan complete: {len(found)} new miner(s) added (disabled until enabled in config).",
+                              "info")
+
+        # Scheduled restarts and limit profiles; started first so the tuners begin with the profile in effect
+        start_schedules(self.log_callback, self.profile_changed.set)
+        miners = self.active_miners()
+        if miners:
+            self.log_callback(f"Starting autotuning for {len(miners)} miner(s)...", "success")
+        else:
+            # Keep running: reload() starts the tuners once config.json enables a miner or the profile changes
+            self.log_callback("No miners are enabled for AutoTuning yet. Waiting for config.json changes...",
+                              "warning")
+
+        start_status_api(get_config_snapshot(), self.log_callback)
+        started = start_tuning(miners, self.log_callback)
+        if isinstance(started, list):
+            self.workers = started
+        else:
+            self.engine = started
+
+    def request_stop(self, signum=None, frame=None):
+        """Signal handler: only sets the event, the main thread does the shutdown."""
+        self.stop_event.set()
+
+    def stop(self, timeout=10):
+        self.log_callback("Stopping autotuning...", "warning")
+        self.stop_event.set()
+        stop_scheduler()
+        unfinished = stop_autotuning(timeout)
+        if self.engine:
+            self.engine.stop(timeout)
+        if unfinished:
+            self.log_callback(f"{len(unfinished)} tuner(s) still finishing a request; exiting anyway.", "warning")
+        stop_recording()
+        stop_status_api()
+        self.log_callback("Autotuner stopped.", "warning")
+
+    def run(self, scan=False):
+        """Start, block until SIGTERM/SIGINT, then shut down. Returns the process exit code."""
+        self.start(scan)
+        try:
+            while not self.stop_event.wait(1):  # Short waits keep the main thread responsive to signals
+                self.reload()
+        finally:
+            self.stop()
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Bitaxe autotuner without the GUI.")
+    parser.add_argument("--log-file", help="log to this file (rotated at 5 MB) instead of stdout")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    parser.add_argument("--scan", action="store_true", help="scan the network for new miners before starting")
+    args = parser.parse_args(argv)
+
+    configure_logging(args.log_file, args.log_level)
+    daemon = AutotunerDaemon()
+    signal.signal(signal.SIGTERM, daemon.request_stop)
+    signal.signal(signal.SIGINT, daemon.request_stop)
+    return daemon.run(scan=args.scan)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Send one command to many miners at once, in staggered waves.
+
+`BulkDispatcher` restarts miners or applies settings concurrently on a thread
+pool. Miners are split into waves of `wave_size`, and each wave starts
+`wave_delay` seconds after the previous one whether or not its requests have
+finished. Offline miners therefore only cost their own timeout, and a fleet
+restart powers up in steps instead of all at once.
+"""
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from metrics import HTTP_ERRORS
+
+DispatchResult = namedtuple("DispatchResult", "ip ok message elapsed")
+
+
+class BulkDispatcher:
+    """Concurrent restarts and settings changes for a set of miners."""
+
+    def __init__(self, client, wave_size=10, wave_delay=5.0, max_workers=32):
+        self.client = client
+        self.wave_size = max(int(wave_size), 1)
+        self.wave_delay = max(float(wave_delay), 0.0)
+        self.max_workers = max(int(max_workers), 1)
+
+    @classmethod
+    def from_config(cls, client, config):
+        """Build a dispatcher from the optional dispatch_* keys in config.json."""
+        return cls(client,
+                   wave_size=config.get("dispatch_wave_size", 10),
+                   wave_delay=config.get("dispatch_wave_delay", 5),
+                   max_workers=config.get("dispatch_workers", 32))
+
+    def restart(self, ips, log_callback=None, stop_event=None):
+        """Restart every miner in `ips`. Returns a DispatchResult per miner, in order."""
+        def restart_one(ip):
+            try:
+                self.client.restart(ip)
+                return True, f"{ip} -> Restart initiated."
+            except requests.exceptions.RequestException as e:
+                HTTP_ERRORS.inc(ip=ip, operation="restart")
+                return False, f"{ip} -> Error restarting system: {e}"
+
+        return self.run([(ip, restart_one) for ip in ips], log_callback, stop_event)
+
+    def apply(self, settings, log_callback=None, stop_event=None):
+        """Send {ip: {"frequency": ..., "coreVoltage": ...}} settings. Returns a DispatchResult per miner."""
+        def apply_one(ip):
+            try:
+                self.client.update_system(ip, settings[ip])
+                applied = settings[ip]
+                return True, (f"{ip} -> Applied settings: Voltage = {applied.get('coreVoltage')}mV, "
+                              f"Frequency = {applied.get('frequency')}MHz")
+            except requests.exceptions.RequestException as e:
+                HTTP_ERRORS.inc(ip=ip, operation="update_system")
+                return False, f"{ip} -> Error setting system settings: {e}"
+
+        return self.run([(ip, apply_one) for ip in settings], log_callback, stop_event)
+
+    def run(self, commands, log_callback=None, stop_event=None):
+        """Run (ip, command) pairs in waves; `command(ip)` returns (ok, message).
+
+        Setting `stop_event` stops further waves; miners not reached yet get a
+        failed result saying so. Each result is logged as it arrives.
+        """
+        stop_event = stop_event or threading.Event()
+        results = [None] * len(commands)
+        start = time.monotonic()
+
+        def run_one(idx, ip, command):
+            sent = time.monotonic()
+            try:
+                ok, message = command(ip)
+            except Exception as e:  # A bug in one command must not lose the other results
+                ok, message = False, f"{ip} -> {e}"
+            results[idx] = DispatchResult(ip, ok, message, time.monotonic() - sent)
+            if log_callback:
+                log_callback(message, "success" if ok else "error")
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(len(commands), 1)),
+                                thread_name_prefix="dispatch") as executor:
+            for wave, first in enumerate(range(0, len(commands), self.wave_size)):
+                if wave and stop_event.wait(max(start + wave * self.wave_delay - time.monotonic(), 0)):
+                    break
+                for idx in range(first, min(first + self.wave_size, len(commands))):
+                    executor.submit(run_one, idx, *commands[idx])
+
+        for idx, (ip, _) in enumerate(commands):
+            if results[idx] is None:
+                results[idx] = DispatchResult(ip, False, f"{ip} -> Not sent: dispatch stopped.", 0.0)
+        return results
+
+
+def summarize(action, results, max_failures=10):
+    """One-paragraph summary of a dispatch, listing up to `max_failures` failed miners."""
+    failed = [result for result in results if not result.ok]
+    lines = [f"{action}: {len(results) - len(failed)}/{len(results)} miner(s) succeeded."]
+    for result in failed[:max_failures]:
+        lines.append(f"- {result.message}")
+    if len(failed) > max_failures:
+        lines.append(f"- ... and {len(failed) - max_failures} more")
+    return "\n".join(lines)
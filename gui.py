@@ -1,9 +1,18 @@
 import tkinter as tk
 from tkinter import scrolledtext, ttk, messagebox
 import threading
+import queue
 from datetime import datetime
-from config import get_miner_defaults, add_miner, remove_miner, get_miners, update_miner, load_config, save_config, detect_miners
-from autotune import monitor_and_adjust, stop_autotuning, get_system_info, restart_bitaxe
+from config import get_miner_defaults, add_miner, remove_miner, get_miners, update_miner, detect_miners, \
+    parse_ip_ranges, get_config_snapshot, config_batch, update_settings, DEFAULT_SCAN_MAX_ADDRESSES
+from autotune import MinerTuner, fleet, stop_autotuning, telemetry_hub, start_schedules, tunable_miners, \
+    bulk_dispatcher, with_profile, REQUIRED_FIELDS
+from dispatch import summarize
+from scheduler import stop_scheduler, active_profile
+from async_engine import AsyncTuningEngine
+from history import start_recording
+from status_api import start_status_api
+from logging_setup import configure_logging, log_to_logger
 import os
 import sys
 import time
@@ -11,6 +20,37 @@ import webbrowser
 import platform
 
 
+TELEMETRY_COLUMN_OFFSET = 3  # first Treeview column filled from telemetry ("Applied Freq")
+DISPLAY_TICK_MS = 100  # how often the Tk thread applies queued display updates
+DISPLAY_TICK_BUDGET = 0.04  # max seconds spent applying updates per tick, keeps the UI responsive
+LOG_TICK_MS = 250  # how often queued log messages are written to the log panel
+LOG_MAX_LINES = 2000  # default number of lines the log panel keeps ("log_max_lines" in config.json)
+LOG_COLORS = {"success": "green", "warning": "orange", "error": "red", "info": "black"}
+
+
+def _format_number(value, suffix="", digits=None):
+    """`value` with its unit, or "-" when the miner reported no usable number (missing, null, text)."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return "-"
+    if digits is not None:
+        return f"{number:.{digits}f}{suffix}"
+    return f"{value}{suffix}"
+
+
+def format_telemetry_values(miner_data):
+    """Format an /api/system/info payload into the telemetry columns of the miner table."""
+    return (
+        _format_number(miner_data.get("frequency")),  # Applied Freq
+        _format_number(miner_data.get("coreVoltage")),  # Voltage
+        _format_number(miner_data.get("temp"), "°C"),  # Temp
+        _format_number(miner_data.get("vrTemp"), "°C"),  # VR Temp
+        _format_number(miner_data.get("hashRate"), " GH/s", 2),  # Hash Rate
+        _format_number(miner_data.get("power"), " W", 2),  # Power
+    )
+
+
 def resource_path(relative_path):
     """Get absolute path to resource (for PyInstaller compatibility)"""
     try:
@@ -19,6 +59,155 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+SETTINGS_FIELDS = ("min_freq", "max_freq", "start_freq", "min_volt", "max_volt",
+                   "start_volt", "max_temp", "max_watts", "max_vr_temp")
+SETTINGS_VISIBLE_ROWS = 12  # widget rows the AutoTuner settings editor creates, whatever the fleet size
+
+
+class VirtualSettingsTable:
+    """AutoTuner settings grid that only creates widgets for the rows in view.
+
+    Every miner's values live in `rows` as plain strings; a fixed pool of widget
+    rows is rebound to whichever miners are scrolled into view, so the editor
+    opens as fast for 500 miners as for 5.
+    """
+
+    def __init__(self, parent, miners, visible_rows=SETTINGS_VISIBLE_ROWS):
+        self.rows = []
+        for miner in miners:
+            row = {field: str(miner.get(field, "")) for field in SETTINGS_FIELDS}
+            row.update(ip=miner["ip"], label=f"{miner.get('nickname', '')} ({miner['ip']})",
+                       enabled=bool(miner.get("enabled", False)))
+            self.rows.append(row)
+        self.original = [dict(row) for row in self.rows]
+        for row in self.rows:
+            if self._incomplete(row):
+                row["enabled"] = False  # Saved as disabled, as if the user had unticked it
+        self.first = 0  # index of the miner shown in the top widget row
+        self.clipboard = {}
+
+        frame = tk.Frame(parent, bg="white")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.grid_frame = tk.Frame(frame, bg="white")
+        self.grid_frame.pack(side="left", fill="both", expand=True)
+        self.scrollbar = tk.Scrollbar(frame, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+
+        headers = ["Enable", "Miner", "Min Freq", "Max Freq", "Start Freq", "Min Volt", "Max Volt", "Start Volt",
+                   "Max Temp", "Max Watts", "Max VR Temp", "Actions"]
+        for col_idx, header in enumerate(headers):
+            tk.Label(self.grid_frame, text=header, font=("Arial", 10, "bold"), bg="white", fg="black").grid(
+                row=0, column=col_idx, padx=5, pady=5
+            )
+
+        self.pool = [self._make_row(slot) for slot in range(min(visible_rows, len(self.rows)))]
+        for widget in [self.grid_frame] + self.grid_frame.winfo_children():
+            widget.bind("<MouseWheel>", self.on_mousewheel)  # Windows / macOS
+            widget.bind("<Button-4>", self.on_mousewheel)  # Linux
+            widget.bind("<Button-5>", self.on_mousewheel)
+        self.render()
+
+    def _make_row(self, slot):
+        var = tk.BooleanVar()
+        chk = tk.Checkbutton(self.grid_frame, variable=var, bg="white", fg="black", selectcolor="white",
+                             activebackground="white", activeforeground="black",
+                             command=lambda: self._toggle(slot))
+        chk.grid(row=slot + 1, column=0, padx=5, pady=5)
+        label = tk.Label(self.grid_frame, bg="white", fg="black", font=("Arial", 10), width=30, anchor="w")
+        label.grid(row=slot + 1, column=1, padx=5, pady=5, sticky="w")
+
+        entries = {}
+        for col_idx, field in enumerate(SETTINGS_FIELDS, start=2):
+            entry = tk.Entry(self.grid_frame, bg="white", fg="black", insertbackground="black", width=10)
+            entry.grid(row=slot + 1, column=col_idx, padx=5, pady=5)
+            entry.bind("<KeyRelease>", lambda event, f=field: self._edited(slot, f))
+            entries[field] = entry
+
+        tk.Button(self.grid_frame, text="Copy", font=("Arial", 8), width=10,
+                  command=lambda: self.copy_row(slot)).grid(row=slot + 1, column=len(SETTINGS_FIELDS) + 2, padx=2, pady=5)
+        tk.Button(self.grid_frame, text="Paste", font=("Arial", 8), width=10,
+                  command=lambda: self.paste_row(slot)).grid(row=slot + 1, column=len(SETTINGS_FIELDS) + 3, padx=2, pady=5)
+        return {"var": var, "check": chk, "label": label, "entries": entries}
+
+    def render(self):
+        """Bind the widget pool to the miners currently in view."""
+        for slot, widgets in enumerate(self.pool):
+            row = self.rows[self.first + slot]
+            widgets["label"].config(text=row["label"])
+            for field, entry in widgets["entries"].items():
+                entry.delete(0, tk.END)
+                entry.insert(0, row[field])
+            widgets["var"].set(row["enabled"])
+            self._validate(slot)
+
+        if self.rows:
+            total = len(self.rows)
+            self.scrollbar.set(self.first / total, (self.first + len(self.pool)) / total)
+
+    def scroll_to(self, first):
+        first = max(0, min(first, len(self.rows) - len(self.pool)))
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        """Scrollbar command: "moveto <fraction>" or "scroll <n> units|pages"."""
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.rows)))
+        else:
+            step = len(self.pool) if unit == "pages" else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def on_mousewheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+        return "break"
+
+    def _edited(self, slot, field):
+        self.rows[self.first + slot][field] = self.pool[slot]["entries"][field].get()
+        self._validate(slot)
+
+    def _toggle(self, slot):
+        self.rows[self.first + slot]["enabled"] = self.pool[slot]["var"].get()
+
+    def _validate(self, slot):
+        """A miner can only be enabled once all of its settings are filled in."""
+        row, widgets = self.rows[self.first + slot], self.pool[slot]
+        if self._incomplete(row):
+            row["enabled"] = False
+            widgets["var"].set(False)
+            widgets["check"].config(state=tk.DISABLED)
+        else:
+            widgets["check"].config(state=tk.NORMAL)
+
+    @staticmethod
+    def _incomplete(row):
+        return any(row[field] == "" for field in SETTINGS_FIELDS)
+
+    def copy_row(self, slot):
+        row = self.rows[self.first + slot]
+        self.clipboard = {field: row[field] for field in SETTINGS_FIELDS}
+
+    def paste_row(self, slot):
+        if not self.clipboard:
+            messagebox.showwarning("No Data", "No row has been copied yet.")
+            return
+        self.rows[self.first + slot].update(self.clipboard)
+        self.render()
+
+    def changes(self):
+        """[(ip, settings)] for every miner whose values were edited, ready for `update_miner`."""
+        changed = []
+        for row, original in zip(self.rows, self.original):
+            if row != original:
+                settings = {field: int(row[field]) if row[field].isdigit() else "" for field in SETTINGS_FIELDS}
+                settings["enabled"] = row["enabled"]
+                changed.append((row["ip"], settings))
+        return changed
+
+
 class BitaxeAutotuningApp:
     def __init__(self):
         self.root = tk.Tk()
@@ -35,7 +224,8 @@ class BitaxeAutotuningApp:
         self.root.resizable(True, True)
 
         self.running = False
-        self.threads = []
+        self.workers = []
+        self.async_engine = None
 
         # Enable Full-Screen Toggle
         self.root.bind("<F11>", self.toggle_fullscreen)
@@ -135,7 +325,13 @@ class BitaxeAutotuningApp:
         self.tree_menu = tk.Menu(self.root, tearoff=0)
         self.tree_menu.add_command(label="Edit Miner Settings", command=self.edit_miner_settings)  # Added Edit Miner
         self.tree_menu.add_command(label="Refresh", command=self.refresh_selected_miner)
-        self.tree_menu.add_command(label="Restart Miner", command=self.restart_selected_miner)
+        self.tree_menu.add_command(label="Restart Miner(s)", command=self.restart_selected_miner)
+        self.tree_menu.add_command(label="Apply Start Settings", command=self.apply_selected_start_settings)
+        self.tree_menu.add_separator()
+        self.tree_menu.add_command(label="Start Tuning", command=lambda: self.control_selected_miner("start"))
+        self.tree_menu.add_command(label="Pause Tuning", command=lambda: self.control_selected_miner("pause"))
+        self.tree_menu.add_command(label="Resume Tuning", command=lambda: self.control_selected_miner("resume"))
+        self.tree_menu.add_command(label="Stop Tuning", command=lambda: self.control_selected_miner("stop"))
         self.tree_menu.add_separator()
         self.tree_menu.add_command(label="Open Miner Web UI", command=self.open_miner_webpage)
 
@@ -145,9 +341,28 @@ class BitaxeAutotuningApp:
         # Log Output
         self.log_output = scrolledtext.ScrolledText(self.root, width=100, height=15, bg="white")
         self.log_output.pack(pady=5, fill=tk.BOTH, expand=True)
+        for level, color in LOG_COLORS.items():
+            self.log_output.tag_config(level, foreground=color)
+
+        # Messages from any thread are queued and written to the panel in batches; the panel keeps
+        # only the newest lines, the full log goes to a rotating file
+        config = get_config_snapshot()
+        self.log_queue = queue.SimpleQueue()
+        self.log_max_lines = config.get("log_max_lines", LOG_MAX_LINES)
+        if config.get("log_file", "autotuner.log"):
+            configure_logging(config.get("log_file", "autotuner.log"))
+        self.root.after(LOG_TICK_MS, self.flush_log)
 
         self.tree_items_by_ip = {}  # map IP to Treeview row ID
 
+        # Background display refresh: a worker thread queues changed rows, the Tk thread applies them
+        self.display_updates = queue.Queue()
+        self.display_ips = ()  # IPs shown in the table, readable from the worker thread
+        self.display_generation = 0  # bumped when rows are rebuilt so the worker resends everything
+        self.display_thread = None
+        self.display_stop = threading.Event()
+        self.root.after(DISPLAY_TICK_MS, self.apply_display_updates)
+
         # Load miners from config.json on startup
         self.load_miners_from_config()
 
@@ -168,7 +383,7 @@ class BitaxeAutotuningApp:
         """Opens a window to allow the user to enter a custom IP range for scanning."""
         scan_window = tk.Toplevel(self.root)
         scan_window.title("Scan Network")
-        scan_window.geometry("400x200")
+        scan_window.geometry("450x220")
         if platform.system() == "Windows":
             try:
                 scan_window.iconbitmap(resource_path("bitaxe_icon.ico"))
@@ -180,12 +395,14 @@ class BitaxeAutotuningApp:
         tk.Label(scan_window, text="Enter IP Range to Scan", font=("Arial", 12, "bold"), bg="white").pack(pady=10)
 
         # Input Fields
-        tk.Label(scan_window, text="Starting IP:", bg="white", font=("Arial", 10)).pack()
-        start_ip_entry = tk.Entry(scan_window, width=20)
+        tk.Label(scan_window, text="Starting IP (or CIDR, e.g. 192.168.0.0/24):", bg="white",
+                 font=("Arial", 10)).pack()
+        start_ip_entry = tk.Entry(scan_window, width=40)
         start_ip_entry.pack(pady=2)
 
-        tk.Label(scan_window, text="Ending IP:", bg="white", font=("Arial", 10)).pack()
-        end_ip_entry = tk.Entry(scan_window, width=20)
+        tk.Label(scan_window, text="Ending IP (leave blank for CIDR / comma-separated ranges):", bg="white",
+                 font=("Arial", 10)).pack()
+        end_ip_entry = tk.Entry(scan_window, width=40)
         end_ip_entry.pack(pady=2)
 
         def start_scan():
@@ -193,37 +410,72 @@ class BitaxeAutotuningApp:
             start_ip = start_ip_entry.get().strip()
             end_ip = end_ip_entry.get().strip()
 
-            if not start_ip or not end_ip:
-                messagebox.showerror("Error", "Both Starting IP and Ending IP are required.")
+            if not start_ip:
+                messagebox.showerror("Error", "A Starting IP or CIDR range is required.")
                 return
 
-            self.log_message(f"Scanning network from {start_ip} to {end_ip}...", "info")
+            ranges = [f"{start_ip}-{end_ip}"] if end_ip else start_ip.split(",")
+            try:
+                parse_ip_ranges(ranges, get_config_snapshot().get("scan_max_addresses", DEFAULT_SCAN_MAX_ADDRESSES))
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid IP range: {e}")
+                return
+
+            self.log_message(f"Scanning network {', '.join(r.strip() for r in ranges)}...", "info")
             scan_window.destroy()  # Close the scan window
 
             # Disable scan button while scanning
             self.scan_button.config(state=tk.DISABLED)
 
+            def add_found_miner(miner):
+                """Show a detected miner in the table as soon as it answers."""
+                if miner["ip"] in self.tree_items_by_ip:
+                    return
+                item_id = self.tree.insert("", "end", values=(
+                    miner["nickname"], miner["type"], miner["ip"], "-", "-", "-", "-", "-", "-"))
+                self.tree_items_by_ip[miner["ip"]] = item_id
+                self.sync_display_rows()
+                self.log_message(f"Detected {miner['type']} at {miner['ip']}", "success")
+
             # Background scanning process
             def scan_task():
-                detect_miners(start_ip, end_ip)  # Call detect_miners() with the range
-                self.root.after(100, self.load_miners_from_config)  # Update UI safely
-                self.scan_button.config(state=tk.NORMAL)  # Re-enable button
+                found = detect_miners(ranges=ranges,
+                                      on_found=lambda miner: self.root.after(0, add_found_miner, miner))
+
+                def finish_scan():
+                    self.log_message(f"Scan complete. Found {len(found)} new miner(s).", "success")
+                    self.load_miners_from_config()
+                    self.scan_button.config(state=tk.NORMAL)  # Re-enable button
+
+                self.root.after(100, finish_scan)  # Update UI safely
 
             threading.Thread(target=scan_task, daemon=True).start()
 
         tk.Button(scan_window, text="Start Scan", font=("Arial", 10), command=start_scan, bg="gold").pack(pady=10)
 
     def load_miners_from_config(self):
-        """Loads miners from config.json into the UI."""
-        self.tree.delete(*self.tree.get_children())  # Clear existing entries
+        """Loads miners from config.json into the UI, touching only rows that were added, removed or renamed."""
         miners = get_miners()
-
+        wanted = {}
         for miner in miners:
-            values = (
-            miner.get("nickname", f"Miner-{miner['ip']}"), miner["type"], miner["ip"], "-", "-", "-", "-", "-", "-")
-            item_id = self.tree.insert("", "end", values=values)
-            self.tree_items_by_ip[miner["ip"]] = item_id
+            wanted[miner["ip"]] = (miner.get("nickname", f"Miner-{miner['ip']}"), miner["type"], miner["ip"])
 
+        for ip in [ip for ip in self.tree_items_by_ip if ip not in wanted]:
+            self.tree.delete(self.tree_items_by_ip.pop(ip))
+
+        for position, (ip, details) in enumerate(wanted.items()):
+            item_id = self.tree_items_by_ip.get(ip)
+            if item_id is None:
+                self.tree_items_by_ip[ip] = self.tree.insert("", position, values=details + ("-",) * 6)
+                continue
+            current = self.tree.item(item_id, "values")
+            if tuple(str(value) for value in current[:TELEMETRY_COLUMN_OFFSET]) != tuple(map(str, details)):
+                for column, value in zip(self.tree["columns"], details):
+                    self.tree.set(item_id, column, value)
+            if self.tree.index(item_id) != position:
+                self.tree.move(item_id, "", position)
+
+        self.sync_display_rows()
         self.log_message(f"Loaded {len(miners)} miners.", "success")
 
     def add_miner(self):
@@ -258,6 +510,7 @@ class BitaxeAutotuningApp:
 
             item_id = self.tree.insert("", "end", values=(nickname, "Unknown", ip, "-", "-", "-", "-", "-", "-"))
             self.tree_items_by_ip[ip] = item_id  # ✅ Track the new item
+            self.sync_display_rows()
             add_miner("Unknown", ip, nickname)
             messagebox.showinfo("Success", f"Miner {nickname} added successfully.")
             add_window.destroy()
@@ -277,25 +530,24 @@ class BitaxeAutotuningApp:
         if not confirmation:
             return
 
-        config = load_config()
-        miners = config.get("miners", [])
+        # All removals are written to config.json in a single atomic save
+        with config_batch():
+            for item in selected_items:
+                values = self.tree.item(item, "values")
+                ip = values[2]
 
-        for item in selected_items:
-            values = self.tree.item(item, "values")
-            ip = values[2]
+                # Remove from treeview
+                self.tree.delete(item)
 
-            # Remove from treeview
-            self.tree.delete(item)
+                # ✅ Remove from IP-to-row map
+                if ip in self.tree_items_by_ip:
+                    del self.tree_items_by_ip[ip]
 
-            # ✅ Remove from IP-to-row map
-            if ip in self.tree_items_by_ip:
-                del self.tree_items_by_ip[ip]
+                # Remove from config
+                remove_miner(ip)
 
-            # Remove from config
-            miners = [m for m in miners if m["ip"] != ip]
-
-        config["miners"] = miners
-        save_config(config)
+        self.sync_display_rows()
+        self.reconfigure_tuning()
         self.log_message("Miner(s) removed successfully.", "success")
 
     def refresh_selected_miner(self):
@@ -311,32 +563,18 @@ class BitaxeAutotuningApp:
 
         self.log_message(f"Refreshing data for miner at {ip}...", "info")
 
-        # Fetch miner data
-        miner_data = get_system_info(ip)
-        if isinstance(miner_data, str):
-            self.log_message(f"Error fetching miner data from {ip}: {miner_data}", "error")
-            return
-
-        # Extract real-time values
-        new_frequency = miner_data.get("frequency", "-")
-        new_voltage = miner_data.get("coreVoltage", "-")
-        new_temp = f"{miner_data.get('temp', '-')}°C"
-        new_vr_temp = f"{miner_data.get('vrTemp', '-')}°C"
-        new_hashrate = f"{float(miner_data.get('hashRate', 0)):.2f} GH/s"
-        new_power = f"{float(miner_data.get('power', 0)):.2f} W"
-
-        # Update all 9 values in-place
-        updated_values = list(values)
-        updated_values[3] = new_frequency  # Applied Freq
-        updated_values[4] = new_voltage  # Voltage
-        updated_values[5] = new_temp  # Temp
-        updated_values[6] = new_vr_temp  # VR Temp
-        updated_values[7] = new_hashrate  # Hash Rate
-        updated_values[8] = new_power  # Power
+        def refresh_task():
+            # Fetch miner data (published to the shared telemetry hub so the tuner sees it too)
+            snapshot = telemetry_hub.refresh(ip)
+            if not snapshot.ok:
+                self.log_message(f"Error fetching miner data from {ip}: {snapshot.error}", "error")
+                return
 
-        self.tree.item(selected_item, values=updated_values)
+            self.display_updates.put((ip, format_telemetry_values(snapshot.info)))
+            self.log_message(f"Refreshed data for miner at {ip}.", "success")
 
-        self.log_message(f"Refreshed data for miner at {ip}.", "success")
+        # Never block the Tk main loop on the miner's HTTP timeout
+        threading.Thread(target=refresh_task, daemon=True).start()
 
     def edit_miner_settings(self):
         """Opens a window to edit a miner's nickname, type, and IP address."""
@@ -383,19 +621,12 @@ class BitaxeAutotuningApp:
                 messagebox.showerror("Error", "IP Address is required.")
                 return
 
-            # Update the miner in config.json
-            config = load_config()
-            for miner in config["miners"]:
-                if miner["ip"] == miner_ip:  # Find the correct miner by IP
-                    miner["nickname"] = new_nickname
-                    miner["type"] = new_type
-                    miner["ip"] = new_ip
-                    break
-
-            save_config(config)
+            # Update the miner in config.json; only the edited fields, on the current file
+            update_miner(miner_ip, {"nickname": new_nickname, "type": new_type, "ip": new_ip})
             self.log_message(f"Updated miner settings: {new_nickname} ({new_type}) at {new_ip}", "success")
             edit_window.destroy()
             self.load_miners_from_config()  # Refresh UI
+            self.reconfigure_tuning()  # A changed IP is a different miner to the tuner
 
         tk.Button(edit_window, text="Save", font=("Arial", 10), command=save_miner_settings, bg="gold").pack(pady=10)
 
@@ -434,8 +665,7 @@ class BitaxeAutotuningApp:
                 new_settings["daily_reset_time"] = time_entry.get().strip()
                 new_settings["flatline_detection_enabled"] = flatline_var.get()
                 new_settings["flatline_hashrate_repeat_count"] = int(flatline_entry.get())
-                config.update(new_settings)
-                save_config(config)
+                update_settings(new_settings)  # Only these keys, on the current file
                 messagebox.showinfo("Success", "Settings updated successfully.")
                 self.global_settings_window.destroy()
                 self.log_message("Global settings updated.", "success")
@@ -452,7 +682,7 @@ class BitaxeAutotuningApp:
             fg="black"
         ).pack(pady=10)
 
-        config = load_config()
+        config = get_config_snapshot()
 
         settings_entries = {}
         settings_fields = {
@@ -556,9 +786,8 @@ class BitaxeAutotuningApp:
     import platform  # Ensure this is at the top of your file
 
     def open_autotuner_settings(self):
-        """Opens a window to modify AutoTuner settings for all miners, with a scrollbar for large lists."""
-        config = load_config()
-        miners = config.get("miners", [])
+        """Opens a window to modify AutoTuner settings for all miners; only the visible rows get widgets."""
+        miners = get_miners()
 
         if not miners:
             messagebox.showwarning("No Miners Found", "Please add a miner first before modifying AutoTuner settings.")
@@ -589,152 +818,39 @@ class BitaxeAutotuningApp:
         tk.Label(self.autotuner_window, text="Modify AutoTuner Settings", font=("Arial", 12, "bold"), bg="white",
                  fg="black").pack(pady=10)
 
-        container = tk.Frame(self.autotuner_window, bg="white")
-        container.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-
-        canvas = tk.Canvas(container, bg="white")
-        scrollbar = tk.Scrollbar(container, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg="white")
-
-        scrollable_frame.bind(
-            "<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        headers = ["Enable", "Miner", "Min Freq", "Max Freq", "Start Freq", "Min Volt", "Max Volt", "Start Volt",
-                   "Max Temp", "Max Watts", "Max VR Temp", "Actions"]
-
-        for col_idx, header in enumerate(headers):
-            tk.Label(scrollable_frame, text=header, font=("Arial", 10, "bold"), bg="white", fg="black").grid(
-                row=0, column=col_idx, padx=5, pady=5
-            )
-
-        settings_entries = {}
-        selected_miners = {}
-        clipboard = {}
-        enable_checkboxes = {}
-
-        def copy_row(row_idx):
-            nonlocal clipboard
-            clipboard = {field: settings_entries[row_idx][field].get() for field in settings_entries[row_idx]}
-
-        def paste_row(row_idx):
-            if not clipboard:
-                messagebox.showwarning("No Data", "No row has been copied yet.")
-                return
-
-            for field, entry in settings_entries[row_idx].items():
-                if field in clipboard:
-                    entry.delete(0, tk.END)
-                    entry.insert(0, clipboard[field])
-
-            validate_miner_settings(row_idx)
-
-        def validate_miner_settings(row_idx):
-            has_empty_values = any(entry.get() == "" for entry in settings_entries[row_idx].values())
-            if has_empty_values:
-                selected_miners[row_idx].set(False)
-                enable_checkboxes[row_idx].config(state=tk.DISABLED)
-            else:
-                enable_checkboxes[row_idx].config(state=tk.NORMAL)
-
-        for row_idx, miner in enumerate(miners, start=1):
-            var = tk.BooleanVar(value=miner.get("enabled", False))
-            chk = tk.Checkbutton(scrollable_frame, variable=var, bg="white", fg="black", selectcolor="white",
-                                 activebackground="white", activeforeground="black")
-            chk.grid(row=row_idx, column=0, padx=5, pady=5)
-            selected_miners[row_idx] = var
-            enable_checkboxes[row_idx] = chk
-
-            tk.Label(scrollable_frame, text=f"{miner['nickname']} ({miner['ip']})", bg="white", fg="black",
-                     font=("Arial", 10)).grid(row=row_idx, column=1, padx=5, pady=5, sticky="w")
-
-            fields = ["min_freq", "max_freq", "start_freq", "min_volt", "max_volt",
-                      "start_volt", "max_temp", "max_watts", "max_vr_temp"]
-
-            miner_settings = {}
-
-            for col_idx, field in enumerate(fields, start=2):
-                entry = tk.Entry(scrollable_frame, bg="white", fg="black", insertbackground="black", width=10)
-                entry.insert(0, miner.get(field, ""))
-                entry.grid(row=row_idx, column=col_idx, padx=5, pady=5)
-                miner_settings[field] = entry
-                entry.bind("<KeyRelease>", lambda event, idx=row_idx: validate_miner_settings(idx))
-
-            settings_entries[row_idx] = miner_settings
-
-            copy_button = tk.Button(scrollable_frame, text="Copy", font=("Arial", 8), width=10,
-                                    command=lambda idx=row_idx: copy_row(idx))
-            paste_button = tk.Button(scrollable_frame, text="Paste", font=("Arial", 8), width=10,
-                                     command=lambda idx=row_idx: paste_row(idx))
-
-            copy_button.grid(row=row_idx, column=len(fields) + 2, padx=2, pady=5)
-            paste_button.grid(row=row_idx, column=len(fields) + 3, padx=2, pady=5)
-
-            validate_miner_settings(row_idx)
+        table = VirtualSettingsTable(self.autotuner_window, miners)
 
         def save_autotuner_settings():
-            for idx, miner in enumerate(config["miners"], start=1):
-                if idx in settings_entries:
-                    for field, entry in settings_entries[idx].items():
-                        miner[field] = int(entry.get()) if entry.get().isdigit() else ""
-                miner["enabled"] = selected_miners[idx].get()
-
-            save_config(config)
-            self.log_message("Updated AutoTuner settings for all miners.", "success")
+            changes = table.changes()
+            with config_batch():  # One write for all edited miners
+                for ip, settings in changes:
+                    update_miner(ip, settings)
+
+            self.log_message(f"Updated AutoTuner settings for {len(changes)} miner(s).", "success")
+            self.reconfigure_tuning()
             messagebox.showinfo("Settings Saved", "AutoTuner settings have been successfully saved!")
-            self.autotuner_window.destroy()
+            on_close()
 
         tk.Button(self.autotuner_window, text="Save", font=("Arial", 10), width=10, bg="gold",
                   command=save_autotuner_settings).pack(pady=10)
 
     def save_settings(self):
-        """Saves all miner tuning settings and miner details to config.json."""
-        config = load_config()  # Load existing config
-        existing_miners = config.get("miners", [])
-
-        updated_miners = []
-
-        # Get current values from the UI and update config.json
-        for item in self.tree.get_children():
-            values = self.tree.item(item, "values")
-            nickname = values[0]
-            miner_type = values[1]
-            ip = values[2]
-
-            # Retrieve tuning settings from stored config
-            miner_defaults = get_miner_defaults(ip)
-
-            # Preserve 'enabled' flag from existing config
-            matching_existing = next((m for m in existing_miners if m["ip"] == ip), {})
-            enabled = matching_existing.get("enabled", False)
-
-            updated_miner = {
-                "nickname": nickname,
-                "type": miner_type,
-                "ip": ip,
-                "min_freq": miner_defaults.get("min_freq", ""),
-                "max_freq": miner_defaults.get("max_freq", ""),
-                "start_freq": miner_defaults.get("start_freq", ""),
-                "min_volt": miner_defaults.get("min_volt", ""),
-                "max_volt": miner_defaults.get("max_volt", ""),
-                "start_volt": miner_defaults.get("start_volt", ""),
-                "max_temp": miner_defaults.get("max_temp", ""),
-                "max_watts": miner_defaults.get("max_watts", ""),
-                "max_vr_temp": miner_defaults.get("max_vr_temp", ""),
-                "enabled": enabled
-            }
-
-            updated_miners.append(updated_miner)
-
-        config["miners"] = updated_miners  # Replace old miner data with updated values
-
-        save_config(config)  # Save back to config.json
+        """Saves the miner details shown in the table to config.json.
+
+        Only the nickname and type come from the table; tuning settings, the
+        enabled flag and miners added meanwhile (e.g. by a scan) are kept.
+        """
+        with config_batch() as config:  # One locked read-modify-write of the current file
+            existing_miners = {miner["ip"]: miner for miner in config.get("miners", [])}
+            for item in self.tree.get_children():
+                nickname, miner_type, ip = self.tree.item(item, "values")[:3]
+                miner = existing_miners.get(ip)
+                if miner is None:
+                    add_miner(miner_type, ip, nickname)  # New miners start without settings, disabled
+                elif miner.get("nickname") != nickname or miner.get("type") != miner_type:
+                    update_miner(ip, {"nickname": nickname, "type": miner_type})
+
+        self.reconfigure_tuning()
 
         self.log_message("Tuning & miner settings have been saved to config.json.", "success")
         messagebox.showinfo("Settings Saved", "All miner settings have been successfully saved!")
@@ -750,11 +866,11 @@ class BitaxeAutotuningApp:
     def start_autotuning(self):
         """Starts autotuning miners using the latest saved AutoTuner settings."""
         self.running = True
-        self.threads.clear()
+        self.workers.clear()
 
         self.start_button.config(text="Autotuner Running", state=tk.DISABLED, bg="light green")
 
-        config = load_config()  # Reload latest settings including updated monitor_interval
+        config = get_config_snapshot()  # Latest settings including updated monitor_interval
         interval = config.get("monitor_interval", 5)  # Refresh it here just once
 
         self.log_message("Checking AutoTuner settings before starting...", "info")
@@ -784,51 +900,53 @@ class BitaxeAutotuningApp:
 
         self.log_message("Starting autotuning for selected miners...", "success")
 
-        active_miners = [m for m in config.get("miners", []) if m.get("enabled", False)]
+        # Scheduled restarts and limit profiles; started first so the tuners begin with the profile in effect
+        start_schedules(self.log_message, self.schedule_profile_change)
+        active_miners = tunable_miners(config)
 
         if not active_miners:
             self.log_message("No miners are enabled for AutoTuning. Please enable at least one miner.", "error")
             messagebox.showwarning("No Miners Enabled",
                                    "No miners are enabled for AutoTuning. Please enable at least one miner in settings.")
+            stop_scheduler()
             self.running = False
             return
 
+        # Keep a local history of every reading (telemetry.db)
+        start_recording(telemetry_hub, config)
+        # Serve the cached fleet state to local dashboards (http://127.0.0.1:8787/api/miners)
+        start_status_api(config, self.log_message)
+
+        if config.get("tuning_engine", "threads") == "asyncio":
+            # All miners as coroutines on a single event loop instead of one thread each
+            self.async_engine = AsyncTuningEngine(self.log_message).start(active_miners)
+            active_miners = []
+
+        # One MinerWorker (daemon thread with its own stop/pause events) per miner
         for miner in active_miners:
-            ip, bitaxe_type = miner["ip"], miner["type"]
-
-            min_freq = miner.get("min_freq", 0)
-            max_freq = miner.get("max_freq", 0)
-            min_volt = miner.get("min_volt", 0)
-            max_volt = miner.get("max_volt", 0)
-            max_temp = miner.get("max_temp", 0)
-            max_watts = miner.get("max_watts", 0)
-            max_vr_temp = miner.get("max_vr_temp", 0)
-            interval = config.get("monitor_interval", 10)  # Global setting
-
-            # Pass settings dynamically to `monitor_and_adjust`
-            start_freq = miner.get("start_freq", "")
-            start_volt = miner.get("start_volt", "")
-
-            thread = threading.Thread(
-                target=monitor_and_adjust,
-                args=(ip, bitaxe_type, interval, self.log_message,
-                      min_freq, max_freq, min_volt, max_volt,
-                      max_temp, max_watts, start_freq, start_volt, max_vr_temp)
-            )
+            self.workers.append(fleet.start_miner(dict(miner), self.log_message))
 
-            thread.start()
-            self.threads.append(thread)
+        # One shared poller per miner feeds both the tuner threads and the display
+        # (the asyncio engine publishes readings for the miners it tunes itself)
+        engine_ips = {m["ip"] for m in config.get("miners", []) if m.get("enabled", False)} \
+            if self.async_engine else set()
+        for ip in self.tree_items_by_ip:
+            if ip not in engine_ips:
+                telemetry_hub.ensure_poller(ip)
 
         # Ensure UI updates based on monitor interval
         self.update_miner_display(interval)
 
-        # Start a new thread that watches the time and resets all miners at the configured time
-        threading.Thread(target=self.daily_reset_watcher, daemon=True).start()
-
     def stop_autotuning(self):
         """Stops all autotuning processes."""
         self.running = False
-        stop_autotuning()
+        self.display_stop.set()
+        stop_scheduler()
+        stop_autotuning()  # Signals every worker; they exit on their own without blocking the UI
+        self.workers.clear()
+        if self.async_engine:
+            self.async_engine.stop(timeout=0)
+            self.async_engine = None
 
         self.start_button.config(text="Start Autotuner", state=tk.NORMAL, bg="gold")
 
@@ -838,94 +956,248 @@ class BitaxeAutotuningApp:
         """Displays the right-click menu when a miner is selected."""
         selected_item = self.tree.identify_row(event.y)
         if selected_item:
-            self.tree.selection_set(selected_item)  # Select miner
+            if selected_item not in self.tree.selection():  # Keep a multi-selection that includes the row
+                self.tree.selection_set(selected_item)
             self.tree_menu.post(event.x_root, event.y_root)  # Show right-click menu
 
     def update_miner_display(self, interval):
-        """Refresh miner status in the UI at the global monitor interval."""
+        """Start the background refresh of miner status in the UI at the global monitor interval."""
         if not self.running:
             return
 
-        for ip, item in self.tree_items_by_ip.items():
+        if self.display_thread and self.display_thread.is_alive():
+            return
+
+        self.display_stop = threading.Event()
+        self.display_thread = threading.Thread(target=self.display_refresh_loop, args=(self.display_stop,),
+                                               daemon=True)
+        self.display_thread.start()
+
+    def sync_display_rows(self):
+        """Publish the current table rows to the display worker (call on the Tk thread)."""
+        self.display_ips = tuple(self.tree_items_by_ip)
+        self.display_generation += 1
+
+    def display_refresh_loop(self, stop_event):
+        """Worker thread: read the latest telemetry and queue only rows whose values changed."""
+        rendered = {}  # map IP to the values last queued for display
+        seen_seq = {}  # map IP to the last telemetry snapshot processed
+        generation = None
+
+        while not stop_event.is_set():
+            if generation != self.display_generation:
+                generation = self.display_generation
+                rendered.clear()
+                seen_seq.clear()
+
+            for ip in self.display_ips:
+                # Read the latest reading from the shared poller; never hit the API from the UI
+                snapshot = telemetry_hub.latest(ip)
+                if snapshot is None or seen_seq.get(ip) == snapshot.seq:
+                    continue
+                seen_seq[ip] = snapshot.seq
+
+                if not snapshot.ok:
+                    self.log_message(f"Error fetching miner data from {ip}: {snapshot.error}", "error")
+                    continue
+
+                values = format_telemetry_values(snapshot.info)
+                if rendered.get(ip) != values:
+                    rendered[ip] = values
+                    self.display_updates.put((ip, values))
+
+            # schedule the next update based on monitor interval
+            stop_event.wait(get_config_snapshot().get("monitor_interval", 5))
+
+    def apply_display_updates(self):
+        """Apply queued telemetry rows on the Tk thread, redrawing only the cells that changed."""
+        deadline = time.perf_counter() + DISPLAY_TICK_BUDGET
+        columns = self.tree["columns"]
+        pending = False
+
+        while True:
+            if time.perf_counter() >= deadline:
+                pending = True  # Out of budget for this tick; continue on the next one
+                break
+            try:
+                ip, values = self.display_updates.get_nowait()
+            except queue.Empty:
+                break
 
-            miner_data = get_system_info(ip)
-            if isinstance(miner_data, str):
-                self.log_message(f"Error fetching miner data from {ip}: {miner_data}", "error")
+            item = self.tree_items_by_ip.get(ip)
+            if item is None or not self.tree.exists(item):
                 continue
 
-            # Extract real-time values
-            new_frequency = miner_data.get("frequency", "-")
-            new_voltage = miner_data.get("coreVoltage", "-")
-            new_temp = f"{miner_data.get('temp', '-')}°C"
-            new_vr_temp = f"{miner_data.get('vrTemp', '-')}°C"
-            new_hashrate = f"{float(miner_data.get('hashRate', 0)):.2f} GH/s"
-            new_power = f"{float(miner_data.get('power', 0)):.2f} W"
-
-            # Update UI
-            values = self.tree.item(item, "values")
-            updated_values = list(values)
-            updated_values[3] = new_frequency  # Applied Frequency
-            updated_values[4] = new_voltage  # Current Voltage
-            updated_values[5] = new_temp  # Current Temp
-            updated_values[6] = new_vr_temp
-            updated_values[7] = new_hashrate  # Current Hashrate
-            updated_values[8] = new_power  # Current Power Usage
-
-            self.tree.item(item, values=updated_values)
-
-        # schedule the next update based on monitor interval
-        config = load_config()
-        interval = config.get("monitor_interval", 5)
-        self.root.after(interval * 1000, self.update_miner_display, interval)
+            current = self.tree.item(item, "values")
+            for column_idx, value in enumerate(values, start=TELEMETRY_COLUMN_OFFSET):
+                if column_idx >= len(current) or str(current[column_idx]) != str(value):
+                    self.tree.set(item, columns[column_idx], value)
+
+        self.root.after(1 if pending else DISPLAY_TICK_MS, self.apply_display_updates)
 
     def log_message(self, message, level="info"):
-        """Logs messages to the UI, ensuring updates run on the main thread."""
+        """Logs a message to the log file and queues it for the UI; safe to call from any thread."""
+        log_to_logger(message, level)
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        message = f"[{timestamp}] {message}"
-    
-        def _update_log():
-            if not self.root.winfo_exists():  # Check if window is still open
-                return
+        self.log_queue.put((f"[{timestamp}] {message}\n", level))
 
-            colors = {"success": "green", "warning": "orange", "error": "red", "info": "black"}
-            self.log_output.insert(tk.END, message + "\n", level)
-            self.log_output.tag_config(level, foreground=colors[level])
+    def flush_log(self):
+        """Write queued log messages to the log panel in one insert and trim it to `log_max_lines`."""
+        batch = []
+        while True:
+            try:
+                batch.append(self.log_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if batch:
+            batch = batch[-self.log_max_lines:]  # Older lines would be trimmed straight away
+            self.log_output.insert(tk.END, *(item for text, level in batch
+                                             for item in (text, level if level in LOG_COLORS else "info")))
+            lines = int(self.log_output.index("end-1c").split(".")[0]) - 1  # text always ends with a newline
+            if lines > self.log_max_lines:
+                self.log_output.delete("1.0", f"{lines - self.log_max_lines + 1}.0")
             self.log_output.yview(tk.END)
-    
-        # Ensure Tkinter UI updates run on the main thread
-        if self.root.winfo_exists():  # Prevent calls after window is closed
-            self.root.after(0, _update_log)
 
-    def daily_reset_watcher(self):
-        while True:
-            config = load_config()
-            if config.get("daily_reset_enabled", False):
-                now = datetime.now().strftime("%H:%M")
-                if now == config.get("daily_reset_time", "03:00"):
-                    self.log_message("Daily reset triggered. Restarting all miners...", "warning")
-                    for miner in get_miners():
-                        ip = miner["ip"]
-                        msg = restart_bitaxe(ip)
-                        self.log_message(msg, "warning")
-                    time.sleep(60)  # Prevent multiple resets in one minute
-            time.sleep(10)
+        self.root.after(LOG_TICK_MS, self.flush_log)
 
-    def restart_selected_miner(self):
-        """Restarts the selected miner via API."""
+    def schedule_profile_change(self):
+        """Called from the scheduler thread when a limit profile starts or ends."""
+        self.root.after(0, self.reconfigure_tuning)
+
+    def control_selected_miner(self, action):
+        """Start, pause, resume or stop tuning of the selected miner only."""
         selected_item = self.tree.selection()
         if not selected_item:
+            messagebox.showwarning("No Selection", "Please select a miner.")
+            return
+        ip = self.tree.item(selected_item[0], "values")[2]
+
+        if not self.running:
+            messagebox.showinfo("Autotuner Stopped", "Start the autotuner first.")
+            return
+
+        if action == "start":
+            config = get_config_snapshot()
+            miner = next((entry for entry in config.get("miners", ()) if entry["ip"] == ip), None)
+            if miner is None or not miner.get("enabled", False):
+                messagebox.showerror("Miner Disabled", f"{ip} is not enabled for AutoTuning. Enable it in settings first.")
+                return
+            if MinerTuner.missing_settings(*(miner.get(field) for field in REQUIRED_FIELDS)):
+                messagebox.showerror("Incomplete Settings", f"AutoTuner settings for {ip} are incomplete.")
+                return
+            miner = with_profile(dict(miner), config, active_profile())  # Same limits as the other running miners
+            self.log_message(f"Starting autotuning for {ip}...", "success")
+            if self.async_engine:
+                self.async_engine.start_miner(miner)
+            else:
+                self.workers.append(fleet.start_miner(miner, self.log_message))
+            return
+
+        if self.async_engine:
+            handled = getattr(self.async_engine, f"{action}_miner")(ip)
+        else:
+            handled = getattr(fleet, f"{action}_miner")(ip)
+        if not handled:
+            self.log_message(f"{ip} -> Not being tuned.", "warning")
+
+    def reconfigure_tuning(self):
+        """Apply saved config.json changes to the running tuners without restarting the others.
+
+        New or newly enabled miners start, removed or disabled ones stop, and
+        changed limits go to the running loops, which keep their current settings.
+        """
+        if not self.running:
+            return
+        start_schedules(self.log_message)  # Picks up edited schedules and profiles
+        miners = tunable_miners(get_config_snapshot(), self.log_message)
+        if self.async_engine:
+            started, stopped, updated = self.async_engine.apply_config(miners)
+        else:
+            started, stopped, updated = fleet.apply_config(miners, self.log_message)
+
+        # The hub keeps polling every table row the asyncio engine doesn't poll itself
+        engine_ips = {miner["ip"] for miner in miners} if self.async_engine else set()
+        for ip in self.tree_items_by_ip:
+            if ip in engine_ips:
+                telemetry_hub.stop_poller(ip)
+            else:
+                telemetry_hub.ensure_poller(ip)
+        for ip in stopped:
+            if ip not in self.tree_items_by_ip:
+                telemetry_hub.stop_poller(ip)
+
+        if started or stopped or updated:
+            self.log_message(f"Tuning updated: {len(started)} miner(s) started, {len(stopped)} stopped, "
+                             f"{len(updated)} with new limits.", "info")
+
+    def on_close(self):
+        """Stop every tuner before the window closes."""
+        if self.running:
+            self.stop_autotuning()
+        self.root.destroy()
+
+    def selected_ips(self):
+        return [self.tree.item(item, "values")[2] for item in self.tree.selection()]
+
+    def dispatch_in_background(self, title, action, send):
+        """Run a bulk dispatch off the Tk thread and show its per-miner summary when done."""
+        def dispatch_task():
+            summary = summarize(action, send(bulk_dispatcher()))
+            self.log_message(summary, "info")
+            self.root.after(0, lambda: messagebox.showinfo(title, summary))
+
+        threading.Thread(target=dispatch_task, daemon=True).start()
+
+    def restart_selected_miner(self):
+        """Restarts the selected miners via API, in staggered waves."""
+        ips = self.selected_ips()
+        if not ips:
             messagebox.showwarning("No Selection", "Please select a miner to restart.")
             return
+        if len(ips) > 1 and not messagebox.askyesno("Restart Miners", f"Restart {len(ips)} miners?"):
+            return
 
-        values = self.tree.item(selected_item, "values")
-        ip = values[2]
-        self.log_message(f"Restarting miner at {ip}...", "warning")
-        msg = restart_bitaxe(ip)
-        self.log_message(msg, "warning")
-        messagebox.showinfo("Restart Triggered", msg)
+        self.log_message(f"Restarting {len(ips)} miner(s)...", "warning")
+        self.dispatch_in_background("Restart Triggered", "Restart",
+                                    lambda dispatcher: dispatcher.restart(ips, self.log_message))
+
+    def apply_selected_start_settings(self):
+        """Send each selected miner its configured start frequency and voltage.
+
+        Miners the autotuner is tuning are skipped, since it would resend its own settings.
+        """
+        ips = self.selected_ips()
+        if not ips:
+            messagebox.showwarning("No Selection", "Please select a miner.")
+            return
+
+        tuned = set()
+        if self.running:
+            tuned = set(self.async_engine.miners() if self.async_engine else fleet.workers())
+        settings, skipped = {}, []
+        for ip in ips:
+            miner = get_miner_defaults(ip)
+            if ip in tuned:
+                skipped.append(f"{ip} (being tuned; stop its tuning first)")
+            elif miner.get("start_freq") in (None, "") or miner.get("start_volt") in (None, ""):
+                skipped.append(f"{ip} (no start frequency/voltage)")
+            else:
+                settings[ip] = {"frequency": miner["start_freq"], "coreVoltage": miner["start_volt"]}
+        for reason in skipped:
+            self.log_message(f"Skipping {reason}.", "warning")
+        if not settings:
+            messagebox.showwarning("Nothing to Apply", "No selected miner can be given its start settings:\n\n"
+                                   + "\n".join(skipped))
+            return
+
+        self.log_message(f"Applying start settings to {len(settings)} miner(s)...", "info")
+        self.dispatch_in_background("Settings Applied", "Apply start settings",
+                                    lambda dispatcher: dispatcher.apply(settings, self.log_message))
 
     def run(self):
         """Runs the Tkinter event loop."""
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.root.mainloop()
 
 
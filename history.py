@@ -0,0 +1,272 @@
+import atexit
+import sqlite3
+import threading
+import time
+from collections import deque
+from logging_setup import logger
+
+# (column name, /api/system/info key) for every stored reading
+FIELDS = (
+    ("temp", "temp"),
+    ("vr_temp", "vrTemp"),
+    ("hashrate", "hashRate"),
+    ("power", "power"),
+    ("frequency", "frequency"),
+    ("core_voltage", "coreVoltage"),
+)
+COLUMNS = [column for column, _ in FIELDS]
+
+# Tables are clustered by (ts, miner_id) so batch inserts, rollups and retention
+# deletes touch contiguous pages; a (miner_id, ts) index serves per-miner queries.
+# resolution -> (table, bucket seconds)
+RESOLUTIONS = {"raw": ("samples_raw", None), "1m": ("samples_1m", 60), "1h": ("samples_1h", 3600)}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS miners (id INTEGER PRIMARY KEY, ip TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS samples_raw (
+    ts INTEGER NOT NULL, miner_id INTEGER NOT NULL, {raw_columns},
+    PRIMARY KEY (ts, miner_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_raw_miner ON samples_raw (miner_id, ts);
+CREATE TABLE IF NOT EXISTS samples_1m (
+    ts INTEGER NOT NULL, miner_id INTEGER NOT NULL, n INTEGER NOT NULL, {rollup_columns},
+    PRIMARY KEY (ts, miner_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_1m_miner ON samples_1m (miner_id, ts);
+CREATE TABLE IF NOT EXISTS samples_1h (
+    ts INTEGER NOT NULL, miner_id INTEGER NOT NULL, n INTEGER NOT NULL, {rollup_columns},
+    PRIMARY KEY (ts, miner_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_1h_miner ON samples_1h (miner_id, ts);
+""".format(
+    raw_columns=", ".join(f"{column} REAL" for column in COLUMNS),
+    rollup_columns=", ".join(f"{column} REAL, {column}_max REAL" for column in COLUMNS),
+)
+
+
+class TelemetryHistory:
+    """Embedded SQLite time-series store for miner readings.
+
+    `record` only appends to an in-memory buffer; a background writer inserts
+    the buffer in one transaction every `flush_interval` seconds (WAL mode,
+    synchronous=NORMAL) to keep SD-card writes few and sequential. A failed
+    insert (e.g. "database is locked" or a full card) keeps the readings for
+    the next flush, up to `max_buffered` of them (the oldest go first). Once a
+    minute completed minutes are rolled up into 1-minute averages/maxima, those
+    into 1-hour rollups, and rows older than each tier's retention are deleted.
+    """
+
+    def __init__(self, path="telemetry.db", flush_interval=30, raw_retention_hours=24,
+                 minute_retention_days=7, hour_retention_days=365, rollup_interval=60, max_buffered=100_000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.rollup_interval = rollup_interval
+        self.retention = {
+            "samples_raw": raw_retention_hours * 3600,
+            "samples_1m": minute_retention_days * 86400,
+            "samples_1h": hour_retention_days * 86400,
+        }
+        self._buffer = deque(maxlen=max_buffered)
+        self._miner_ids = {}
+        self._stop_event = threading.Event()
+        self._db_lock = threading.Lock()
+        self._thread = None
+        self._db = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            path=config.get("history_db", "telemetry.db"),
+            flush_interval=config.get("history_flush_interval", 30),
+            raw_retention_hours=config.get("history_raw_retention_hours", 24),
+            minute_retention_days=config.get("history_minute_retention_days", 7),
+            hour_retention_days=config.get("history_hour_retention_days", 365),
+            max_buffered=config.get("history_max_buffered", 100_000),
+        )
+
+    def open(self):
+        with self._db_lock:
+            if self._db is None:
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.executescript(SCHEMA)
+                self._miner_ids = dict((ip, miner_id) for miner_id, ip in self._db.execute("SELECT id, ip FROM miners"))
+        return self
+
+    def start(self):
+        """Open the database and start the background writer."""
+        self.open()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._writer_loop, daemon=True, name="telemetry-history")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Flush everything still buffered and close the database."""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(self.flush_interval + 5)
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            logger.error(f"Telemetry history write failed: {e}; {len(self._buffer)} reading(s) not saved.")
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def record(self, ip, info, timestamp=None):
+        """Queue one /api/system/info payload for the next batch insert."""
+        values = tuple(_as_float(info.get(key)) for _, key in FIELDS)
+        self._buffer.append((ip, int(timestamp if timestamp is not None else time.time()), values))
+
+    def record_snapshot(self, snapshot):
+        """TelemetryHub listener: store successful readings, skip errors."""
+        if snapshot.ok:
+            self.record(snapshot.ip, snapshot.info, snapshot.timestamp)
+
+    def flush(self):
+        """Insert all buffered readings in a single transaction.
+
+        If the insert fails the readings go back into the buffer and the
+        sqlite3.Error is raised.
+        """
+        rows = []
+        while self._buffer:
+            rows.append(self._buffer.popleft())
+        if not rows:
+            return 0
+
+        with self._db_lock:
+            if self._db is None:
+                self._requeue(rows)
+                return 0
+            miner_ids = dict(self._miner_ids)
+            try:
+                with self._db:
+                    inserts = [(self._miner_id(ip), ts, *values) for ip, ts, values in rows]
+                    # One reading per miner per second; a repeat within the same second replaces it
+                    self._db.executemany(
+                        f"INSERT OR REPLACE INTO samples_raw (miner_id, ts, {', '.join(COLUMNS)}) "
+                        f"VALUES (?, ?, {', '.join('?' for _ in COLUMNS)})", inserts)
+            except sqlite3.Error:
+                self._miner_ids = miner_ids  # ids added in the rolled back transaction don't exist
+                self._requeue(rows)
+                raise
+        return len(rows)
+
+    def _requeue(self, rows):
+        # Put taken readings back in front of those recorded since, dropping the oldest if the buffer is full
+        room = self._buffer.maxlen - len(self._buffer)
+        self._buffer.extendleft(reversed(rows[max(len(rows) - room, 0):] if room > 0 else []))
+
+    def _miner_id(self, ip):
+        miner_id = self._miner_ids.get(ip)
+        if miner_id is None:
+            self._db.execute("INSERT OR IGNORE INTO miners (ip) VALUES (?)", (ip,))
+            miner_id = self._db.execute("SELECT id FROM miners WHERE ip = ?", (ip,)).fetchone()[0]
+            self._miner_ids[ip] = miner_id
+        return miner_id
+
+    def _watermark(self, key):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _rollup(self, source, target, bucket, weighted, now):
+        """Aggregate complete `bucket`-second periods of `source` into `target`."""
+        start = self._watermark(target)
+        # Only periods that have fully elapsed and whose readings have been flushed
+        end = int(now - self.flush_interval - 5) // bucket * bucket
+        if weighted:
+            end = min(end, self._watermark(source) // bucket * bucket)
+        if end <= start:
+            return
+
+        if weighted:  # source is already a rollup: weight averages by sample count
+            # Only periods where the column has a value count towards its average
+            aggregates = ", ".join(f"SUM({c} * n) / SUM(CASE WHEN {c} IS NOT NULL THEN n END), MAX({c}_max)"
+                                   for c in COLUMNS)
+            count = "SUM(n)"
+        else:
+            aggregates = ", ".join(f"AVG({c}), MAX({c})" for c in COLUMNS)
+            count = "COUNT(*)"
+        columns = ", ".join(f"{c}, {c}_max" for c in COLUMNS)
+        self._db.execute(
+            f"INSERT OR REPLACE INTO {target} (miner_id, ts, n, {columns}) "
+            f"SELECT miner_id, ts / {bucket} * {bucket} AS bucket, {count}, {aggregates} "
+            f"FROM {source} WHERE ts >= ? AND ts < ? GROUP BY miner_id, bucket", (start, end))
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (target, end))
+
+    def compact(self, now=None):
+        """Roll raw samples up into 1m/1h tiers and apply retention, in one transaction."""
+        now = time.time() if now is None else now
+        with self._db_lock:
+            if self._db is None:
+                return
+            with self._db:
+                self._rollup("samples_raw", "samples_1m", 60, weighted=False, now=now)
+                self._rollup("samples_1m", "samples_1h", 3600, weighted=True, now=now)
+                for table, seconds in self.retention.items():
+                    self._db.execute(f"DELETE FROM {table} WHERE ts < ?", (int(now - seconds),))
+
+    def query(self, ip, start=None, end=None, resolution="raw"):
+        """Return readings for `ip` between `start` and `end` (unix seconds) as dicts, oldest first."""
+        table, _ = RESOLUTIONS[resolution]
+        columns = COLUMNS if resolution == "raw" else ["n"] + [f"{c}{s}" for c in COLUMNS for s in ("", "_max")]
+        with self._db_lock:
+            miner_id = self._miner_ids.get(ip)
+            if miner_id is None or self._db is None:
+                return []
+            rows = self._db.execute(
+                f"SELECT ts, {', '.join(columns)} FROM {table} WHERE miner_id = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                (miner_id, start or 0, end if end is not None else 2 ** 62)).fetchall()
+        return [dict(zip(["ts"] + columns, row)) for row in rows]
+
+    def _writer_loop(self):
+        last_compact = 0
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+                if time.time() - last_compact >= self.rollup_interval:
+                    self.compact()
+                    last_compact = time.time()
+            except sqlite3.Error as e:
+                logger.error(f"Telemetry history write failed: {e}; {len(self._buffer)} reading(s) kept for retry.")
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_recorder = None
+_recorder_hub = None
+_recorder_lock = threading.Lock()
+
+def start_recording(hub, config):
+    """Record every reading published to `hub`, if "history_enabled" is set. Returns the recorder or None."""
+    global _recorder, _recorder_hub
+    if not config.get("history_enabled", True):
+        return None
+
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = TelemetryHistory.from_config(config).start()
+            _recorder_hub = hub
+            hub.add_listener(_recorder.record_snapshot)
+            atexit.register(stop_recording)
+        return _recorder
+
+def stop_recording():
+    """Flush and close the recorder started by `start_recording`."""
+    global _recorder, _recorder_hub
+    with _recorder_lock:
+        if _recorder is not None:
+            _recorder_hub.remove_listener(_recorder.record_snapshot)
+            _recorder.stop()
+            _recorder = _recorder_hub = None
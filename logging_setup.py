@@ -0,0 +1,28 @@
+import logging
+import logging.handlers
+import sys
+
+# log_callback levels used throughout the app -> logging levels
+LOG_LEVELS = {"info": logging.INFO, "success": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR}
+LOG_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+logger = logging.getLogger("bitaxe")
+
+
+def log_to_logger(message, level="info"):
+    """`log_callback` that writes to the "bitaxe" logger."""
+    logger.log(LOG_LEVELS.get(level, logging.INFO), message)
+
+
+def configure_logging(log_file=None, level="INFO", max_bytes=5 * 1024 * 1024, backup_count=3):
+    """Send the "bitaxe" logger to a rotating `log_file`, or to stdout if no file is given."""
+    if log_file:
+        handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                       encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+    logger.addHandler(handler)
+    logger.setLevel(level.upper())
+    return handler
@@ -0,0 +1,150 @@
+import math
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple((name, labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """[(name suffix, label pairs, value)] for the text exposition."""
+        with self._lock:
+            return [("", key, value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[idx] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                for bound, count in zip(self.buckets, counts):
+                    samples.append(("_bucket", key + (("le", _format_value(float(bound))),), count))
+                samples.append(("_sum", key, total))
+                samples.append(("_count", key, counts[-1]))
+        return samples
+
+
+class Registry:
+    """Process-wide metrics in the Prometheus text format.
+
+    Counters and histograms are updated where events happen. Collectors are
+    called at scrape time and return `(name, type, help, [(labels dict, value)])`
+    families built from state that already exists (e.g. the latest telemetry),
+    so a scrape never causes a request to a miner.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        for collector in self._collectors:
+            for name, metric_type, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    if value is not None:
+                        lines.append(f"{name}{_format_labels(labels.items())} {_format_value(value)}")
+        return ("\n".join(lines) + "\n").encode()
+
+
+REGISTRY = Registry()
+
+STEP_UPS = REGISTRY.counter("bitaxe_tuner_step_ups_total", "Settings increases applied by the tuner.", ["ip"])
+STEP_DOWNS = REGISTRY.counter("bitaxe_tuner_step_downs_total", "Settings decreases applied by the tuner.", ["ip"])
+FLATLINE_RESTARTS = REGISTRY.counter("bitaxe_tuner_flatline_restarts_total",
+                                     "Restarts triggered by flatline detection.", ["ip"])
+HTTP_ERRORS = REGISTRY.counter("bitaxe_http_errors_total", "Failed requests to a miner's API.", ["ip", "operation"])
+POLL_LATENCY = REGISTRY.histogram("bitaxe_poll_latency_seconds", "Duration of /api/system/info requests.", ["ip"])
+
+
+def observe_snapshot(snapshot):
+    """TelemetryHub listener: poll latency and failed polls."""
+    if snapshot.latency is not None:
+        POLL_LATENCY.observe(snapshot.latency, ip=snapshot.ip)
+    if not snapshot.ok:
+        HTTP_ERRORS.inc(ip=snapshot.ip, operation="system_info")
@@ -0,0 +1,204 @@
+"""The autotuner's decision rules as pure functions.
+
+`decide` turns one miner's state, reading and limits into a `Decision`
+without logging, sleeping or calling the miner; `MinerTuner` wraps it with
+logging and flatline detection. `decide_batch` applies the same rules to a
+whole fleet at once: vectorised with NumPy when it is installed, otherwise by
+calling `decide` per miner.
+"""
+from collections import namedtuple
+
+# Reason codes, in the order the rules are checked
+WAIT = 0  # refresh_interval has not elapsed since the last change
+OVER_LIMIT_DROP = 1  # temp / VR temp / power over the limit: drop to the previous tier
+OVER_LIMIT_AT_MIN = 2  # over the limit but already at the lowest tier
+RAISE_VOLTAGE = 3  # cool and under-hashing: voltage is low for the frequency
+RAISE_FREQUENCY = 4  # cool and under-hashing: frequency is low for the voltage
+AT_MAX = 5  # cool and under-hashing, but nothing left to raise
+TIER_UP = 6  # above expected but below the tier target: step up to the next tier
+TIER_AT_MAX = 7  # below the tier target, already at the highest tier
+HEALTHY = 8  # above the tier target
+INEFFICIENT = 9  # everything else: step voltage and frequency down
+
+State = namedtuple("State", "frequency voltage last_tune_time")
+Telemetry = namedtuple("Telemetry", "temp vr_temp hashrate power small_core_count asic_count")
+Limits = namedtuple("Limits", "min_freq max_freq min_volt max_volt max_temp max_watts max_vr_temp")
+Params = namedtuple("Params", "voltage_step frequency_step temp_tolerance refresh_interval")
+
+
+class Decision(namedtuple("Decision", "reason frequency voltage stepping_down expected_hashrate target_hashrate")):
+    """Outcome of `decide`: new settings, why, and the hashrates they were judged against."""
+    __slots__ = ()
+
+    def changed(self, state):
+        return self.frequency != state.frequency or self.voltage != state.voltage
+
+
+def telemetry_from_info(info):
+    """Build a Telemetry from an /api/system/info payload (missing values count as 0)."""
+    return Telemetry(info.get("temp", 0), info.get("vrTemp", 0), info.get("hashRate", 0), info.get("power", 0),
+                     info.get("smallCoreCount", 0), info.get("asicCount", 0))
+
+
+def params_from_config(config):
+    return Params(config.get("voltage_step", 10), config.get("frequency_step", 5), config.get("temp_tolerance", 2),
+                  config.get("refresh_interval", 60))
+
+
+def _range_percent(value, low, high):
+    """Position of `value` in [low, high]; a zero-width range counts as fully used."""
+    return (value - low) / (high - low) if high != low else 1.0
+
+
+def decide(state, telemetry, limits, params, tier_table, now):
+    """Apply the tuning rules to one miner. `tier_table` is a TierTable (empty = tiers not enforced)."""
+    frequency, voltage = state.frequency, state.voltage
+    expected_hashrate = int(frequency * ((telemetry.small_core_count * telemetry.asic_count) / 1000))
+    target_hashrate = tier_table.target_hashrate_for(frequency)
+
+    if now - state.last_tune_time < params.refresh_interval:
+        return Decision(WAIT, frequency, voltage, False, expected_hashrate, target_hashrate)
+
+    temp, hashrate, power = telemetry.temp, telemetry.hashrate, telemetry.power
+    if temp is None or power > limits.max_watts or temp > limits.max_temp or telemetry.vr_temp > limits.max_vr_temp:
+        previous_tier = tier_table.previous_tier(frequency)
+        if previous_tier:
+            return Decision(OVER_LIMIT_DROP, *previous_tier, True, expected_hashrate, target_hashrate)
+        return Decision(OVER_LIMIT_AT_MIN, frequency, voltage, True, expected_hashrate, target_hashrate)
+
+    if temp < (limits.max_temp - params.temp_tolerance) and power < limits.max_watts and hashrate < expected_hashrate:
+        volt_range_percent = _range_percent(voltage, limits.min_volt, limits.max_volt)
+        freq_range_percent = _range_percent(frequency, limits.min_freq, limits.max_freq)
+        if ((freq_range_percent >= 0.25 and volt_range_percent <= 0.25) or
+            (freq_range_percent >= 0.5 and volt_range_percent <= 0.5) or
+            (freq_range_percent >= 0.75 and volt_range_percent <= 0.75)):
+            return Decision(RAISE_VOLTAGE, frequency, voltage + params.voltage_step, False,
+                            expected_hashrate, target_hashrate)
+        if ((freq_range_percent < 0.25 and volt_range_percent <= 0.25) or
+            (freq_range_percent < 0.5 and volt_range_percent <= 0.5) or
+            (freq_range_percent < 0.75 and volt_range_percent <= 0.75)):
+            return Decision(RAISE_FREQUENCY, frequency + params.frequency_step, voltage, False,
+                            expected_hashrate, target_hashrate)
+        return Decision(AT_MAX, frequency, voltage, False, expected_hashrate, target_hashrate)
+
+    if expected_hashrate < hashrate < target_hashrate:
+        next_tier = tier_table.next_tier(frequency)
+        if next_tier:
+            return Decision(TIER_UP, *next_tier, False, expected_hashrate, target_hashrate)
+        return Decision(TIER_AT_MAX, frequency, voltage, False, expected_hashrate, target_hashrate)
+
+    if hashrate > expected_hashrate and hashrate > target_hashrate:
+        return Decision(HEALTHY, frequency, voltage, False, expected_hashrate, target_hashrate)
+
+    return Decision(INEFFICIENT, max(frequency - params.frequency_step, limits.min_freq),
+                    max(voltage - params.voltage_step, limits.min_volt), True, expected_hashrate, target_hashrate)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def decide_batch(states, telemetry, limits, params, tier_table, now, use_numpy=True):
+    """Apply `decide` to a whole fleet in one pass.
+
+    `states`, `telemetry` and `limits` hold one sequence per field (e.g.
+    ``{"frequency": [...], "voltage": [...], "last_tune_time": [...]}``), all of
+    the same length; `params`, `tier_table` and `now` are shared. Returns a dict
+    of equal-length sequences: reason, frequency, voltage, stepping_down,
+    expected_hashrate, target_hashrate and changed. Uses NumPy arrays when
+    available and `use_numpy` is set, plain lists otherwise.
+    """
+    np = _numpy() if use_numpy else None
+    if np is None:
+        return _decide_batch_python(states, telemetry, limits, params, tier_table, now)
+
+    def columns(source, fields):
+        return {field: np.asarray(source[field], dtype=float) for field in fields}
+
+    s, t, lim = columns(states, State._fields), columns(telemetry, Telemetry._fields), columns(limits, Limits._fields)
+    frequency, voltage, hashrate = s["frequency"], s["voltage"], t["hashrate"]
+    size = len(frequency)
+
+    expected = np.trunc(frequency * (t["small_core_count"] * t["asic_count"] / 1000))
+    tier_freqs = np.asarray(tier_table.frequencies, dtype=float)
+    tier_volts = np.asarray(tier_table.voltages, dtype=float)
+    if len(tier_freqs):
+        floor_idx = np.maximum(np.searchsorted(tier_freqs, frequency, side="right") - 1, 0)
+        target = np.asarray(tier_table.target_hashrates, dtype=float)[floor_idx]
+        previous_idx = np.searchsorted(tier_freqs, frequency, side="left") - 1
+        next_idx = np.searchsorted(tier_freqs, frequency, side="right")
+    else:
+        target = np.zeros(size)
+        previous_idx = np.full(size, -1)
+        next_idx = np.zeros(size, dtype=int)
+    has_previous = previous_idx >= 0
+    has_next = next_idx < len(tier_freqs)
+    previous_idx = np.clip(previous_idx, 0, max(len(tier_freqs) - 1, 0))
+    next_idx = np.clip(next_idx, 0, max(len(tier_freqs) - 1, 0))
+
+    with np.errstate(divide="ignore", invalid="ignore"):  # zero-width ranges are replaced below, as in decide
+        volt_width, freq_width = lim["max_volt"] - lim["min_volt"], lim["max_freq"] - lim["min_freq"]
+        volt_pct = np.where(volt_width != 0, (voltage - lim["min_volt"]) / volt_width, 1.0)
+        freq_pct = np.where(freq_width != 0, (frequency - lim["min_freq"]) / freq_width, 1.0)
+
+    temp = t["temp"]
+    waiting = now - s["last_tune_time"] < params.refresh_interval
+    over = (np.isnan(temp) | (t["power"] > lim["max_watts"]) | (temp > lim["max_temp"])
+            | (t["vr_temp"] > lim["max_vr_temp"]))
+    cool = (temp < lim["max_temp"] - params.temp_tolerance) & (t["power"] < lim["max_watts"]) & (hashrate < expected)
+    raise_volt = (((freq_pct >= 0.25) & (volt_pct <= 0.25)) | ((freq_pct >= 0.5) & (volt_pct <= 0.5))
+                  | ((freq_pct >= 0.75) & (volt_pct <= 0.75)))
+    raise_freq = (((freq_pct < 0.25) & (volt_pct <= 0.25)) | ((freq_pct < 0.5) & (volt_pct <= 0.5))
+                  | ((freq_pct < 0.75) & (volt_pct <= 0.75)))
+    below_target = (hashrate > expected) & (hashrate < target)
+    healthy = (hashrate > expected) & (hashrate > target)
+
+    reason = np.select(
+        [waiting, over & has_previous, over, cool & raise_volt, cool & raise_freq, cool,
+         below_target & has_next, below_target, healthy],
+        [WAIT, OVER_LIMIT_DROP, OVER_LIMIT_AT_MIN, RAISE_VOLTAGE, RAISE_FREQUENCY, AT_MAX,
+         TIER_UP, TIER_AT_MAX, HEALTHY],
+        default=INEFFICIENT)
+
+    new_frequency = np.select(
+        [reason == OVER_LIMIT_DROP, reason == TIER_UP, reason == RAISE_FREQUENCY, reason == INEFFICIENT],
+        [tier_freqs[previous_idx] if len(tier_freqs) else frequency,
+         tier_freqs[next_idx] if len(tier_freqs) else frequency,
+         frequency + params.frequency_step,
+         np.maximum(frequency - params.frequency_step, lim["min_freq"])],
+        default=frequency)
+    new_voltage = np.select(
+        [reason == OVER_LIMIT_DROP, reason == TIER_UP, reason == RAISE_VOLTAGE, reason == INEFFICIENT],
+        [tier_volts[previous_idx] if len(tier_volts) else voltage,
+         tier_volts[next_idx] if len(tier_volts) else voltage,
+         voltage + params.voltage_step,
+         np.maximum(voltage - params.voltage_step, lim["min_volt"])],
+        default=voltage)
+
+    return {
+        "reason": reason,
+        "frequency": new_frequency,
+        "voltage": new_voltage,
+        "stepping_down": (reason == OVER_LIMIT_DROP) | (reason == OVER_LIMIT_AT_MIN) | (reason == INEFFICIENT),
+        "expected_hashrate": expected,
+        "target_hashrate": target,
+        "changed": (new_frequency != frequency) | (new_voltage != voltage),
+    }
+
+
+def _decide_batch_python(states, telemetry, limits, params, tier_table, now):
+    result = {field: [] for field in Decision._fields + ("changed",)}
+    rows = zip(zip(*(states[field] for field in State._fields)),
+               zip(*(telemetry[field] for field in Telemetry._fields)),
+               zip(*(limits[field] for field in Limits._fields)))
+    for state, reading, limit in rows:
+        state = State(*state)
+        decision = decide(state, Telemetry(*reading), Limits(*limit), params, tier_table, now)
+        for field, value in zip(Decision._fields, decision):
+            result[field].append(value)
+        result["changed"].append(decision.changed(state))
+    return result
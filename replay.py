@@ -0,0 +1,316 @@
+"""Replay the autotuner offline on a virtual clock.
+
+Runs the same `MinerTuner` decisions as `monitor_and_adjust`, but instead of
+sleeping it advances a virtual clock, so hours of tuning take seconds. Readings
+come either from `simulator.SimulatedMiner` (closed loop: applied settings
+change temperature, power and hashrate) or from rows recorded in the telemetry
+history database (open loop: shows what the policy would have done with the
+readings that were actually seen; the readings don't react to its changes).
+
+    python replay.py --hours 6 --voltage-step 5 10 20 --frequency-step 5 25
+    python replay.py --miners 20 --ambient 30 --refresh-interval 0 60 300 --json replay.json
+    python replay.py --db telemetry.db --ip 192.168.1.50 --hours 24
+
+Every combination of the what-if values is replayed and reported with the
+number of settings changes and restarts, the time until the settings stopped
+changing (convergence) and how many readings were over a limit.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+from autotune import MinerTuner, FLATLINE_RESTART_WAIT, get_tier_table
+from config import get_config_snapshot, get_miner_defaults
+from history import TelemetryHistory, FIELDS
+from simulator import SimulatedMiner
+
+# Used when --ip is not a configured miner (a stock Gamma)
+DEFAULT_LIMITS = {"min_freq": 400, "max_freq": 650, "min_volt": 1000, "max_volt": 1300, "max_temp": 65,
+                  "max_watts": 22, "max_vr_temp": 70, "start_freq": 525, "start_volt": 1150}
+# What-if settings and the defaults the tuner falls back to when config.json lacks them
+WHAT_IF_DEFAULTS = {"voltage_step": 10, "frequency_step": 5, "refresh_interval": 60, "monitor_interval": 5,
+                    "hashrate_smoothing": 0.3}
+
+
+class SimulatedSource:
+    """Closed loop: readings from a SimulatedMiner that follows the applied settings."""
+
+    def __init__(self, miner, flatline_rate=0.0):
+        self.miner = miner
+        self.flatline_rate = flatline_rate
+        self.start_time = 0
+        self.end_time = None  # open-ended: pass a duration
+        self._clock = 0
+
+    def reading(self, now):
+        self.miner.advance(now - self._clock)
+        self._clock = now
+        if self.miner.rebooting:
+            return None
+        if self.miner.flatline_hashrate is None and self.miner.rng.random() < self.flatline_rate:
+            self.miner.start_flatline()
+        return self.miner.info()
+
+    def apply(self, frequency, voltage):
+        self.miner.apply({"frequency": frequency, "coreVoltage": voltage})
+
+    def restart(self):
+        self.miner.restart()
+
+
+class RecordedSource:
+    """Open loop: rows from the telemetry history in timestamp order.
+
+    `reading(now)` returns the newest row at or before `now` that hasn't been
+    returned yet. Applied settings and restarts are only recorded in the
+    trajectory; they can't change what was measured.
+    """
+
+    def __init__(self, rows, small_core_count=2040, asic_count=1):
+        self.rows = rows
+        self.small_core_count = small_core_count
+        self.asic_count = asic_count
+        self.start_time = rows[0]["ts"] if rows else 0
+        self.end_time = rows[-1]["ts"] + 1 if rows else 0
+        self._next = 0
+
+    @classmethod
+    def from_history(cls, path, ip, start=None, end=None, **kwargs):
+        history = TelemetryHistory(path).open()
+        try:
+            return cls(history.query(ip, start, end), **kwargs)
+        finally:
+            history.stop()
+
+    def reading(self, now):
+        row = None
+        while self._next < len(self.rows) and self.rows[self._next]["ts"] <= now:
+            row = self.rows[self._next]
+            self._next += 1
+        if row is None:
+            return None
+        info = {key: row[column] for column, key in FIELDS if row[column] is not None}
+        info.update(smallCoreCount=self.small_core_count, asicCount=self.asic_count)
+        return info
+
+    def apply(self, frequency, voltage):
+        pass
+
+    def restart(self):
+        pass
+
+
+class ReplayResult:
+    """Trajectory and summary of one replay."""
+
+    def __init__(self, name, settings, limits):
+        self.name = name
+        self.settings = settings
+        self.limits = limits
+        self.trajectory = []  # (time, frequency, voltage, temp, vr_temp, power, hashrate, action)
+        self.changes = []  # times at which new settings were applied
+        self.applies = 0
+        self.restarts = 0
+        self.violations = {"temp": 0, "vr_temp": 0, "power": 0}
+        self.duration = 0
+
+    def record(self, now, tuner, info, action):
+        limits = self.limits
+        temp, vr_temp, power = info.get("temp"), info.get("vrTemp"), info.get("power")
+        if temp is not None and temp > limits["max_temp"]:
+            self.violations["temp"] += 1
+        if vr_temp is not None and limits.get("max_vr_temp") not in (None, "") and vr_temp > limits["max_vr_temp"]:
+            self.violations["vr_temp"] += 1
+        if power is not None and power > limits["max_watts"]:
+            self.violations["power"] += 1
+        self.trajectory.append((now, tuner.current_frequency, tuner.current_voltage, temp, vr_temp, power,
+                                info.get("hashRate"), action or "hold"))
+
+    def convergence_time(self, settle):
+        """Seconds until the last settings change, if nothing changed for `settle` seconds afterwards."""
+        last_change = self.changes[-1] if self.changes else 0
+        if self.duration - last_change < settle:
+            return None
+        return last_change
+
+    def summary(self, settle):
+        final = self.trajectory[-1] if self.trajectory else None
+        return {
+            "miner": self.name,
+            "readings": len(self.trajectory),
+            "applies": self.applies,
+            "restarts": self.restarts,
+            "convergence_s": self.convergence_time(settle),
+            "violations": dict(self.violations),
+            "final_frequency": final[1] if final else None,
+            "final_voltage": final[2] if final else None,
+        }
+
+
+def run_replay(source, limits, config, duration=None, tier_table=None, name="miner", log_callback=None):
+    """Drive a MinerTuner from `source` on a virtual clock, the way `monitor_and_adjust` does.
+
+    `config` supplies the step sizes, `refresh_interval`, `monitor_interval`
+    and flatline settings; `duration` (seconds) defaults to the source's span.
+    Tuner log messages go to `log_callback`, prefixed with the virtual time.
+    """
+    interval = config.get("monitor_interval", 5)
+
+    def tuner_log(message, level="info"):
+        if log_callback:
+            log_callback(f"[+{int(now - start)}s] {message}", level)
+
+    start = source.start_time
+    now = start
+    tuner = MinerTuner(name, tuner_log,
+                       limits["min_freq"], limits["max_freq"], limits["min_volt"], limits["max_volt"],
+                       limits["max_temp"], limits["max_watts"], limits.get("start_freq"), limits.get("start_volt"),
+                       limits.get("max_vr_temp"), tier_table=tier_table,
+                       flatline_enabled=config.get("flatline_detection_enabled", True),
+                       flatline_repeat_count=config.get("flatline_hashrate_repeat_count", 5),
+                       flatline_min_variation=config.get("flatline_min_variation", 0.001),
+                       stats_window=config.get("stats_window", 12),
+                       hashrate_smoothing=config.get("hashrate_smoothing", 0.3))
+    result = ReplayResult(name, {key: config.get(key, default) for key, default in WHAT_IF_DEFAULTS.items()}, limits)
+    end = start + duration if duration is not None else source.end_time
+    source.apply(tuner.current_frequency, tuner.current_voltage)
+
+    while now < end:
+        info = source.reading(now)
+        if info is None:  # offline (rebooting) or no new row yet
+            now += interval
+            continue
+
+        action = tuner.evaluate(info, config, now=now)
+        result.record(now - start, tuner, info, action)
+        if action == MinerTuner.RESTART:
+            result.restarts += 1
+            source.restart()
+            now += FLATLINE_RESTART_WAIT
+            continue
+        if action == MinerTuner.APPLY:
+            result.applies += 1
+            result.changes.append(now - start)
+            source.apply(tuner.current_frequency, tuner.current_voltage)
+        now += interval
+
+    result.duration = end - start
+    return result
+
+
+def what_if_configs(base, overrides):
+    """One config per combination of the `overrides` values ({key: [values]})."""
+    keys = [key for key in WHAT_IF_DEFAULTS if overrides.get(key)]
+    for values in itertools.product(*(overrides[key] for key in keys)):
+        yield dict(base, **dict(zip(keys, values)))
+
+
+def summarize(results, settle):
+    """Fleet-level summary of one what-if combination."""
+    summaries = [result.summary(settle) for result in results]
+    converged = [s["convergence_s"] for s in summaries if s["convergence_s"] is not None]
+    return {
+        "settings": results[0].settings,
+        "miners": len(results),
+        "converged": len(converged),
+        "convergence_median_s": statistics.median(converged) if converged else None,
+        "convergence_max_s": max(converged) if converged else None,
+        "applies": sum(s["applies"] for s in summaries),
+        "restarts": sum(s["restarts"] for s in summaries),
+        "violations": {key: sum(s["violations"][key] for s in summaries) for key in ("temp", "vr_temp", "power")},
+        "per_miner": summaries,
+    }
+
+
+def format_table(reports):
+    header = (f"{'volt step':>9} {'freq step':>9} {'refresh':>7} {'interval':>8} {'smooth':>6} | "
+              f"{'converged':>9} "
+              f"{'median':>8} {'max':>8} {'applies':>7} {'restarts':>8} {'temp':>5} {'vr':>5} {'power':>5}")
+    lines = [header, "-" * len(header)]
+
+    def minutes(seconds):
+        return "-" if seconds is None else f"{seconds / 60:.1f}m"
+
+    for report in reports:
+        settings, violations = report["settings"], report["violations"]
+        lines.append(f"{settings['voltage_step']:>9} {settings['frequency_step']:>9} {settings['refresh_interval']:>7} "
+                     f"{settings['monitor_interval']:>8} {settings['hashrate_smoothing']:>6} | {report['converged']:>4}/{report['miners']:<4} "
+                     f"{minutes(report['convergence_median_s']):>8} {minutes(report['convergence_max_s']):>8} "
+                     f"{report['applies']:>7} {report['restarts']:>8} {violations['temp']:>5} "
+                     f"{violations['vr_temp']:>5} {violations['power']:>5}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="replay readings recorded in this telemetry history database")
+    parser.add_argument("--ip", help="miner to replay from --db; its AutoTuner limits are used if configured")
+    parser.add_argument("--start", type=int, help="first recorded timestamp to replay (unix seconds)")
+    parser.add_argument("--end", type=int, help="last recorded timestamp to replay (unix seconds)")
+    parser.add_argument("--small-core-count", type=int, default=2040, help="not recorded; used with --db")
+    parser.add_argument("--asic-count", type=int, default=1, help="not recorded; used with --db")
+    parser.add_argument("--miners", type=int, default=1, help="simulated miners per combination")
+    parser.add_argument("--hours", type=float, help="time to replay (default: 6 simulated hours, or the whole recording)")
+    parser.add_argument("--ambient", type=float, default=25.0, help="simulated ambient temperature in °C")
+    parser.add_argument("--flatline-rate", type=float, default=0.0, help="chance per simulated reading of a flatline")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--voltage-step", type=int, nargs="+")
+    parser.add_argument("--frequency-step", type=int, nargs="+")
+    parser.add_argument("--refresh-interval", type=int, nargs="+")
+    parser.add_argument("--monitor-interval", type=int, nargs="+")
+    parser.add_argument("--hashrate-smoothing", type=float, nargs="+", help="EWMA weight of the newest hashrate (1 = off)")
+    parser.add_argument("--tiers", action=argparse.BooleanOptionalAction,
+                        help="enforce the safe tier table (default: enforce_safe_pairing in config.json)")
+    parser.add_argument("--settle", type=float, default=600,
+                        help="seconds without a settings change that count as converged")
+    parser.add_argument("--json", help="also write summaries and full trajectories to this file")
+    parser.add_argument("--verbose", action="store_true", help="print the tuner's log with virtual timestamps")
+    args = parser.parse_args(argv)
+    if args.db and not args.ip:
+        parser.error("--db needs --ip")
+    if args.db and not os.path.exists(args.db):
+        parser.error(f"{args.db} does not exist")
+
+    base = dict(get_config_snapshot())
+    limits = dict(DEFAULT_LIMITS)
+    if args.ip:
+        limits.update({key: value for key, value in get_miner_defaults(args.ip).items()
+                       if key in DEFAULT_LIMITS and value not in (None, "")})
+    enforce_tiers = base.get("enforce_safe_pairing", False) if args.tiers is None else args.tiers
+    tier_table = get_tier_table() if enforce_tiers else None
+    overrides = {key: getattr(args, key) for key in WHAT_IF_DEFAULTS}
+
+    reports, trajectories = [], []
+    for config in what_if_configs(base, overrides):
+        results = []
+        if args.db:
+            source = RecordedSource.from_history(args.db, args.ip, args.start, args.end,
+                                                 small_core_count=args.small_core_count, asic_count=args.asic_count)
+            if not source.rows:
+                parser.error(f"no readings for {args.ip} in {args.db}")
+            sources = [(args.ip, source, args.hours * 3600 if args.hours else None)]
+        else:
+            rng = random.Random(args.seed)  # same miners for every combination
+            sources = [(f"sim-{idx}", SimulatedSource(SimulatedMiner(f"sim-{idx}", ambient=args.ambient,
+                                                                     rng=random.Random(rng.random())),
+                                                      args.flatline_rate), (args.hours or 6) * 3600)
+                       for idx in range(args.miners)]
+
+        for name, source, duration in sources:
+            results.append(run_replay(source, limits, config, duration, tier_table, name,
+                                      (lambda message, level="info": print(message)) if args.verbose else None))
+        report = summarize(results, args.settle)
+        reports.append(report)
+        trajectories.append({result.name: result.trajectory for result in results})
+
+    print(format_table(reports))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump([dict(report, trajectories=trajectory) for report, trajectory in zip(reports, trajectories)],
+                      file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
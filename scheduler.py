@@ -0,0 +1,304 @@
+"""Cron-like jobs: scheduled restarts and time-of-day limit profiles.
+
+Jobs come from config.json: the daily reset (`daily_reset_enabled` /
+`daily_reset_time`) plus every entry of `schedules`, e.g.
+
+    "profiles": {"hot_afternoon": {"max_temp": 60, "max_watts": 18}},
+    "schedules": [
+        {"name": "afternoon", "at": "0 13 * * mon-fri", "profile": "hot_afternoon"},
+        {"name": "evening", "at": "0 19 * * *", "profile": null},
+        {"name": "weekly restart", "at": "30 4 * * sun", "action": "restart"}
+    ]
+
+`at` is a five-field cron expression (minute hour day-of-month month
+day-of-week, with `*`, lists, ranges, steps and month/day names) or "HH:MM"
+for every day. A profile job switches every miner (or the profile's `miners`)
+to the profile's limits until the next profile job; `null` goes back to the
+limits in `miners`. A restart job restarts every configured miner (or its
+`miners`).
+
+One `Scheduler` thread keeps the jobs in a heap ordered by their next run
+time and sleeps until the earliest is due, so a run can't be missed or
+repeated because a check came late.
+"""
+import heapq
+import itertools
+import json
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+MAX_SLEEP = 300  # seconds; re-check the heap at least this often in case the wall clock jumps
+MAX_SEARCH_DAYS = 5 * 366  # long enough for a job that only runs on February 29
+PROFILE_LOOKBACK_DAYS = 8  # how far back to look for the profile that is in effect at start-up
+
+MONTH_NAMES = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+DAY_NAMES = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+
+def _parse_field(text, low, high, names=None):
+    def value(token):
+        if names and token in names:
+            return names.index(token) + low
+        number = int(token)
+        if not low <= number <= high:
+            raise ValueError(f"{number} is outside {low}-{high}")
+        return number
+
+    values = set()
+    for part in text.lower().split(","):
+        part, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if step < 1:
+            raise ValueError(f"bad step in {text!r}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = map(value, part.split("-", 1))
+        else:
+            start = value(part)
+            end = high if step > 1 else start  # "5/15" means 5, 20, 35, ...
+        if start > end:
+            raise ValueError(f"bad range in {text!r}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSpec:
+    """A parsed cron expression; times are naive local datetimes."""
+
+    def __init__(self, expression):
+        self.expression = expression
+        if ":" in expression and " " not in expression.strip():  # "HH:MM" every day
+            hour, minute = expression.strip().split(":")
+            expression = f"{int(minute)} {int(hour)} * * *"
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"expected 5 fields or HH:MM, got {self.expression!r}")
+        self.minutes = sorted(_parse_field(fields[0], 0, 59))
+        self.hours = sorted(_parse_field(fields[1], 0, 23))
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12, MONTH_NAMES)
+        self.weekdays = {day % 7 for day in _parse_field(fields[4], 0, 7, DAY_NAMES)}  # 0 and 7 are Sunday
+        # Like cron: when both day fields are restricted, a day matching either one counts
+        self._either_day = fields[2] != "*" and fields[4] != "*"
+
+    def __repr__(self):
+        return f"CronSpec({self.expression!r})"
+
+    def matches_day(self, day):
+        if day.month not in self.months:
+            return False
+        by_date = day.day in self.days
+        by_weekday = (day.weekday() + 1) % 7 in self.weekdays
+        return by_date or by_weekday if self._either_day else by_date and by_weekday
+
+    def next_after(self, moment):
+        """First matching minute strictly after `moment`."""
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        for _ in range(MAX_SEARCH_DAYS):
+            if self.matches_day(day):
+                for hour in self.hours:
+                    if day == start.date() and hour < start.hour:
+                        continue
+                    for minute in self.minutes:
+                        if day == start.date() and hour == start.hour and minute < start.minute:
+                            continue
+                        return datetime(day.year, day.month, day.day, hour, minute)
+            day += timedelta(days=1)
+        raise ValueError(f"{self.expression!r} never matches")
+
+    def previous_before(self, moment, max_days=PROFILE_LOOKBACK_DAYS):
+        """Last matching minute at or before `moment`, or None if there is none within `max_days`."""
+        end = moment.replace(second=0, microsecond=0)
+        day = end.date()
+        for _ in range(max_days + 1):
+            if self.matches_day(day):
+                for hour in reversed(self.hours):
+                    if day == end.date() and hour > end.hour:
+                        continue
+                    for minute in reversed(self.minutes):
+                        if day == end.date() and hour == end.hour and minute > end.minute:
+                            continue
+                        return datetime(day.year, day.month, day.day, hour, minute)
+            day -= timedelta(days=1)
+        return None
+
+
+class Job(namedtuple("Job", "name spec action profile miners")):
+    """One schedule entry: `action` is "restart" or "profile"; `miners` None means all of them."""
+    __slots__ = ()
+
+    def next_after(self, timestamp):
+        """Unix time of the next run after `timestamp`."""
+        return self.spec.next_after(datetime.fromtimestamp(timestamp)).timestamp()
+
+
+def jobs_from_config(config, log_callback=None):
+    """Jobs for the daily reset and the `schedules` in config.json; invalid entries are logged and skipped."""
+    entries = []
+    if config.get("daily_reset_enabled", False):
+        entries.append({"name": "daily reset", "at": config.get("daily_reset_time", "03:00"), "action": "restart"})
+    entries.extend(config.get("schedules", ()))
+    profiles = config.get("profiles", {})
+
+    jobs = []
+    for idx, entry in enumerate(entries):
+        name = entry.get("name") or f"schedule {idx + 1}"
+        action = entry.get("action", "profile" if "profile" in entry else None)
+        try:
+            spec = CronSpec(str(entry["at"]))
+            if action not in ("restart", "profile"):
+                raise ValueError(f"unknown action {action!r}")
+            if action == "profile" and entry.get("profile") is not None and entry["profile"] not in profiles:
+                raise ValueError(f"unknown profile {entry['profile']!r}")
+        except (KeyError, ValueError) as e:
+            if log_callback:
+                log_callback(f"Schedule {name!r} ignored: {e}", "error")
+            continue
+        jobs.append(Job(name, spec, action, entry.get("profile"), entry.get("miners")))
+    return jobs
+
+
+def profile_in_effect(jobs, now):
+    """Profile set by the most recent profile job at or before `now` (None = configured limits)."""
+    latest, profile = None, None
+    for job in jobs:
+        if job.action == "profile":
+            last_run = job.spec.previous_before(datetime.fromtimestamp(now))
+            if last_run and (latest is None or last_run > latest):
+                latest, profile = last_run, job.profile
+    return profile
+
+
+class Scheduler:
+    """Runs `Job`s at their times on one thread.
+
+    Restart jobs call `restart_callback(miners, stop_event)`; profile jobs set
+    `active_profile` and call `on_profile_change()` so the owner can re-limit
+    the running tuners. Each run happens on its own short-lived thread, so a
+    slow fleet restart doesn't delay the next job.
+    """
+
+    def __init__(self, log_callback=None, restart_callback=None, on_profile_change=None):
+        self.log_callback = log_callback or (lambda message, level="info": None)
+        self.restart_callback = restart_callback
+        self.on_profile_change = on_profile_change
+        self.active_profile = None
+        self.stop_event = threading.Event()
+        self._cond = threading.Condition()
+        self._heap = []  # (next run unix time, tie-breaker, Job)
+        self._seq = itertools.count()
+        self._signature = None  # schedule-related config the heap was built from
+        self._thread = None
+
+    @staticmethod
+    def _config_signature(config):
+        return json.dumps([config.get("daily_reset_enabled", False), config.get("daily_reset_time", "03:00"),
+                           config.get("schedules", []), config.get("profiles", {})], sort_keys=True, default=str)
+
+    def reload(self, config, now=None):
+        """Rebuild the jobs if the schedule-related settings changed. Returns True if they did."""
+        signature = self._config_signature(config)
+        if signature == self._signature:
+            return False
+        first_load = self._signature is None
+        now = time.time() if now is None else now
+        jobs = jobs_from_config(config, self.log_callback)
+        with self._cond:
+            self._heap = [(job.next_after(now), next(self._seq), job) for job in jobs]
+            heapq.heapify(self._heap)
+            self._signature = signature
+            next_run = self._heap[0][0] if self._heap else None
+            self._cond.notify()
+        if next_run is not None:
+            self.log_callback(f"Scheduler: {len(jobs)} job(s), next at {datetime.fromtimestamp(next_run):%Y-%m-%d %H:%M}.",
+                              "info")
+
+        profile = profile_in_effect(jobs, now)
+        if profile != self.active_profile or (first_load and profile):
+            self.switch_profile(profile, "current schedule", notify=not first_load)
+        return True
+
+    def switch_profile(self, profile, reason, notify=True):
+        self.active_profile = profile
+        if profile:
+            self.log_callback(f"Switching to limit profile {profile!r} ({reason}).", "warning")
+        else:
+            self.log_callback(f"Back to the configured limits ({reason}).", "info")
+        if notify and self.on_profile_change:
+            self.on_profile_change()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="scheduler")
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self.stop_event.set()
+        with self._cond:
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self):
+        with self._cond:
+            while not self.stop_event.is_set():
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, job = self._heap[0]
+                delay = due - time.time()
+                if delay > 0:
+                    self._cond.wait(min(delay, MAX_SLEEP))
+                    continue
+                # Reschedule from now, not from `due`: after a suspend or clock jump a job runs once, not once per
+                # missed time
+                heapq.heapreplace(self._heap, (job.next_after(max(due, time.time())), next(self._seq), job))
+                threading.Thread(target=self._run_job, args=(job,), daemon=True, name=f"job-{job.name}").start()
+
+    def _run_job(self, job):
+        try:
+            if job.action == "restart":
+                self.log_callback(f"Scheduled restart {job.name!r} triggered. Restarting "
+                                  f"{'all miners' if job.miners is None else f'{len(job.miners)} miner(s)'}...",
+                                  "warning")
+                if self.restart_callback:
+                    self.restart_callback(job.miners, self.stop_event)
+            elif job.profile != self.active_profile:
+                self.switch_profile(job.profile, job.name)
+        except Exception as e:
+            self.log_callback(f"Scheduled job {job.name!r} failed: {e}", "error")
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def start_scheduler(config, log_callback=None, restart_callback=None, on_profile_change=None):
+    """Start the single scheduler, or reload the running one's jobs from `config`. Returns it."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler(log_callback, restart_callback, on_profile_change)
+            _scheduler.reload(config)
+            return _scheduler.start()
+        scheduler = _scheduler
+        scheduler.log_callback = log_callback or scheduler.log_callback
+        scheduler.restart_callback = restart_callback or scheduler.restart_callback
+        scheduler.on_profile_change = on_profile_change or scheduler.on_profile_change
+        scheduler.reload(config)
+        return scheduler
+
+def stop_scheduler(timeout=1.0):
+    global _scheduler
+    with _scheduler_lock:
+        scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.stop(timeout)
+
+def active_profile():
+    """Name of the limit profile in effect, or None for the limits configured per miner."""
+    scheduler = _scheduler
+    return scheduler.active_profile if scheduler else None
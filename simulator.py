@@ -0,0 +1,320 @@
+"""Simulated Bitaxe miners for load and regression testing without hardware.
+
+Serves GET /api/system/info, PATCH /api/system and POST /api/system/restart
+for any number of virtual miners from one asyncio loop. Temperature and power
+follow the applied frequency and voltage through a simple thermal model, and
+latency, timeouts, HTTP errors and hashrate flatlines can be injected.
+
+    python simulator.py --miners 200                        # 127.0.0.1:21000 ... 127.0.0.1:21199
+    python simulator.py --hosts 127.20.0.0/24 --port 8080   # one loopback address per miner
+    python simulator.py --miners 50 --latency 0.05 --timeout-rate 0.01 --flatline-rate 0.001
+
+Each miner's address ("ip:port") is printed once the simulator is listening;
+add them to config.json or scan for them with
+`detect_miners(ranges=["127.20.0.0/24"], port=8080)`.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from config import parse_ip_ranges
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class SimulatedMiner:
+    """Thermal and hashrate model of one Bitaxe.
+
+    Power is a static draw plus a dynamic part proportional to f·V²; die and
+    VR temperatures approach ambient + power·thermal resistance with a first
+    order lag. Below the voltage a frequency needs, hashrate falls off. The
+    model only moves when `advance(seconds)` is called, so it runs equally well
+    in real time behind the HTTP server or on a virtual clock.
+    """
+
+    def __init__(self, name, model="Gamma", small_core_count=2040, asic_count=1, frequency=525, core_voltage=1150,
+                 ambient=25.0, static_power=2.0, power_coefficient=0.0187, thermal_resistance=2.5,
+                 vr_thermal_resistance=2.0, time_constant=30.0, restart_time=15.0, rng=None):
+        self.name = name
+        self.model = model
+        self.small_core_count = small_core_count
+        self.asic_count = asic_count
+        self.frequency = frequency
+        self.core_voltage = core_voltage
+        self.ambient = ambient
+        self.static_power = static_power
+        self.power_coefficient = power_coefficient  # W per MHz·V²
+        self.thermal_resistance = thermal_resistance  # °C per W, die
+        self.vr_thermal_resistance = vr_thermal_resistance  # °C per W, voltage regulator
+        self.time_constant = time_constant  # seconds to reach ~63% of a temperature step
+        self.restart_time = restart_time
+        self.rng = rng or random.Random()
+
+        # Start at the steady state of the initial settings
+        self.temp = ambient + self.power() * thermal_resistance
+        self.vr_temp = ambient + self.power() * vr_thermal_resistance
+        self.uptime = 0.0
+        self.rebooting = 0.0  # seconds left until a restart completes
+        self.flatline_hashrate = None  # stuck hashrate while a flatline fault is active
+        self.restarts = 0
+
+    def power(self):
+        return self.static_power + self.power_coefficient * self.frequency * (self.core_voltage / 1000) ** 2
+
+    def required_voltage(self):
+        """Lowest core voltage (mV) at which the current frequency hashes cleanly."""
+        return 800 + 0.6 * self.frequency
+
+    def expected_hashrate(self):
+        return self.frequency * self.small_core_count * self.asic_count / 1000
+
+    def hashrate(self):
+        if self.flatline_hashrate is not None:
+            return self.flatline_hashrate
+        shortfall = max(0.0, self.required_voltage() - self.core_voltage)
+        stability = max(0.0, 1 - shortfall / 100)  # 100 mV short of the requirement -> no valid shares
+        return self.expected_hashrate() * stability * self.rng.uniform(0.97, 1.03)
+
+    def advance(self, seconds):
+        """Move the model forward by `seconds`."""
+        if seconds <= 0:
+            return
+        if self.rebooting:
+            self.rebooting = max(0.0, self.rebooting - seconds)
+        self.uptime += seconds
+        weight = 1 - math.exp(-seconds / self.time_constant)
+        power = self.power() if not self.rebooting else self.static_power
+        self.temp += (self.ambient + power * self.thermal_resistance - self.temp) * weight
+        self.vr_temp += (self.ambient + power * self.vr_thermal_resistance - self.vr_temp) * weight
+
+    def apply(self, settings):
+        if "frequency" in settings:
+            self.frequency = int(settings["frequency"])
+        if "coreVoltage" in settings:
+            self.core_voltage = int(settings["coreVoltage"])
+
+    def restart(self):
+        self.rebooting = self.restart_time
+        self.uptime = 0.0
+        self.flatline_hashrate = None
+        self.restarts += 1
+
+    def start_flatline(self):
+        self.flatline_hashrate = round(self.hashrate(), 2)
+
+    def info(self):
+        """The /api/system/info payload."""
+        power = self.power()
+        return {
+            "hostname": self.name,
+            "ASICModel": "BM1370",
+            "model": self.model,
+            "temp": round(self.temp, 2),
+            "vrTemp": round(self.vr_temp, 2),
+            "power": round(power, 2),
+            "voltage": 5000,
+            "current": round(power / 5 * 1000, 1),
+            "hashRate": round(self.hashrate(), 2),
+            "frequency": self.frequency,
+            "coreVoltage": self.core_voltage,
+            "coreVoltageActual": self.core_voltage,
+            "smallCoreCount": self.small_core_count,
+            "asicCount": self.asic_count,
+            "uptimeSeconds": int(self.uptime),
+        }
+
+
+class FaultProfile:
+    """Latency and failure injection applied to every simulated request."""
+
+    def __init__(self, latency=0.0, jitter=0.0, timeout_rate=0.0, error_rate=0.0, flatline_rate=0.0,
+                 hang_seconds=60.0):
+        self.latency = latency  # seconds added to every response
+        self.jitter = jitter  # extra random delay, uniform in [0, jitter]
+        self.timeout_rate = timeout_rate  # share of requests that never get an answer
+        self.error_rate = error_rate  # share of requests answered with HTTP 500
+        self.flatline_rate = flatline_rate  # chance per reading that the hashrate freezes until a restart
+        self.hang_seconds = hang_seconds
+
+
+class Simulator:
+    """Serves a fleet of SimulatedMiner objects over HTTP on localhost.
+
+    Either `count` miners on consecutive ports from `base_port`, or one miner
+    per address in `hosts` (e.g. "127.20.0.0/24") on the same `port`. Use
+    `serve_forever()` from the command line or `start()`/`stop()` to run it on
+    a background thread inside a benchmark.
+    """
+
+    def __init__(self, count=1, host="127.0.0.1", base_port=21000, hosts=None, port=80, faults=None,
+                 time_scale=1.0, seed=None):
+        if hosts:
+            self.addresses = [(ip, port) for ip in parse_ip_ranges(hosts)]
+        else:
+            self.addresses = [(host, base_port + idx) for idx in range(count)]
+        self.faults = faults or FaultProfile()
+        self.time_scale = time_scale  # model seconds per wall-clock second
+        self.rng = random.Random(seed)
+        self.miners = {f"{ip}:{port}": SimulatedMiner(f"sim-{idx}", rng=random.Random(self.rng.random()))
+                       for idx, (ip, port) in enumerate(self.addresses)}
+        self._last_advance = {}
+        self._loop = None
+        self._stop_event = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def ips(self):
+        """Miner addresses as used in config.json ("ip:port")."""
+        return list(self.miners)
+
+    def _advance(self, address):
+        now = time.monotonic()
+        miner = self.miners[address]
+        miner.advance((now - self._last_advance.get(address, now)) * self.time_scale)
+        self._last_advance[address] = now
+        return miner
+
+    def _route(self, address, method, path, body):
+        miner = self._advance(address)
+        if method == "GET" and path == "/api/system/info":
+            if miner.flatline_hashrate is None and self.rng.random() < self.faults.flatline_rate:
+                miner.start_flatline()
+            return 200, miner.info()
+        if method == "PATCH" and path == "/api/system":
+            try:
+                miner.apply(json.loads(body or b"{}"))
+            except (ValueError, TypeError):
+                return 400, {"error": "invalid settings"}
+            return 200, {}
+        if method == "POST" and path == "/api/system/restart":
+            miner.restart()
+            return 200, {"message": "System will restart shortly."}
+        return 404, {"error": "not found"}
+
+    async def _handle(self, address, reader, writer):
+        faults = self.faults
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path = request_line.decode("latin-1").split()[:2]
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                body = await reader.readexactly(length) if length else b""
+
+                if self._advance(address).rebooting:
+                    break  # Offline while restarting: drop the connection
+                if faults.latency or faults.jitter:
+                    await asyncio.sleep(faults.latency + self.rng.uniform(0, faults.jitter))
+                if faults.timeout_rate and self.rng.random() < faults.timeout_rate:
+                    await asyncio.sleep(faults.hang_seconds)
+                    break
+                if faults.error_rate and self.rng.random() < faults.error_rate:
+                    status, payload = 500, {"error": "simulated failure"}
+                else:
+                    status, payload = self._route(address, method, path.split("?")[0], body)
+
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                             "Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def run(self, on_ready=None):
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        servers = []
+        for address, (ip, port) in zip(self.miners, self.addresses):
+            handler = lambda reader, writer, address=address: self._handle(address, reader, writer)
+            servers.append(await asyncio.start_server(handler, ip, port, backlog=16))
+        self._ready.set()
+        if on_ready:
+            on_ready()
+        try:
+            await self._stop_event.wait()
+        finally:
+            for server in servers:
+                server.close()
+
+    def serve_forever(self, on_ready=None):
+        asyncio.run(self.run(on_ready))
+
+    def start(self, timeout=30):
+        """Serve on a background thread; returns once every miner is listening."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True, name="bitaxe-simulator")
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("Simulator did not start listening in time")
+        return self
+
+    def stop(self, timeout=5):
+        if self._loop is not None and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        if self._thread:
+            self._thread.join(timeout)
+
+
+def raise_open_file_limit(needed):
+    """Each simulated miner needs a listening socket plus one per client connection."""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve simulated Bitaxe miners on localhost.")
+    parser.add_argument("--miners", type=int, default=10, help="number of miners on consecutive ports")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=21000)
+    parser.add_argument("--hosts", help="one miner per address instead, e.g. 127.20.0.0/24 (Linux loopback)")
+    parser.add_argument("--port", type=int, default=80, help="port used with --hosts")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay up to this many seconds")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of requests never answered")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument("--flatline-rate", type=float, default=0.0, help="chance per reading of a hashrate flatline")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="thermal model speed-up")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--quiet", action="store_true", help="only print 'ready' instead of every address")
+    args = parser.parse_args(argv)
+
+    faults = FaultProfile(args.latency, args.jitter, args.timeout_rate, args.error_rate, args.flatline_rate)
+    simulator = Simulator(args.miners, args.host, args.base_port, args.hosts, args.port, faults,
+                          args.time_scale, args.seed)
+    raise_open_file_limit(len(simulator.ips) * 3 + 256)
+
+    def on_ready():
+        if not args.quiet:
+            for ip in simulator.ips:
+                print(ip)
+        print("ready", flush=True)
+
+    try:
+        simulator.serve_forever(on_ready)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
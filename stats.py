@@ -0,0 +1,160 @@
+"""Rolling statistics over a miner's recent readings.
+
+Every update is O(1) (amortised): values live in fixed-size arrays used as
+ring buffers, mean and variance are maintained with a sliding-window Welford
+update that is recomputed exactly once per wrap (or right away when an
+outlier leaving the window cancels out most of its precision), and min/max
+come from monotonic queues. The tuner reads smoothed signals from here
+instead of single noisy samples.
+"""
+import math
+from array import array
+from collections import deque
+
+# (stats name, /api/system/info key) for every tracked signal
+FIELDS = (
+    ("temp", "temp"),
+    ("vr_temp", "vrTemp"),
+    ("hashrate", "hashRate"),
+    ("power", "power"),
+)
+RESYNC_RATIO = 1e-4  # a sliding update keeping less than this fraction of the variance sum lost its precision
+
+
+class RollingWindow:
+    """Mean, variance, EWMA, min/max and rate of change of the last `size` values."""
+    __slots__ = ("size", "alpha", "count", "mean", "ewma", "_m2", "_values", "_times", "_next", "_seq",
+                 "_minq", "_maxq")
+
+    def __init__(self, size, alpha=0.3):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.alpha = alpha  # EWMA weight of the newest value
+        self._values = array("d", bytes(8 * size))
+        self._times = array("d", bytes(8 * size))
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.mean = 0.0
+        self.ewma = None
+        self._m2 = 0.0  # sum of squared deviations from the mean
+        self._next = 0  # ring position the next value goes to
+        self._seq = 0  # values pushed since the last clear
+        self._minq = deque()  # (seq, value), values increasing
+        self._maxq = deque()  # (seq, value), values decreasing
+
+    def push(self, value, timestamp=0.0):
+        value = float(value)
+        resync = False
+        if self.count < self.size:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (value - self.mean)
+        else:
+            old = self._values[self._next]
+            old_mean, old_m2 = self.mean, self._m2
+            self.mean += (value - old) / self.size
+            self._m2 += (value - old) * (value - self.mean + old - old_mean)
+            resync = self._m2 < old_m2 * RESYNC_RATIO  # negative, or mostly rounding error left
+        self._values[self._next] = value
+        self._times[self._next] = timestamp
+        self._next = (self._next + 1) % self.size
+        if resync or (self._next == 0 and self.full):
+            self._resync()
+
+        self.ewma = value if self.ewma is None else self.ewma + self.alpha * (value - self.ewma)
+
+        seq, oldest = self._seq, self._seq - self.size + 1
+        self._seq += 1
+        minq, maxq = self._minq, self._maxq
+        while minq and minq[-1][1] >= value:
+            minq.pop()
+        minq.append((seq, value))
+        if minq[0][0] < oldest:
+            minq.popleft()
+        while maxq and maxq[-1][1] <= value:
+            maxq.pop()
+        maxq.append((seq, value))
+        if maxq[0][0] < oldest:
+            maxq.popleft()
+
+    def _resync(self):
+        # Recompute from the buffer once per wrap (amortised O(1)) so rounding errors from values that
+        # left the window can't build up, and right away when most of the variance sum just cancelled out
+        # (e.g. a large outlier left), as what is left is then mostly rounding error
+        values = self._values
+        self.mean = math.fsum(values) / self.size
+        self._m2 = math.fsum((value - self.mean) ** 2 for value in values)
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    @property
+    def latest(self):
+        return self._values[self._next - 1] if self.count else None
+
+    @property
+    def variance(self):
+        """Population variance of the values in the window."""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def min(self):
+        return self._minq[0][1] if self._minq else None
+
+    @property
+    def max(self):
+        return self._maxq[0][1] if self._maxq else None
+
+    def rate(self):
+        """Change per second from the oldest to the newest value, or None if unknown."""
+        if self.count < 2:
+            return None
+        newest = self._next - 1
+        oldest = self._next % self.size if self.full else 0
+        elapsed = self._times[newest] - self._times[oldest]
+        return (self._values[newest] - self._values[oldest]) / elapsed if elapsed > 0 else None
+
+    def values(self):
+        """The values in the window, oldest first."""
+        start = self._next if self.full else 0
+        return [self._values[(start + idx) % self.size] for idx in range(self.count)]
+
+    def summary(self):
+        """Plain-dict view for the status API."""
+        if not self.count:
+            return None
+        return {"latest": self.latest, "mean": self.mean, "ewma": self.ewma, "stddev": self.stddev,
+                "min": self.min, "max": self.max, "rate_per_s": self.rate(), "samples": self.count}
+
+
+class MinerStats:
+    """A RollingWindow per tracked signal (see FIELDS) for one miner."""
+
+    def __init__(self, size=12, alpha=0.3):
+        self.windows = {name: RollingWindow(size, alpha) for name, _ in FIELDS}
+
+    def __getitem__(self, name):
+        return self.windows[name]
+
+    def update(self, info, timestamp=0.0):
+        """Add the numeric values of one /api/system/info payload."""
+        for name, key in FIELDS:
+            value = info.get(key)
+            if isinstance(value, (int, float)):
+                self.windows[name].push(value, timestamp)
+
+    def clear(self, *names):
+        for name in names or self.windows:
+            self.windows[name].clear()
+
+    def summary(self):
+        return {name: window.summary() for name, window in self.windows.items()}
@@ -0,0 +1,218 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+from config import get_config_snapshot
+from autotune import telemetry_hub, get_tuners
+from metrics import REGISTRY, CONTENT_TYPE
+
+# (metric name, help, /api/system/info key) exported for every miner's latest reading
+MINER_GAUGES = (
+    ("bitaxe_temperature_celsius", "ASIC temperature.", "temp"),
+    ("bitaxe_vr_temperature_celsius", "Voltage regulator temperature.", "vrTemp"),
+    ("bitaxe_hashrate_ghs", "Reported hash rate in GH/s.", "hashRate"),
+    ("bitaxe_power_watts", "Power draw in watts.", "power"),
+    ("bitaxe_frequency_mhz", "Applied ASIC frequency in MHz.", "frequency"),
+    ("bitaxe_core_voltage_millivolts", "Applied core voltage in mV.", "coreVoltage"),
+)
+
+
+def _as_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def collect_miner_metrics(hub=telemetry_hub, tuners=get_tuners):
+    """Registry collector: gauges from the cached readings and tuner state (no miner requests)."""
+    snapshots = hub.snapshots()
+    families = [
+        ("bitaxe_up", "gauge", "1 if the last poll of the miner succeeded.",
+         [({"ip": ip}, 1 if snapshot.ok else 0) for ip, snapshot in snapshots.items()]),
+        ("bitaxe_last_poll_timestamp_seconds", "gauge", "Unix time of the miner's latest reading.",
+         [({"ip": ip}, snapshot.timestamp) for ip, snapshot in snapshots.items()]),
+    ]
+    readings = [(ip, snapshot.info) for ip, snapshot in snapshots.items() if snapshot.ok]
+    for name, help, key in MINER_GAUGES:
+        families.append((name, "gauge", help, [({"ip": ip}, _as_number(info.get(key))) for ip, info in readings]))
+
+    tuners = tuners()
+    families.append(("bitaxe_tuner_frequency_mhz", "gauge", "Frequency the tuner last set.",
+                     [({"ip": ip}, _as_number(tuner.current_frequency)) for ip, tuner in tuners.items()]))
+    families.append(("bitaxe_tuner_core_voltage_millivolts", "gauge", "Core voltage the tuner last set.",
+                     [({"ip": ip}, _as_number(tuner.current_voltage)) for ip, tuner in tuners.items()]))
+    return families
+
+
+REGISTRY.add_collector(collect_miner_metrics)
+
+
+class FleetStatus:
+    """Serialises the in-process miner state (telemetry + tuner) to JSON.
+
+    Nothing here talks to the miners: readings come from `telemetry_hub` and
+    tuner state from the live `MinerTuner` objects. Each miner's JSON is cached
+    until its reading, tuner state or config entry changes, so a fleet-wide
+    request only re-encodes the miners that changed since the last one.
+    """
+
+    def __init__(self, hub=telemetry_hub, tuners=get_tuners):
+        self.hub = hub
+        self.tuners = tuners
+        self._cache = {}  # ip -> (key, encoded JSON)
+        self._lock = threading.Lock()
+
+    def _miners(self):
+        """{ip: (nickname, type, enabled)} for every configured miner."""
+        return {miner["ip"]: (miner.get("nickname", ""), miner.get("type", ""), bool(miner.get("enabled", False)))
+                for miner in get_config_snapshot().get("miners", ())}
+
+    @staticmethod
+    def miner_state(ip, meta, snapshot, tuner):
+        """Plain-dict state of one miner."""
+        nickname, miner_type, enabled = meta
+        state = {"ip": ip, "nickname": nickname, "type": miner_type, "enabled": enabled,
+                 "telemetry": None, "tuner": None}
+        if snapshot is not None:
+            state["telemetry"] = {"timestamp": snapshot.timestamp, "ok": snapshot.ok, "error": snapshot.error,
+                                  "info": snapshot.info}
+        if tuner is not None:
+            state["tuner"] = {
+                "frequency": tuner.current_frequency,
+                "voltage": tuner.current_voltage,
+                "stepping_down": tuner.stepping_down,
+                "last_tune_time": tuner.last_tune_time or None,
+                "last_decision": tuner.last_decision,
+                "last_decision_time": tuner.last_decision_time,
+                "last_reason": tuner.last_reason,
+                "flatline": {
+                    "enabled": tuner.flatline_enabled,
+                    "repeat_count": tuner.flatline_repeat_count,
+                    "hashrate_history": list(tuner.hashrate_history),
+                    "restarts": tuner.flatline_restarts,
+                },
+                "stats": tuner.stats.summary(),
+            }
+        return state
+
+    def _encoded(self, ip, meta, snapshot, tuner):
+        key = (meta, snapshot, tuner, tuner.version if tuner else None)
+        cached = self._cache.get(ip)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        encoded = json.dumps(self.miner_state(ip, meta, snapshot, tuner), default=str).encode()
+        self._cache[ip] = (key, encoded)
+        return encoded
+
+    def fleet_json(self):
+        """JSON bytes for every miner: {"timestamp": ..., "miners": [...]}."""
+        snapshots, tuners, miners = self.hub.snapshots(), self.tuners(), self._miners()
+        for ip in list(snapshots) + list(tuners):
+            miners.setdefault(ip, ("", "", False))
+        with self._lock:
+            for ip in set(self._cache) - set(miners):
+                del self._cache[ip]
+            parts = [self._encoded(ip, meta, snapshots.get(ip), tuners.get(ip)) for ip, meta in miners.items()]
+        return b'{"timestamp": %.3f, "miners": [%s]}' % (time.time(), b", ".join(parts))
+
+    def miner_json(self, ip):
+        """JSON bytes for one miner, or None if the IP is unknown."""
+        snapshot, tuner, meta = self.hub.latest(ip), self.tuners().get(ip), self._miners().get(ip)
+        if meta is None:
+            if snapshot is None and tuner is None:
+                return None
+            meta = ("", "", False)
+        with self._lock:
+            return self._encoded(ip, meta, snapshot, tuner)
+
+
+class StatusRequestHandler(BaseHTTPRequestHandler):
+    """GET /api/miners (whole fleet), GET /api/miners/<ip> and GET /metrics (Prometheus)."""
+
+    def do_GET(self):
+        path = unquote(self.path.split("?", 1)[0]).rstrip("/")
+        if path == "/metrics":
+            self._send(200, REGISTRY.render(), CONTENT_TYPE)
+        elif path == "/api/miners":
+            self._send(200, self.server.status.fleet_json())
+        elif path.startswith("/api/miners/"):
+            body = self.server.status.miner_json(path[len("/api/miners/"):])
+            if body is None:
+                self._send(404, b'{"error": "unknown miner"}')
+            else:
+                self._send(200, body)
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Dashboards poll constantly; keep request lines out of the tuner log
+
+
+class StatusServer:
+    """Local HTTP server for `FleetStatus`, run on a daemon thread."""
+
+    def __init__(self, host="127.0.0.1", port=8787, status=None):
+        self.host = host
+        self.port = port
+        self.status = status or FleetStatus()
+        self._server = None
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(host=config.get("status_api_host", "127.0.0.1"), port=config.get("status_api_port", 8787))
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), StatusRequestHandler)
+        self._server.daemon_threads = True
+        self._server.status = self.status
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="status-api")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_status_api(config, log_callback=None):
+    """Start the status API once, if "status_api_enabled" is set. Returns the server or None."""
+    global _server
+    if not config.get("status_api_enabled", True):
+        return None
+
+    with _server_lock:
+        if _server is None:
+            server = StatusServer.from_config(config)
+            try:
+                _server = server.start()
+            except OSError as e:
+                if log_callback:
+                    log_callback(f"Status API could not listen on {server.host}:{server.port}: {e}", "warning")
+                return None
+            if log_callback:
+                log_callback(f"Status API listening on http://{server.host}:{server.port}/api/miners", "info")
+        return _server
+
+def stop_status_api():
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.stop()
+            _server = None
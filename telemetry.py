@@ -0,0 +1,326 @@
+import heapq
+import queue
+import threading
+import time
+from config import get_config_snapshot
+from logging_setup import logger
+
+GOLDEN_RATIO_FRACTION = 0.6180339887  # spreads successive miners evenly over the interval
+TRANSITION_TEMP_DELTA = 1.0  # °C change between two readings that counts as still settling
+
+
+class TelemetrySnapshot:
+    """Latest /api/system/info reading for one miner."""
+    __slots__ = ("ip", "info", "error", "timestamp", "seq", "latency")
+
+    def __init__(self, ip, info, error, timestamp, seq, latency=None):
+        self.ip = ip
+        self.info = info  # dict payload, or None if the fetch failed
+        self.error = error  # error message, or None on success
+        self.timestamp = timestamp
+        self.seq = seq  # increases by one for every reading published for this miner
+        self.latency = latency  # seconds the fetch took, if measured
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+_limits_cache = {"config": None, "limits": {}}
+
+def _miner_limits(config, ip):
+    """(max_temp, max_vr_temp) for `ip` from config.json, built once per config version."""
+    if _limits_cache["config"] is not config:
+        _limits_cache["limits"] = {miner["ip"]: (miner.get("max_temp"), miner.get("max_vr_temp"))
+                                   for miner in config.get("miners", ())}
+        _limits_cache["config"] = config
+    return _limits_cache["limits"].get(ip, (None, None))
+
+
+def _near(value, limit, margin):
+    return isinstance(value, (int, float)) and isinstance(limit, (int, float)) and value >= limit - margin
+
+
+class PollCadence:
+    """Adaptive poll interval for one miner.
+
+    Starts from "monitor_interval" and, with "adaptive_polling" on (default):
+      - polls `poll_fast_factor` times the interval while the miner is within
+        `poll_near_limit_margin` °C of max_temp/max_vr_temp or mid-transition
+        (settings just applied, frequency/voltage changed, temperature moving);
+      - polls `poll_slow_factor` times the interval once `poll_stable_readings`
+        readings in a row were neither;
+      - backs off exponentially (up to `poll_backoff_max` seconds) while fetches fail.
+    Used by TelemetryHub's scheduler and by the asyncio engine.
+    """
+
+    def __init__(self, ip):
+        self.ip = ip
+        self.failures = 0
+        self.calm = 0  # consecutive readings away from the limits and not in transition
+        self.transition_until = 0.0
+        self._previous = None
+
+    def expedite(self, seconds, now=None):
+        """Treat the miner as mid-transition for `seconds` (e.g. after applying new settings)."""
+        now = time.monotonic() if now is None else now
+        self.transition_until = max(self.transition_until, now + seconds)
+        self.calm = 0
+
+    def in_transition(self, now=None):
+        return (time.monotonic() if now is None else now) < self.transition_until
+
+    def next_delay(self, info, config, now=None):
+        """Seconds until the next poll, given the latest result (dict, or error string/None)."""
+        now = time.monotonic() if now is None else now
+        interval = config.get("monitor_interval", 5)
+        if not config.get("adaptive_polling", True):
+            return interval
+        low, high = config.get("poll_min_interval", 1), config.get("poll_max_interval", 60)
+
+        if not isinstance(info, dict):
+            self.failures += 1
+            self.calm = 0
+            return min(interval * 2 ** (self.failures - 1), config.get("poll_backoff_max", 300))
+        self.failures = 0
+
+        previous, self._previous = self._previous, info
+        max_temp, max_vr_temp = _miner_limits(config, self.ip)
+        margin = config.get("poll_near_limit_margin", 3)
+        near_limit = _near(info.get("temp"), max_temp, margin) or _near(info.get("vrTemp"), max_vr_temp, margin)
+        moving = previous is not None and (
+            info.get("frequency") != previous.get("frequency")
+            or info.get("coreVoltage") != previous.get("coreVoltage")
+            or abs((info.get("temp") or 0) - (previous.get("temp") or 0)) >= TRANSITION_TEMP_DELTA)
+
+        if near_limit or moving or self.in_transition(now):
+            self.calm = 0
+            delay = interval * config.get("poll_fast_factor", 0.5)
+        else:
+            self.calm += 1
+            stable = self.calm >= config.get("poll_stable_readings", 3)
+            delay = interval * config.get("poll_slow_factor", 2) if stable else interval
+        return max(low, min(delay, high))
+
+
+class _PollSlot:
+    """Scheduler bookkeeping for one polled miner."""
+    __slots__ = ("ip", "cadence", "token", "busy")
+
+    def __init__(self, ip):
+        self.ip = ip
+        self.cadence = PollCadence(ip)
+        self.token = 0  # heap entries with an older token are stale
+        self.busy = False  # a fetch is in flight
+
+
+class TelemetryHub:
+    """Polls the miners on an adaptive schedule and shares the latest reading.
+
+    One scheduler thread keeps a heap of (due time, miner) and hands due polls
+    to a small pool of fetch workers ("poll_workers", default 16), instead of
+    one poller thread per miner. New miners are staggered across the monitor
+    interval and each miner's next poll comes from its `PollCadence`. The
+    autotuner and the GUI both read from the hub instead of calling the Bitaxe
+    API themselves, so every miner gets a single /api/system/info request per poll.
+    """
+
+    def __init__(self, fetch):
+        self._fetch = fetch  # fetch(ip) -> dict on success, error string on failure
+        self._snapshots = {}
+        self._slots = {}  # ip -> _PollSlot for every polled miner
+        self._heap = []  # (due monotonic time, token, ip)
+        self._added = 0  # miners scheduled so far, for staggering
+        self._jobs = queue.SimpleQueue()
+        self._workers = []
+        self._scheduler = None
+        self._listeners = []
+        self._stops = 0  # bumped by stop_all so blocked wait_for_update calls return
+        self._lock = threading.Lock()
+        self._updated = {}  # ip -> Condition on `_lock`, so a reading only wakes that miner's waiters
+        self._wakeup = threading.Condition(self._lock)  # scheduler: the heap changed
+
+    def _condition(self, ip):
+        # Caller holds the lock
+        condition = self._updated.get(ip)
+        if condition is None:
+            condition = self._updated[ip] = threading.Condition(self._lock)
+        return condition
+
+    def _notify_waiters(self):
+        # Caller holds the lock
+        for condition in self._updated.values():
+            condition.notify_all()
+
+    def publish(self, ip, result, latency=None):
+        """Store a fetch result (dict or error string) as the miner's newest snapshot."""
+        with self._lock:
+            previous = self._snapshots.get(ip)
+            seq = previous.seq + 1 if previous else 1
+            if isinstance(result, dict):
+                snapshot = TelemetrySnapshot(ip, result, None, time.time(), seq, latency)
+            else:
+                snapshot = TelemetrySnapshot(ip, None, str(result), time.time(), seq, latency)
+            self._snapshots[ip] = snapshot
+            self._condition(ip).notify_all()
+            listeners = self._listeners
+        for listener in listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:  # a broken listener must not stop the polling
+                logger.error(f"{ip} -> Telemetry listener {getattr(listener, '__qualname__', listener)!r} failed: {e}")
+        return snapshot
+
+    def add_listener(self, callback):
+        """Call `callback(snapshot)` for every published snapshot (e.g. to record history)."""
+        with self._lock:
+            self._listeners = self._listeners + [callback]
+
+    def remove_listener(self, callback):
+        with self._lock:
+            self._listeners = [listener for listener in self._listeners if listener != callback]
+
+    def refresh(self, ip):
+        """Fetch a miner right now (e.g. a manual refresh) and publish the result."""
+        return self.publish(ip, *self._timed_fetch(ip))
+
+    def _timed_fetch(self, ip):
+        start = time.perf_counter()
+        try:
+            result = self._fetch(ip)
+        except Exception as e:  # e.g. a malformed payload; published like any other failed fetch
+            result = f"Error fetching system info from {ip}: {e}"
+        return result, time.perf_counter() - start
+
+    def latest(self, ip):
+        """Return the newest snapshot for `ip` without blocking, or None if never polled."""
+        with self._lock:
+            return self._snapshots.get(ip)
+
+    def snapshots(self):
+        """Return a {ip: snapshot} copy of the newest reading of every miner."""
+        with self._lock:
+            return dict(self._snapshots)
+
+    def wait_for_update(self, ip, after_seq=0, timeout=None, cancel=None):
+        """Block until a snapshot newer than `after_seq` exists.
+
+        Returns None on timeout, on `stop_all`, or once the `cancel` event is
+        set (call `interrupt` after setting it to wake the wait).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            condition = self._condition(ip)
+            stops = self._stops
+            while True:
+                snapshot = self._snapshots.get(ip)
+                if snapshot is not None and snapshot.seq > after_seq:
+                    return snapshot
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if ((remaining is not None and remaining <= 0) or self._stops != stops
+                        or (cancel is not None and cancel.is_set())):
+                    return None
+                condition.wait(remaining)
+
+    def interrupt(self, ip=None):
+        """Wake the `wait_for_update` calls for `ip` (default: every miner) so they re-check their `cancel` event."""
+        with self._lock:
+            if ip is None:
+                self._notify_waiters()
+            elif ip in self._updated:
+                self._updated[ip].notify_all()
+
+    def ensure_poller(self, ip):
+        """Start polling `ip` unless it is already scheduled; its first poll is staggered."""
+        config = get_config_snapshot()
+        interval = config.get("monitor_interval", 5)
+        with self._lock:
+            if ip in self._slots:
+                return
+            slot = self._slots[ip] = _PollSlot(ip)
+            offset = (self._added * GOLDEN_RATIO_FRACTION) % 1.0 * interval
+            self._added += 1
+            self._schedule(slot, time.monotonic() + offset)
+            self._start_threads(config.get("poll_workers", 16))
+
+    def stop_poller(self, ip):
+        with self._lock:
+            self._slots.pop(ip, None)
+            self._wakeup.notify()
+
+    def expedite(self, ip, seconds=None):
+        """Poll `ip` at the fast rate for `seconds` (default 3 intervals), starting now; e.g. after new settings."""
+        config = get_config_snapshot()
+        interval = config.get("monitor_interval", 5)
+        with self._lock:
+            slot = self._slots.get(ip)
+            if slot is None:
+                return
+            slot.cadence.expedite(interval * 3 if seconds is None else seconds)
+            if not slot.busy:
+                self._schedule(slot, time.monotonic() + config.get("poll_min_interval", 1))
+
+    def stop_all(self):
+        """Stop polling every miner and wake anyone waiting for a reading. Snapshots are kept for display."""
+        with self._lock:
+            self._slots.clear()
+            self._heap.clear()
+            self._stops += 1
+            self._wakeup.notify()
+            self._notify_waiters()
+
+    def _schedule(self, slot, due):
+        # Caller holds the lock. Replaces any pending entry for the slot.
+        slot.token += 1
+        heapq.heappush(self._heap, (due, slot.token, slot.ip))
+        if self._heap[0][2] == slot.ip:  # only an earlier due time changes the scheduler's wait
+            self._wakeup.notify()
+
+    def _start_threads(self, workers):
+        # Caller holds the lock
+        if self._scheduler is None or not self._scheduler.is_alive():
+            self._scheduler = threading.Thread(target=self._schedule_loop, daemon=True, name="telemetry-scheduler")
+            self._scheduler.start()
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < min(workers, len(self._slots)):
+            worker = threading.Thread(target=self._worker_loop, daemon=True,
+                                      name=f"telemetry-worker-{len(self._workers)}")
+            worker.start()
+            self._workers.append(worker)
+
+    def _schedule_loop(self):
+        with self._wakeup:
+            while True:
+                if not self._heap:
+                    self._wakeup.wait()
+                    continue
+                due, token, ip = self._heap[0]
+                slot = self._slots.get(ip)
+                if slot is None or slot.token != token:
+                    heapq.heappop(self._heap)  # stopped or rescheduled since
+                    continue
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self._wakeup.wait(wait)
+                    continue
+                heapq.heappop(self._heap)
+                slot.busy = True
+                self._jobs.put(slot)
+
+    def _worker_loop(self):
+        while True:
+            slot = self._jobs.get()
+            result = None
+            try:
+                result, latency = self._timed_fetch(slot.ip)
+                with self._lock:
+                    active = self._slots.get(slot.ip) is slot
+                if active:  # else stopped while fetching
+                    self.publish(slot.ip, result, latency)
+            finally:
+                # Always hand the slot back, or the miner would never be polled again
+                config = get_config_snapshot()
+                with self._lock:
+                    slot.busy = False
+                    if self._slots.get(slot.ip) is slot:
+                        self._schedule(slot, time.monotonic() + slot.cadence.next_delay(result, config))
@@ -0,0 +1,108 @@
+"""Checks for the pure tuning rules in policy.py and the tier lookups in tiers.py.
+
+    python -m unittest discover tests
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import policy
+from tiers import TierTable
+
+TIERS = [{"frequency_(mhz)": freq, "voltage": 1000 + (freq - 400) // 2, "target_hashrate": freq * 2.04}
+         for freq in range(400, 701, 25)]
+PARAMS = policy.Params(voltage_step=10, frequency_step=5, temp_tolerance=2, refresh_interval=60)
+NOW = 10_000
+
+
+def random_fleet(rng, size):
+    """Column-wise states, telemetry and limits, including the edge cases the rules branch on."""
+    states = {field: [] for field in policy.State._fields}
+    telemetry = {field: [] for field in policy.Telemetry._fields}
+    limits = {field: [] for field in policy.Limits._fields}
+    for _ in range(size):
+        min_freq = rng.choice([400, 450, 500])
+        max_freq = rng.choice([min_freq, min_freq + 100, min_freq + 250])  # zero-width ranges too
+        min_volt = rng.choice([1000, 1100])
+        max_volt = rng.choice([min_volt, min_volt + 100, min_volt + 300])
+        frequency = rng.choice([rng.randint(min_freq, max_freq), rng.choice(TIERS)["frequency_(mhz)"]])
+        row_limits = (min_freq, max_freq, min_volt, max_volt, rng.choice([60, 65, 70]), rng.choice([18, 22]),
+                      rng.choice([70, 80]))
+        row_state = (frequency, rng.randint(min_volt, max_volt), rng.choice([0, NOW - 30, NOW - 120]))
+        row_telemetry = (rng.choice([None, rng.uniform(40, 75)]) if rng.random() < 0.05 else rng.uniform(40, 75),
+                         rng.uniform(40, 85), rng.uniform(0, 1.2) * frequency * 2.04, rng.uniform(10, 25),
+                         rng.choice([2040, 1020]), rng.choice([1, 2]))
+        for columns, row in ((limits, row_limits), (states, row_state), (telemetry, row_telemetry)):
+            for field, value in zip(columns, row):
+                columns[field].append(value)
+    return states, telemetry, limits
+
+
+class DecideBatchTest(unittest.TestCase):
+    def check_against_decide(self, use_numpy):
+        rng = random.Random(7)
+        for tier_table in (TierTable(TIERS), TierTable()):
+            states, telemetry, limits = random_fleet(rng, 500)
+            batch = policy.decide_batch(states, telemetry, limits, PARAMS, tier_table, NOW, use_numpy=use_numpy)
+            for idx in range(len(states["frequency"])):
+                state = policy.State(*(states[field][idx] for field in policy.State._fields))
+                decision = policy.decide(state, policy.Telemetry(*(telemetry[f][idx] for f in policy.Telemetry._fields)),
+                                         policy.Limits(*(limits[f][idx] for f in policy.Limits._fields)),
+                                         PARAMS, tier_table, NOW)
+                for field, value in zip(policy.Decision._fields, decision):
+                    self.assertEqual(value, batch[field][idx], f"miner {idx}: {field}")
+                self.assertEqual(decision.changed(state), bool(batch["changed"][idx]), f"miner {idx}: changed")
+
+    def test_python_batch_matches_decide(self):
+        self.check_against_decide(use_numpy=False)
+
+    @unittest.skipIf(policy._numpy() is None, "NumPy is not installed")
+    def test_numpy_batch_matches_decide(self):
+        self.check_against_decide(use_numpy=True)
+
+    def test_zero_width_range_counts_as_fully_used(self):
+        limits = policy.Limits(500, 500, 1100, 1100, 65, 22, 70)
+        reading = policy.Telemetry(50, 50, 100, 15, 2040, 1)  # cool and far below the expected hashrate
+        decision = policy.decide(policy.State(500, 1100, 0), reading, limits, PARAMS, TierTable(), NOW)
+        self.assertEqual(decision.reason, policy.AT_MAX)
+
+
+class TierTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = TierTable(reversed(TIERS))  # sorted on construction
+
+    def test_exact_and_off_grid_lookups(self):
+        self.assertEqual(self.table.index_of(450), 2)
+        self.assertIsNone(self.table.index_of(455))
+        self.assertEqual(self.table.voltage_for(455), self.table.voltage_for(450))
+        self.assertEqual(self.table.target_hashrate_for(399), TIERS[0]["target_hashrate"])
+        self.assertEqual(self.table.target_hashrate_for(10_000), TIERS[-1]["target_hashrate"])
+
+    def test_snap(self):
+        self.assertEqual(self.table.snap(462), 450)  # nearest
+        self.assertEqual(self.table.snap(437.5), 425)  # ties go to the lower tier
+        self.assertEqual(self.table.snap(100), 400)
+        self.assertEqual(self.table.snap(900), 700)
+
+    def test_previous_and_next_tier(self):
+        self.assertEqual(self.table.previous_tier(450), (425, self.table.voltage_for(425)))
+        self.assertEqual(self.table.previous_tier(455), (450, self.table.voltage_for(450)))
+        self.assertIsNone(self.table.previous_tier(400))
+        self.assertEqual(self.table.next_tier(450), (475, self.table.voltage_for(475)))
+        self.assertEqual(self.table.next_tier(455), (475, self.table.voltage_for(475)))
+        self.assertIsNone(self.table.next_tier(700))
+
+    def test_empty_table(self):
+        table = TierTable()
+        self.assertFalse(table)
+        self.assertEqual(table.target_hashrate_for(500), 0)
+        self.assertEqual(table.snap(512), 512)
+        self.assertIsNone(table.previous_tier(500))
+        self.assertIsNone(table.next_tier(500))
+
+
+if __name__ == "__main__":
+    unittest.main()
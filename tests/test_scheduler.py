@@ -0,0 +1,117 @@
+"""Checks for the cron parsing and profile selection in scheduler.py.
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import CronSpec, jobs_from_config, profile_in_effect
+
+FRIDAY_NIGHT = datetime(2026, 10, 16, 23, 59)
+
+
+def local_time(*args):
+    return datetime(*args).timestamp()
+
+
+class CronSpecTest(unittest.TestCase):
+    def test_parse_errors(self):
+        for expression in ("* * * *", "60 * * * *", "0 24 * * *", "0 0 32 * *", "0 0 * 13 *", "*/0 * * * *",
+                           "5-1 * * * *", "0 0 * * funday", "x:y", "0 0 30 2 *"):
+            with self.subTest(expression=expression), self.assertRaises(ValueError):
+                CronSpec(expression).next_after(FRIDAY_NIGHT)  # Feb 30 parses but never matches
+
+    def test_fields(self):
+        spec = CronSpec("*/15 9-17 1,15 jan-mar,dec 0-6/2")
+        self.assertEqual(spec.minutes, [0, 15, 30, 45])
+        self.assertEqual(spec.hours, list(range(9, 18)))
+        self.assertEqual(spec.days, {1, 15})
+        self.assertEqual(spec.months, {1, 2, 3, 12})
+        self.assertEqual(spec.weekdays, {0, 2, 4, 6})
+        self.assertEqual(CronSpec("5/20 * * * *").minutes, [5, 25, 45])  # a start with a step runs to the end
+        self.assertEqual(CronSpec("0 0 * * 7").weekdays, {0})  # 7 is Sunday too
+        self.assertEqual(CronSpec("0 0 * * SUN,Sat").weekdays, {0, 6})
+
+    def test_next_after(self):
+        cases = {
+            "0 13 * * mon-fri": datetime(2026, 10, 19, 13, 0),  # skips the weekend
+            "*/15 9-17 * * *": datetime(2026, 10, 17, 9, 0),
+            "03:30": datetime(2026, 10, 17, 3, 30),
+            "0 0 * * 7": datetime(2026, 10, 18, 0, 0),
+            "0 0 29 2 *": datetime(2028, 2, 29, 0, 0),
+            "0 12 1 * mon": datetime(2026, 10, 19, 12, 0),  # both day fields set: either one matches
+            "0 12 1 * *": datetime(2026, 11, 1, 12, 0),
+        }
+        for expression, expected in cases.items():
+            with self.subTest(expression=expression):
+                self.assertEqual(CronSpec(expression).next_after(FRIDAY_NIGHT), expected)
+
+    def test_next_after_is_strictly_later(self):
+        spec = CronSpec("30 4 * * *")
+        self.assertEqual(spec.next_after(datetime(2026, 10, 16, 4, 30)), datetime(2026, 10, 17, 4, 30))
+        self.assertEqual(spec.next_after(datetime(2026, 10, 16, 4, 29, 59)), datetime(2026, 10, 16, 4, 30))
+        self.assertEqual(CronSpec("59 23 31 12 *").next_after(datetime(2026, 12, 31, 23, 59)),
+                         datetime(2027, 12, 31, 23, 59))
+
+    def test_previous_before(self):
+        spec = CronSpec("0 13 * * mon-fri")
+        self.assertEqual(spec.previous_before(datetime(2026, 10, 18, 10, 0)), datetime(2026, 10, 16, 13, 0))
+        self.assertEqual(spec.previous_before(datetime(2026, 10, 16, 13, 0)), datetime(2026, 10, 16, 13, 0))
+        self.assertIsNone(CronSpec("0 0 29 2 *").previous_before(FRIDAY_NIGHT))  # beyond the lookback
+
+
+class ProfileInEffectTest(unittest.TestCase):
+    def setUp(self):
+        self.jobs = jobs_from_config({
+            "profiles": {"night": {"max_temp": 60}, "hot_afternoon": {"max_temp": 58}},
+            "schedules": [
+                {"name": "night", "at": "0 22 * * *", "profile": "night"},
+                {"name": "morning", "at": "06:00", "profile": None},
+                {"name": "afternoon", "at": "0 13 * * mon-fri", "profile": "hot_afternoon"},
+                {"name": "weekly restart", "at": "30 4 * * sun", "action": "restart"},
+            ],
+        })
+
+    def test_around_midnight(self):
+        cases = [
+            ((2026, 10, 16, 21, 59), "hot_afternoon"),  # Friday afternoon profile still on
+            ((2026, 10, 16, 22, 0), "night"),
+            ((2026, 10, 16, 23, 59), "night"),
+            ((2026, 10, 17, 0, 0), "night"),  # carried over from the day before
+            ((2026, 10, 17, 5, 59), "night"),
+            ((2026, 10, 17, 6, 0), None),
+            ((2026, 10, 17, 13, 0), None),  # Saturday: no afternoon profile
+            ((2026, 10, 19, 0, 30), "night"),  # Monday, set on Sunday night
+        ]
+        for moment, expected in cases:
+            with self.subTest(moment=moment):
+                self.assertEqual(profile_in_effect(self.jobs, local_time(*moment)), expected)
+
+    def test_restart_jobs_do_not_pick_a_profile(self):
+        restarts = [job for job in self.jobs if job.action == "restart"]
+        self.assertEqual(len(restarts), 1)
+        self.assertIsNone(profile_in_effect(restarts, local_time(2026, 10, 18, 4, 31)))
+
+    def test_invalid_entries_are_skipped(self):
+        errors = []
+        jobs = jobs_from_config({
+            "daily_reset_enabled": True,
+            "profiles": {"night": {}},
+            "schedules": [
+                {"name": "typo", "at": "0 25 * * *", "profile": "night"},
+                {"name": "missing profile", "at": "0 1 * * *", "profile": "nights"},
+                {"name": "no time", "profile": "night"},
+                {"name": "unknown action", "at": "0 1 * * *", "action": "reboot"},
+                {"at": "0 2 * * *", "profile": "night"},
+            ],
+        }, lambda message, level: errors.append(message))
+        self.assertEqual([job.name for job in jobs], ["daily reset", "schedule 6"])
+        self.assertEqual(len(errors), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
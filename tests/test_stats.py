@@ -0,0 +1,80 @@
+"""Checks for the rolling window statistics in stats.py.
+
+    python -m unittest discover tests
+"""
+import os
+import random
+import statistics
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stats import MinerStats, RollingWindow
+
+
+class RollingWindowTest(unittest.TestCase):
+    def check_against_brute_force(self, values, size):
+        window = RollingWindow(size)
+        for idx, value in enumerate(values):
+            window.push(value, timestamp=idx)
+            expected = values[max(0, idx - size + 1):idx + 1]
+            self.assertEqual(window.count, len(expected))
+            self.assertEqual(window.values(), expected)
+            self.assertEqual(window.min, min(expected), f"value {idx}")
+            self.assertEqual(window.max, max(expected), f"value {idx}")
+            self.assertAlmostEqual(window.mean, statistics.fmean(expected), delta=1e-9 * max(map(abs, expected)))
+            true_variance = statistics.pvariance(expected)
+            self.assertAlmostEqual(window.variance, true_variance, delta=1e-9 * max(true_variance, 1.0),
+                                   msg=f"value {idx}")
+
+    def test_normal_readings(self):
+        rng = random.Random(3)
+        for size in (1, 2, 5, 12):
+            self.check_against_brute_force([60 + rng.gauss(0, 1.5) for _ in range(200)], size)
+
+    def test_outliers_leaving_the_window(self):
+        # A glitched reading many orders of magnitude off must not leave rounding residue behind
+        rng = random.Random(5)
+        for size in (2, 5, 12, 30):
+            values = [rng.choice([1e9, -5e8, 3e12]) if rng.random() < 0.03 else 60 + rng.gauss(0, 2)
+                      for _ in range(400)]
+            self.check_against_brute_force(values, size)
+
+    def test_outlier_then_flat_readings(self):
+        window = RollingWindow(12)
+        data = [1e9] + [60 + step for step in (0, 2, -2, 3, -3, 1, -1, 4, -4, 2, 0, 1, -1, 3)]
+        for value in data:
+            window.push(value)
+        self.assertAlmostEqual(window.variance, statistics.pvariance(data[-12:]), places=9)
+
+        for _ in range(12):
+            window.push(61.0)
+        self.assertEqual(window.variance, 0.0)
+        self.assertEqual((window.min, window.max), (61.0, 61.0))
+
+    def test_rate_and_clear(self):
+        window = RollingWindow(3)
+        self.assertIsNone(window.rate())
+        for second, value in enumerate((50, 52, 56, 60)):
+            window.push(value, timestamp=second * 10)
+        self.assertAlmostEqual(window.rate(), (60 - 52) / 20)
+        window.clear()
+        self.assertEqual((window.count, window.latest, window.min, window.summary()), (0, None, None, None))
+
+    def test_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            RollingWindow(0)
+
+
+class MinerStatsTest(unittest.TestCase):
+    def test_update_skips_missing_values(self):
+        stats = MinerStats(size=4)
+        stats.update({"temp": 55.5, "vrTemp": None, "hashRate": 1000})
+        self.assertEqual(stats["temp"].latest, 55.5)
+        self.assertEqual(stats["vr_temp"].count, 0)
+        self.assertIsNone(stats.summary()["vr_temp"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import bisect
+
+FREQUENCY_KEY = "frequency_(mhz)"
+
+
+class TierTable:
+    """Safe frequency/voltage tiers from cpu_voltage_scaling_safeguards.csv.
+
+    Sorted once at construction. Exact tier frequencies resolve in O(1) through a
+    dict, off-grid frequencies with a bisect, so the tuner never re-sorts or
+    linearly scans the table. An empty table means tier enforcement is disabled.
+    """
+
+    def __init__(self, records=()):
+        records = sorted(records, key=lambda tier: tier[FREQUENCY_KEY])
+        self.frequencies = [tier[FREQUENCY_KEY] for tier in records]
+        self.voltages = [tier["voltage"] for tier in records]
+        self.target_hashrates = [tier.get("target_hashrate", 0) for tier in records]
+        self._index = {freq: idx for idx, freq in enumerate(self.frequencies)}
+
+    def __len__(self):
+        return len(self.frequencies)
+
+    def __bool__(self):
+        return bool(self.frequencies)
+
+    def index_of(self, freq):
+        """Index of an exact tier frequency, or None if `freq` is off the grid."""
+        return self._index.get(freq)
+
+    def floor_index(self, freq):
+        """Index of the highest tier at or below `freq` (0 if `freq` is below the table)."""
+        idx = self._index.get(freq)
+        if idx is None:
+            idx = max(bisect.bisect_right(self.frequencies, freq) - 1, 0)
+        return idx
+
+    def snap(self, freq):
+        """Return the tier frequency nearest to `freq` (ties go to the lower tier)."""
+        if not self.frequencies:
+            return freq
+        if freq in self._index:
+            return freq
+        idx = bisect.bisect_left(self.frequencies, freq)
+        if idx == 0:
+            return self.frequencies[0]
+        if idx == len(self.frequencies):
+            return self.frequencies[-1]
+        lower, upper = self.frequencies[idx - 1], self.frequencies[idx]
+        return lower if freq - lower <= upper - freq else upper
+
+    def voltage_for(self, freq):
+        """Voltage of the tier `freq` falls into."""
+        return self.voltages[self.floor_index(freq)]
+
+    def target_hashrate_for(self, freq):
+        """Expected target hashrate (GH/s) of the tier `freq` falls into; 0 if the table is empty."""
+        if not self.frequencies:
+            return 0
+        return self.target_hashrates[self.floor_index(freq)]
+
+    def previous_tier(self, freq):
+        """(frequency, voltage) of the highest tier strictly below `freq`, or None."""
+        idx = self._index.get(freq)
+        if idx is None:
+            idx = bisect.bisect_left(self.frequencies, freq)
+        if idx <= 0:
+            return None
+        return self.frequencies[idx - 1], self.voltages[idx - 1]
+
+    def next_tier(self, freq):
+        """(frequency, voltage) of the lowest tier strictly above `freq`, or None."""
+        idx = self._index.get(freq)
+        idx = idx + 1 if idx is not None else bisect.bisect_right(self.frequencies, freq)
+        if idx >= len(self.frequencies):
+            return None
+        return self.frequencies[idx], self.voltages[idx]